@@ -0,0 +1,38 @@
+"""add_indicator_state_table
+
+Revision ID: 0006_indicator_state
+Revises: 0005_materialized_holding
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_indicator_state"
+down_revision = "0005_materialized_holding"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "indicator_states",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("ticker", sa.String(length=32), nullable=False),
+        sa.Column("interval", sa.String(length=16), nullable=False, server_default="daily"),
+        sa.Column("indicator_type", sa.String(length=64), nullable=False),
+        sa.Column("last_timestamp", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("state_json", sa.Text(), nullable=False),
+        sa.Column("prev_state_json", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("ticker", "interval", "indicator_type", name="uq_indicator_state_ticker_interval_type"),
+    )
+    op.create_index(op.f("ix_indicator_states_ticker"), "indicator_states", ["ticker"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_indicator_states_ticker"), table_name="indicator_states")
+    op.drop_table("indicator_states")
@@ -0,0 +1,40 @@
+"""unique_indicator_value_key
+
+Revision ID: 0007_indicator_unique
+Revises: 0006_indicator_state
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0007_indicator_unique"
+down_revision = "0006_indicator_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the most recently written row for any duplicated key
+    op.execute(
+        "DELETE FROM indicator_values WHERE id NOT IN ("
+        "SELECT MAX(id) FROM indicator_values GROUP BY ticker, indicator_type, timestamp)"
+    )
+    op.drop_index("idx_indicator_ticker_type_timestamp", table_name="indicator_values")
+    op.create_index(
+        "uq_indicator_ticker_type_timestamp",
+        "indicator_values",
+        ["ticker", "indicator_type", "timestamp"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_indicator_ticker_type_timestamp", table_name="indicator_values")
+    op.create_index(
+        "idx_indicator_ticker_type_timestamp",
+        "indicator_values",
+        ["ticker", "indicator_type", "timestamp"],
+        unique=False,
+    )
@@ -0,0 +1,85 @@
+"""wide_indicator_bar_table
+
+Replaces the one-row-per-value indicator_values table with indicator_bars,
+one row per (ticker, interval, timestamp) with a typed column per series.
+Stored indicators are a recomputable cache, so old rows are not copied;
+they are recomputed on the next request or universe recompute.
+
+Revision ID: 0008_indicator_bar
+Revises: 0007_indicator_unique
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0008_indicator_bar"
+down_revision = "0007_indicator_unique"
+branch_labels = None
+depends_on = None
+
+_SERIES_COLUMNS = [
+    "sma_20",
+    "sma_50",
+    "sma_200",
+    "ema_12",
+    "ema_26",
+    "ema_50",
+    "rsi_14",
+    "macd",
+    "macd_signal",
+    "macd_histogram",
+    "bb_upper",
+    "bb_middle",
+    "bb_lower",
+    "atr_14",
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "indicator_bars",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("ticker", sa.String(length=32), nullable=False),
+        sa.Column("interval", sa.String(length=16), nullable=False, server_default="daily"),
+        sa.Column("timestamp", sa.DateTime(timezone=True), nullable=False),
+        *[sa.Column(name, sa.Float(), nullable=True) for name in _SERIES_COLUMNS],
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("ticker", "interval", "timestamp", name="uq_indicator_bar_ticker_interval_timestamp"),
+    )
+
+    op.drop_index("uq_indicator_ticker_type_timestamp", table_name="indicator_values")
+    op.drop_index(op.f("ix_indicator_values_timestamp"), table_name="indicator_values")
+    op.drop_index(op.f("ix_indicator_values_indicator_type"), table_name="indicator_values")
+    op.drop_index(op.f("ix_indicator_values_ticker"), table_name="indicator_values")
+    op.drop_table("indicator_values")
+
+
+def downgrade() -> None:
+    op.create_table(
+        "indicator_values",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("ticker", sa.String(length=32), nullable=False),
+        sa.Column("indicator_type", sa.String(length=64), nullable=False),
+        sa.Column("timestamp", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("value", sa.Float(), nullable=True),
+        sa.Column("parameters_json", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_indicator_values_ticker"), "indicator_values", ["ticker"], unique=False)
+    op.create_index(
+        op.f("ix_indicator_values_indicator_type"), "indicator_values", ["indicator_type"], unique=False
+    )
+    op.create_index(
+        op.f("ix_indicator_values_timestamp"), "indicator_values", ["timestamp"], unique=False
+    )
+    op.create_index(
+        "uq_indicator_ticker_type_timestamp",
+        "indicator_values",
+        ["ticker", "indicator_type", "timestamp"],
+        unique=True,
+    )
+
+    op.drop_table("indicator_bars")
@@ -0,0 +1,48 @@
+"""extended_indicator_columns
+
+Adds indicator_bars columns for the extended indicator pack: Stochastic
+(%K/%D), OBV, rolling VWAP, ADX (+DI/-DI), Keltner and Donchian channels.
+Existing rows get NULLs, which the gap fill treats as missing points.
+
+Revision ID: 0009_extended_indicators
+Revises: 0008_indicator_bar
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0009_extended_indicators"
+down_revision = "0008_indicator_bar"
+branch_labels = None
+depends_on = None
+
+_SERIES_COLUMNS = [
+    "stoch_k",
+    "stoch_d",
+    "obv",
+    "vwap_20",
+    "adx_14",
+    "plus_di_14",
+    "minus_di_14",
+    "kc_upper",
+    "kc_middle",
+    "kc_lower",
+    "dc_upper",
+    "dc_middle",
+    "dc_lower",
+]
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("indicator_bars") as batch_op:
+        for name in _SERIES_COLUMNS:
+            batch_op.add_column(sa.Column(name, sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("indicator_bars") as batch_op:
+        for name in reversed(_SERIES_COLUMNS):
+            batch_op.drop_column(name)
@@ -0,0 +1,38 @@
+"""price_watermark_table
+
+Per-(ticker, interval) watermark of the latest bar stored from the history
+feed, so backfills only fetch and parse what is newer.
+
+Revision ID: 0010_price_watermark
+Revises: 0009_extended_indicators
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0010_price_watermark"
+down_revision = "0009_extended_indicators"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "price_watermarks",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("ticker", sa.String(length=32), nullable=False),
+        sa.Column("interval", sa.String(length=16), nullable=False, server_default="daily"),
+        sa.Column("last_timestamp", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), onupdate=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("ticker", "interval", name="uq_price_watermark_ticker_interval"),
+    )
+    op.create_index(op.f("ix_price_watermarks_ticker"), "price_watermarks", ["ticker"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_price_watermarks_ticker"), table_name="price_watermarks")
+    op.drop_table("price_watermarks")
@@ -0,0 +1,35 @@
+"""trim_price_bar_indexes
+
+Drops the price_bars indexes that duplicate the unique constraint on
+(ticker, interval, timestamp): the identical idx_price_bar_ticker_interval_timestamp
+and ix_price_bars_ticker, a prefix of it. Each bar then maintains two
+indexes instead of four, which matters at intraday row counts.
+
+Revision ID: 0011_trim_price_bar_indexes
+Revises: 0010_price_watermark
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0011_trim_price_bar_indexes"
+down_revision = "0010_price_watermark"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index("idx_price_bar_ticker_interval_timestamp", table_name="price_bars")
+    op.drop_index(op.f("ix_price_bars_ticker"), table_name="price_bars")
+
+
+def downgrade() -> None:
+    op.create_index(op.f("ix_price_bars_ticker"), "price_bars", ["ticker"], unique=False)
+    op.create_index(
+        "idx_price_bar_ticker_interval_timestamp",
+        "price_bars",
+        ["ticker", "interval", "timestamp"],
+        unique=False,
+    )
@@ -0,0 +1,38 @@
+"""price_revision_table
+
+Per-(ticker, interval) stamp of the last time stored bars were rewritten
+(imports, backfilled gaps, multi-day rollups), so every process - server
+workers and the import CLI - can drop its cached copy of that history.
+
+Revision ID: 0012_price_revision
+Revises: 0011_trim_price_bar_indexes
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0012_price_revision"
+down_revision = "0011_trim_price_bar_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "price_revisions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("ticker", sa.String(length=32), nullable=False),
+        sa.Column("interval", sa.String(length=16), nullable=False, server_default="daily"),
+        sa.Column("revised_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("ticker", "interval", name="uq_price_revision_ticker_interval"),
+    )
+    op.create_index(op.f("ix_price_revisions_revised_at"), "price_revisions", ["revised_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_price_revisions_revised_at"), table_name="price_revisions")
+    op.drop_table("price_revisions")
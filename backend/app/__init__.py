@@ -66,8 +66,9 @@ def create_app() -> FastAPI:
         traders,
         trades,
         holdings,
-        prices,
+        # Before prices: its fixed paths (/prices/matrix) must match ahead of /prices/{ticker}
         price_history,
+        prices,
         portfolio,
         analytics,
         technical_analysis,
@@ -9,10 +9,44 @@ class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./quantvault.db"
     ALPHA_VANTAGE_API_KEY: str = ""
 
+    # Alpha Vantage plan limits, shared by every caller in the process
+    # (free tier: 5 calls/minute; premium plans allow 75 and up)
+    ALPHA_VANTAGE_CALLS_PER_MINUTE: int = 5
+    ALPHA_VANTAGE_MAX_CONCURRENCY: int = 4
+    ALPHA_VANTAGE_MAX_RETRIES: int = 3
+    # Longest an interactive quote lookup waits for a rate-limit token
+    # before giving up (background refreshes and backfills always wait)
+    ALPHA_VANTAGE_INTERACTIVE_MAX_WAIT: float = 10.0
+    # Batch quote refreshes through REALTIME_BULK_QUOTES (premium keys only;
+    # falls back to per-symbol GLOBAL_QUOTE calls)
+    ALPHA_VANTAGE_BULK_QUOTES: bool = False
+
+    # On-disk cache of raw Alpha Vantage responses ("" disables it); offline
+    # mode serves every call from the cache and never hits the network
+    ALPHA_VANTAGE_CACHE_DIR: str = "../data/av_cache"
+    # Size cap of that cache; past it the least recently written responses
+    # are pruned (0 disables the cap)
+    ALPHA_VANTAGE_CACHE_MAX_MB: int = 512
+    ALPHA_VANTAGE_OFFLINE: bool = False
+
     # JWT/auth settings (mirrors legacy config.py defaults/env)
     JWT_SECRET: str = "CHANGE-ME-IN-PRODUCTION"
     JWT_EXPIRY_HOURS: int = 24
 
+    # In-memory per-ticker price array cache (app.services.price_cache)
+    PRICE_CACHE_MAX_MB: int = 256
+    # How often each process looks for history other processes rewrote
+    # (the import CLI, other workers); see price_cache.mark_history_revised
+    PRICE_CACHE_REVISION_CHECK_SECONDS: float = 5.0
+
+    # Directory the bulk CSV import endpoint may read from
+    PRICE_IMPORT_DIR: str = "../data/imports"
+
+    # Cold tier: bars older than this many days move from price_bars into
+    # memory-mapped per-ticker files (app.services.price_archive)
+    PRICE_ARCHIVE_DIR: str = "../data/archive"
+    PRICE_ARCHIVE_AFTER_DAYS: int = 730
+
     # Frontend / CORS
     FRONTEND_DIR: str = "../frontend"
     CORS_ORIGINS: List[str] = ["*"]
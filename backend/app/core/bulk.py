@@ -0,0 +1,105 @@
+"""
+Set-based bulk write helpers.
+
+Builds dialect-specific INSERT ... ON CONFLICT statements (SQLite and
+PostgreSQL) through SQLAlchemy and executes them as chunked executemany
+batches, so large series are written in a handful of round trips instead
+of one query per row.
+"""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# Rows per executemany batch
+DEFAULT_CHUNK_SIZE = 1000
+
+_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def _insert_for(db: Session, model: Any):
+    dialect = db.get_bind().dialect.name
+    insert = _INSERTS.get(dialect)
+    if insert is None:
+        raise ValueError(f"Bulk upsert is not supported for dialect '{dialect}'")
+    return insert(model)
+
+
+def bulk_upsert(
+    db: Session,
+    model: Any,
+    rows: Sequence[Dict[str, Any]],
+    index_elements: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    keep_existing_on_null: bool = False,
+) -> int:
+    """
+    Insert rows, updating `update_columns` on conflict with `index_elements`.
+    When `update_columns` is empty/None, conflicting rows are left untouched.
+    With `keep_existing_on_null`, a NULL in the new row does not overwrite a
+    stored value. Does not commit. Returns the number of rows submitted.
+    """
+    if not rows:
+        return 0
+
+    stmt = _insert_for(db, model)
+    if update_columns:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(index_elements),
+            set_={
+                col: (
+                    func.coalesce(stmt.excluded[col], model.__table__.c[col])
+                    if keep_existing_on_null
+                    else stmt.excluded[col]
+                )
+                for col in update_columns
+            },
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+
+    # One compiled statement, executed as executemany per chunk on the
+    # session's connection (Core, skipping the ORM bulk-insert bookkeeping);
+    # pending ORM changes are flushed first so ordering is preserved
+    db.flush()
+    connection = db.connection()
+    for start in range(0, len(rows), chunk_size):
+        chunk: List[Dict[str, Any]] = list(rows[start : start + chunk_size])
+        connection.execute(stmt, chunk)
+    return len(rows)
+
+
+def bulk_insert_missing(
+    db: Session,
+    model: Any,
+    rows: Sequence[Dict[str, Any]],
+    index_elements: Sequence[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> List[Tuple[Any, ...]]:
+    """
+    Insert rows that do not conflict with `index_elements`, leaving stored
+    rows untouched. Does not commit. Returns the `index_elements` values
+    of the rows actually inserted (via RETURNING, which skips conflicts).
+    """
+    if not rows:
+        return []
+
+    table = model.__table__
+    stmt = (
+        _insert_for(db, model)
+        .on_conflict_do_nothing(index_elements=list(index_elements))
+        .returning(*(table.c[col] for col in index_elements))
+    )
+
+    db.flush()
+    connection = db.connection()
+    inserted: List[Tuple[Any, ...]] = []
+    for start in range(0, len(rows), chunk_size):
+        chunk: List[Dict[str, Any]] = list(rows[start : start + chunk_size])
+        inserted.extend(tuple(row) for row in connection.execute(stmt, chunk))
+    return inserted
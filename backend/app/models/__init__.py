@@ -7,7 +7,10 @@ from app.models.company_overview import CompanyOverview
 from app.models.portfolio_snapshot import PortfolioSnapshot
 from app.models.user import User
 from app.models.price_bar import PriceBar
-from app.models.indicator_value import IndicatorValue
+from app.models.price_watermark import PriceWatermark
+from app.models.price_revision import PriceRevision
+from app.models.indicator_bar import IndicatorBar
+from app.models.indicator_state import IndicatorState
 from app.models.strategy import Strategy
 from app.models.signal import Signal
 from app.models.materialized_holding import MaterializedHolding
@@ -22,7 +25,10 @@ __all__ = [
     "PortfolioSnapshot",
     "User",
     "PriceBar",
-    "IndicatorValue",
+    "PriceWatermark",
+    "PriceRevision",
+    "IndicatorBar",
+    "IndicatorState",
     "Strategy",
     "Signal",
     "MaterializedHolding",
@@ -0,0 +1,46 @@
+from sqlalchemy import Column, DateTime, Float, Integer, String, UniqueConstraint
+
+from app.database import Base
+
+
+class IndicatorBar(Base):
+    """Wide row of every stored indicator series for one (ticker, interval, bar)."""
+
+    __tablename__ = "indicator_bars"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ticker = Column(String(32), nullable=False)
+    interval = Column(String(16), nullable=False, default="daily", server_default="daily")
+    timestamp = Column(DateTime(timezone=True), nullable=False)
+
+    sma_20 = Column(Float, nullable=True)
+    sma_50 = Column(Float, nullable=True)
+    sma_200 = Column(Float, nullable=True)
+    ema_12 = Column(Float, nullable=True)
+    ema_26 = Column(Float, nullable=True)
+    ema_50 = Column(Float, nullable=True)
+    rsi_14 = Column(Float, nullable=True)
+    macd = Column(Float, nullable=True)
+    macd_signal = Column(Float, nullable=True)
+    macd_histogram = Column(Float, nullable=True)
+    bb_upper = Column(Float, nullable=True)
+    bb_middle = Column(Float, nullable=True)
+    bb_lower = Column(Float, nullable=True)
+    atr_14 = Column(Float, nullable=True)
+    stoch_k = Column(Float, nullable=True)
+    stoch_d = Column(Float, nullable=True)
+    obv = Column(Float, nullable=True)
+    vwap_20 = Column(Float, nullable=True)
+    adx_14 = Column(Float, nullable=True)
+    plus_di_14 = Column(Float, nullable=True)
+    minus_di_14 = Column(Float, nullable=True)
+    kc_upper = Column(Float, nullable=True)
+    kc_middle = Column(Float, nullable=True)
+    kc_lower = Column(Float, nullable=True)
+    dc_upper = Column(Float, nullable=True)
+    dc_middle = Column(Float, nullable=True)
+    dc_lower = Column(Float, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("ticker", "interval", "timestamp", name="uq_indicator_bar_ticker_interval_timestamp"),
+    )
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, Integer, String, Text, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class IndicatorState(Base):
+    __tablename__ = "indicator_states"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ticker = Column(String(32), nullable=False, index=True)
+    interval = Column(String(16), nullable=False, default="daily", server_default="daily")
+    indicator_type = Column(String(64), nullable=False)  # e.g., "SMA_20", "RSI_14", "MACD"
+    last_timestamp = Column(DateTime(timezone=True), nullable=False)  # Last bar folded into state_json
+    state_json = Column(Text, nullable=False)  # Streaming state after the last bar
+    prev_state_json = Column(Text, nullable=True)  # State before the last bar (for revising it)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("ticker", "interval", "indicator_type", name="uq_indicator_state_ticker_interval_type"),
+    )
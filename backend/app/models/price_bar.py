@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Float, Index, Integer, String, UniqueConstraint
+from sqlalchemy import Column, DateTime, Float, Integer, String, UniqueConstraint
 
 from app.database import Base
 
@@ -7,7 +7,7 @@ class PriceBar(Base):
     __tablename__ = "price_bars"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    ticker = Column(String(32), nullable=False, index=True)
+    ticker = Column(String(32), nullable=False)
     interval = Column(String(16), nullable=False, default="daily", server_default="daily")
     timestamp = Column(DateTime(timezone=True), nullable=False, index=True)
     open = Column(Float, nullable=False)
@@ -16,7 +16,8 @@ class PriceBar(Base):
     close = Column(Float, nullable=False)
     volume = Column(Float, nullable=True)
 
+    # The unique constraint's index serves every (ticker[, interval[, timestamp]]) lookup;
+    # no further per-ticker indexes, to keep writes cheap at intraday row counts
     __table_args__ = (
         UniqueConstraint("ticker", "interval", "timestamp", name="uq_price_bar_ticker_interval_timestamp"),
-        Index("idx_price_bar_ticker_interval_timestamp", "ticker", "interval", "timestamp"),
     )
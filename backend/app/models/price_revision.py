@@ -0,0 +1,16 @@
+from sqlalchemy import Column, DateTime, Integer, String, UniqueConstraint
+
+from app.database import Base
+
+
+class PriceRevision(Base):
+    __tablename__ = "price_revisions"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ticker = Column(String(32), nullable=False)
+    interval = Column(String(16), nullable=False, default="daily", server_default="daily")
+    revised_at = Column(DateTime(timezone=True), nullable=False, index=True)  # Last rewrite of stored history
+
+    __table_args__ = (
+        UniqueConstraint("ticker", "interval", name="uq_price_revision_ticker_interval"),
+    )
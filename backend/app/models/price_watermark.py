@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, Integer, String, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class PriceWatermark(Base):
+    __tablename__ = "price_watermarks"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    ticker = Column(String(32), nullable=False, index=True)
+    interval = Column(String(16), nullable=False, default="daily", server_default="daily")
+    last_timestamp = Column(DateTime(timezone=True), nullable=False)  # Latest bar stored from the history feed
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("ticker", "interval", name="uq_price_watermark_ticker_interval"),
+    )
@@ -1,31 +1,120 @@
 import logging
-from datetime import date
-from typing import List, Optional
+import os
+from datetime import date, datetime
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.config import get_settings
 from app.core.auth import get_current_user, require_admin
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.models import User
-from app.schemas.price_history import PriceHistoryResponse
-from app.services.price_history import backfill_all_securities, backfill_ticker, get_price_history
+from app.schemas.price_history import (
+    PriceHistoryColumnarResponse,
+    PriceHistoryResponse,
+    PriceImportRequest,
+    PriceMatrixResponse,
+)
+from app.services.downsampling import DOWNSAMPLE_METHODS
+from app.services.price_history import (
+    INTRADAY_INTERVALS,
+    archive_cold_bars,
+    backfill_all_securities,
+    backfill_intraday,
+    backfill_ticker,
+    epoch_seconds,
+    get_price_history,
+    price_columns,
+    select_price_series,
+    stream_history_json,
+    stream_ndjson,
+)
+from app.services.price_import import import_price_files, resolve_import_paths
+from app.services.price_matrix import MATRIX_VALUES, MISSING_POLICIES, price_matrix
+from app.services.technical_analysis import to_optional_list
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/prices", tags=["Price History"])
 
+settings = get_settings()
 
-@router.get("/{ticker}/history", response_model=PriceHistoryResponse)
+_import_status = {
+    "running": False,
+    "progress": None,
+    "last_result": None,
+    "last_run_at": None,
+}
+
+
+@router.get("/matrix", response_model=PriceMatrixResponse)
+def get_price_matrix(
+    tickers: str = Query(..., description="Comma-separated tickers"),
+    start: Optional[str] = Query(None, description="Start date YYYY-MM-DD (default: one year ago)"),
+    end: Optional[str] = Query(None, description="End date YYYY-MM-DD"),
+    values: str = Query("close", description="close or log_return"),
+    missing: str = Query("keep", description="Missing bars: keep (null), ffill or drop (dates any ticker lacks)"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """
+    Daily closes or log-returns for several tickers on one shared date axis,
+    in columnar form, from a single query.
+    """
+    _ = user
+    start_date = None
+    end_date = None
+
+    if start:
+        try:
+            start_date = date.fromisoformat(start)
+        except ValueError:
+            start_date = None
+    if end:
+        try:
+            end_date = date.fromisoformat(end)
+        except ValueError:
+            end_date = None
+
+    values = values.lower() if values.lower() in MATRIX_VALUES else "close"
+    missing = missing.lower() if missing.lower() in MISSING_POLICIES else "keep"
+    ticker_list = [t.strip().upper() for t in tickers.split(",") if t.strip()]
+
+    result = price_matrix(db, ticker_list, start_date, end_date, values, missing)
+    # Serialized straight from the arrays, skipping per-value validation
+    return JSONResponse(
+        {
+            "tickers": result["tickers"],
+            "values_type": values,
+            "missing": missing,
+            "timestamps": epoch_seconds(result["timestamps"]),
+            "values": [to_optional_list(row) for row in result["values"]],
+            "missing_tickers": result["missing_tickers"],
+        }
+    )
+
+
+@router.get("/{ticker}/history", response_model=Union[PriceHistoryResponse, PriceHistoryColumnarResponse])
 def get_ticker_history(
     ticker: str,
-    interval: str = Query("daily", description="Time interval (daily, 1h, 5m, etc.)"),
+    interval: str = Query("daily", description="Time interval (daily, weekly, monthly, 1h, 30m, 15m, 5m, 1m)"),
     start: Optional[str] = Query(None, description="Start date YYYY-MM-DD"),
     end: Optional[str] = Query(None, description="End date YYYY-MM-DD"),
+    max_points: Optional[int] = Query(None, ge=4, description="Downsample to at most this many bars"),
+    downsample: str = Query("minmax", description="Downsampling method: minmax or lttb"),
+    format: str = Query("rows", description="Response layout: rows, columnar or ndjson"),
+    stream: bool = Query(False, description="Stream the rows layout in chunks"),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
-    """Get price history for a ticker within a date range."""
+    """
+    Get price history for a ticker within a date range, optionally downsampled.
+    format=columnar returns parallel arrays with epoch-second timestamps;
+    format=ndjson streams one bar object per line. stream=true writes the
+    rows layout incrementally, for long ranges.
+    """
     _ = user
     start_date = None
     end_date = None
@@ -41,28 +130,146 @@ def get_ticker_history(
         except ValueError:
             end_date = None
 
-    bars = get_price_history(db, ticker, interval, start_date, end_date)
+    downsample = downsample.lower() if downsample.lower() in DOWNSAMPLE_METHODS else "minmax"
+
+    format = format.lower()
+    if format == "ndjson" or stream:
+        # Encoded chunk by chunk from the cached arrays as the client reads
+        series = select_price_series(db, ticker, interval, start_date, end_date, max_points, downsample)
+        if format == "ndjson":
+            return StreamingResponse(stream_ndjson(series), media_type="application/x-ndjson")
+        return StreamingResponse(
+            stream_history_json(series, ticker.upper(), interval), media_type="application/json"
+        )
+
+    if format == "columnar":
+        # Serialized straight from the arrays, skipping per-bar validation
+        series = select_price_series(db, ticker, interval, start_date, end_date, max_points, downsample)
+        return JSONResponse(
+            {"ticker": ticker.upper(), "interval": interval, "format": "columnar", **price_columns(series)}
+        )
+
+    bars = get_price_history(db, ticker, interval, start_date, end_date, max_points, downsample)
     return {"ticker": ticker.upper(), "interval": interval, "bars": bars}
 
 
 @router.post("/backfill/{ticker}")
 def backfill_single_ticker(
     ticker: str,
+    full: bool = Query(False, description="Refetch the full history instead of topping up from the watermark"),
     db: Session = Depends(get_db),
     admin: User = Depends(require_admin),
 ):
     """Backfill historical price data for a single ticker (admin only)."""
     _ = admin
-    result = backfill_ticker(db, ticker)
+    result = backfill_ticker(db, ticker, full)
     return result
 
 
 @router.post("/backfill")
 def backfill_all_tickers(
+    full: bool = Query(False, description="Refetch the full history instead of topping up from the watermark"),
     db: Session = Depends(get_db),
     admin: User = Depends(require_admin),
 ):
     """Backfill historical price data for all securities (admin only)."""
     _ = admin
-    result = backfill_all_securities(db)
+    result = backfill_all_securities(db, full)
     return result
+
+
+@router.post("/intraday/{ticker}")
+def ingest_intraday_ticker(
+    ticker: str,
+    interval: str = Query("5m", description="Intraday interval (1m, 5m, 15m, 30m, 1h)"),
+    outputsize: str = Query("compact", description="compact (latest 100 bars) or full (about 30 days)"),
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    """
+    Fetch and store a ticker's latest intraday bars and roll them up into its
+    daily bars (admin only).
+    """
+    _ = admin
+    if interval not in INTRADAY_INTERVALS:
+        interval = "5m"
+    if outputsize not in ("compact", "full"):
+        outputsize = "compact"
+    return backfill_intraday(db, ticker, interval, outputsize)
+
+
+@router.post("/archive")
+def archive_price_bars(
+    before: Optional[str] = Query(None, description="Archive bars dated before this day (YYYY-MM-DD)"),
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    """
+    Move old bars out of the database into the memory-mapped archive
+    (admin only). Defaults to bars older than PRICE_ARCHIVE_AFTER_DAYS.
+    """
+    _ = admin
+    before_date = None
+    if before:
+        try:
+            before_date = date.fromisoformat(before)
+        except ValueError:
+            before_date = None
+    return archive_cold_bars(db, before_date)
+
+
+def _run_price_import_background(paths: List[str], request: PriceImportRequest) -> None:
+    """Run a bulk CSV import in a background thread, publishing per-chunk progress."""
+    db = SessionLocal()
+    try:
+        result = import_price_files(
+            db,
+            paths,
+            request.interval,
+            request.ticker,
+            request.replace,
+            progress=lambda p: _import_status.update(progress=p),
+        )
+        _import_status["last_result"] = result
+        _import_status["last_run_at"] = datetime.utcnow().isoformat()
+    except Exception as e:  # pragma: no cover - defensive
+        _import_status["last_result"] = {"error": str(e)}
+    finally:
+        _import_status["running"] = False
+        db.close()
+
+
+@router.post("/import")
+def import_price_csv(
+    request: PriceImportRequest,
+    background_tasks: BackgroundTasks,
+    admin: User = Depends(require_admin),
+):
+    """
+    Stream OHLCV bars from CSV / CSV.gz files in the import directory into
+    price history (admin only). Runs in the background; poll /prices/import/status.
+    """
+    _ = admin
+    try:
+        paths = resolve_import_paths(request.paths, settings.PRICE_IMPORT_DIR)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not paths:
+        raise HTTPException(status_code=404, detail="No matching files in the import directory")
+    if _import_status["running"]:
+        raise HTTPException(status_code=409, detail="Price import already in progress")
+
+    _import_status.update(running=True, progress=None)
+    background_tasks.add_task(_run_price_import_background, paths, request)
+    return {"status": "started", "files": [os.path.basename(p) for p in paths]}
+
+
+@router.get("/import/status")
+def get_import_status(admin: User = Depends(require_admin)):
+    """
+    Progress of the running price import and the result of the last one
+    (admin only). Returns a snapshot, as the background task keeps
+    updating the status while the response is serialized.
+    """
+    _ = admin
+    return dict(_import_status)
@@ -10,7 +10,8 @@ from app.core.helpers import serialize_dt
 from app.core.pagination import PaginatedResponse, PaginationParams
 from app.database import get_db
 from app.models import Signal, User
-from app.schemas.signal import SignalResponse
+from app.schemas.signal import PatternScanResponse, SignalResponse
+from app.services.pattern_scanner import PATTERNS, scan_patterns
 
 logger = logging.getLogger(__name__)
 
@@ -70,3 +71,42 @@ def list_signals(
     ]
     
     return PaginatedResponse.create(items, total, pagination.page, pagination.page_size)
+
+
+@router.get("/patterns", response_model=PatternScanResponse)
+def scan_price_patterns(
+    patterns: Optional[str] = Query(
+        None, description=f"Comma-separated patterns (default all): {', '.join(PATTERNS)}"
+    ),
+    start: Optional[str] = Query(None, description="Start date YYYY-MM-DD (default: end date)"),
+    end: Optional[str] = Query(None, description="End date YYYY-MM-DD (default: latest bar)"),
+    tickers: Optional[str] = Query(None, description="Comma-separated tickers (default: whole universe)"),
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    """Find securities whose daily bars printed the given candlestick/price patterns."""
+    _ = user
+
+    start_date = None
+    end_date = None
+
+    if start:
+        try:
+            start_date = date.fromisoformat(start)
+        except ValueError:
+            start_date = None
+    if end:
+        try:
+            end_date = date.fromisoformat(end)
+        except ValueError:
+            end_date = None
+
+    pattern_list = None
+    if patterns:
+        pattern_list = [p.strip().lower() for p in patterns.split(",") if p.strip()]
+
+    ticker_list = None
+    if tickers:
+        ticker_list = [t.strip().upper() for t in tickers.split(",") if t.strip()]
+
+    return scan_patterns(db, pattern_list, start_date, end_date, ticker_list)
@@ -1,34 +1,55 @@
 import logging
 from datetime import date
-from typing import List, Optional
+from typing import List, Optional, Union
 
+import numpy as np
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user, require_admin
 from app.database import get_db
 from app.models import User
-from app.schemas.technical_analysis import TechnicalAnalysisResponse
-from app.services.indicator_compute import compute_and_store_indicators, get_indicator_values
-from app.services.price_history import get_price_history
+from app.schemas.technical_analysis import TechnicalAnalysisColumnarResponse, TechnicalAnalysisResponse
+from app.services.downsampling import DOWNSAMPLE_METHODS, keep_timestamps
+from app.services.indicator_compute import (
+    compute_indicator_columns,
+    compute_indicator_values,
+    compute_indicators_for_universe,
+    fill_indicator_gaps,
+    get_indicator_columns,
+    get_indicator_values,
+)
+from app.services.indicator_registry import is_registered
+from app.services.price_history import get_price_history, price_columns, select_price_series
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/analytics/technical", tags=["Technical Analysis"])
 
 
-@router.get("/{ticker}", response_model=TechnicalAnalysisResponse)
+@router.get("/{ticker}", response_model=Union[TechnicalAnalysisResponse, TechnicalAnalysisColumnarResponse])
 def get_technical_analysis(
     ticker: str,
     indicators: str = Query("SMA_20,RSI_14,MACD", description="Comma-separated list of indicators"),
+    interval: str = Query("daily", description="Bar interval (daily, weekly, monthly)"),
     start: Optional[str] = Query(None, description="Start date YYYY-MM-DD"),
     end: Optional[str] = Query(None, description="End date YYYY-MM-DD"),
+    max_points: Optional[int] = Query(None, ge=4, description="Downsample to at most this many bars"),
+    downsample: str = Query("minmax", description="Downsampling method: minmax or lttb"),
+    format: str = Query("rows", description="Response layout: rows or columnar"),
     db: Session = Depends(get_db),
     user: User = Depends(get_current_user),
 ):
     """
     Get technical analysis data for a ticker.
-    If indicators haven't been computed yet, computes and caches them on the fly.
+    Points missing from the indicator cache in the window are computed and
+    cached on the fly; already cached points are never recomputed.
+    Parameterized indicators outside the stored set (e.g. SMA_100, RSI_7,
+    MACD_5_35_5) are computed in memory and not stored.
+    With max_points, price bars are downsampled on the close series and
+    every indicator is cut to the same bars. format=columnar returns
+    parallel arrays on one shared epoch-second timestamp axis.
     """
     _ = user
 
@@ -46,29 +67,81 @@ def get_technical_analysis(
         except ValueError:
             end_date = None
 
+    downsample = downsample.lower() if downsample.lower() in DOWNSAMPLE_METHODS else "minmax"
+
     # Parse indicator list
     indicator_list = [ind.strip().upper() for ind in indicators.split(",") if ind.strip()]
 
-    # Get price history
-    price_bars = get_price_history(db, ticker, "daily", start_date, end_date)
+    stored = [ind for ind in indicator_list if is_registered(ind)]
+    adhoc = [ind for ind in indicator_list if not is_registered(ind)]
 
-    # Check if indicators are cached, compute if not
-    cached_indicators = get_indicator_values(db, ticker, indicator_list, start_date, end_date)
+    # Fill only the cache gaps in the window before reading
+    fill_indicator_gaps(db, ticker, stored, start_date, end_date, interval)
 
-    # If any indicators are missing, compute them
-    needs_compute = False
-    for ind in indicator_list:
-        if not cached_indicators.get(ind):
-            needs_compute = True
-            break
+    if format.lower() == "columnar":
+        # Every series is aligned to the price bars' axis and serialized straight from the arrays
+        series = select_price_series(db, ticker, interval, start_date, end_date, max_points, downsample)
+        axis = series["timestamps"] if series is not None else np.empty(0, dtype="datetime64[us]")
+        columns = get_indicator_columns(db, ticker, stored, axis, interval)
+        columns.update(compute_indicator_columns(db, ticker, adhoc, axis, interval))
+        return JSONResponse(
+            {
+                "ticker": ticker.upper(),
+                "interval": interval,
+                "format": "columnar",
+                **price_columns(series),
+                "indicators": {ind: columns[ind] for ind in indicator_list},
+            }
+        )
+
+    # Get price history
+    price_bars = get_price_history(db, ticker, interval, start_date, end_date, max_points, downsample)
+    values = get_indicator_values(db, ticker, stored, start_date, end_date, interval)
 
-    if needs_compute:
-        compute_and_store_indicators(db, ticker, "daily", start_date, end_date)
-        # Re-fetch after computation
-        cached_indicators = get_indicator_values(db, ticker, indicator_list, start_date, end_date)
+    # Everything else from the in-memory price arrays (unsupported names stay empty)
+    values.update(compute_indicator_values(db, ticker, adhoc, start_date, end_date, interval))
+    cached_indicators = {ind: values[ind] for ind in indicator_list}
+
+    if max_points is not None:
+        kept = [bar["timestamp"] for bar in price_bars]
+        cached_indicators = {ind: keep_timestamps(points, kept) for ind, points in cached_indicators.items()}
 
     return {
         "ticker": ticker.upper(),
-        "price_bars": price_bars["bars"],
+        "interval": interval,
+        "price_bars": price_bars,
         "indicators": cached_indicators,
     }
+
+
+@router.post("/recompute")
+def recompute_indicators(
+    tickers: Optional[str] = Query(None, description="Comma-separated tickers (default: all securities)"),
+    interval: str = Query("daily", description="Bar interval (daily, weekly, monthly)"),
+    start: Optional[str] = Query(None, description="Start date YYYY-MM-DD"),
+    end: Optional[str] = Query(None, description="End date YYYY-MM-DD"),
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin),
+):
+    """Recompute and store indicators for many tickers in parallel (admin only)."""
+    _ = admin
+
+    start_date = None
+    end_date = None
+
+    if start:
+        try:
+            start_date = date.fromisoformat(start)
+        except ValueError:
+            start_date = None
+    if end:
+        try:
+            end_date = date.fromisoformat(end)
+        except ValueError:
+            end_date = None
+
+    ticker_list = None
+    if tickers:
+        ticker_list = [t.strip().upper() for t in tickers.split(",") if t.strip()]
+
+    return compute_indicators_for_universe(db, ticker_list, interval, start_date, end_date)
@@ -34,8 +34,9 @@ v1_router.include_router(securities.router)  # /api/v1/securities/...
 v1_router.include_router(traders.router)  # /api/v1/traders/...
 v1_router.include_router(trades.router)  # /api/v1/trades/...
 v1_router.include_router(holdings.router)  # /api/v1/holdings, /api/v1/metrics
-v1_router.include_router(prices.router)  # /api/v1/prices/...
+# Before prices: its fixed paths (/prices/matrix) must match ahead of /prices/{ticker}
 v1_router.include_router(price_history.router)  # /api/v1/prices/history...
+v1_router.include_router(prices.router)  # /api/v1/prices/...
 v1_router.include_router(portfolio.router)  # /api/v1/portfolio/performance, /api/v1/snapshots
 v1_router.include_router(analytics.router)  # /api/v1/analytics
 v1_router.include_router(technical_analysis.router)  # /api/v1/analytics/technical/...
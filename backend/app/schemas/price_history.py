@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel
 
@@ -16,3 +16,40 @@ class PriceHistoryResponse(BaseModel):
     ticker: str
     interval: str
     bars: List[PriceBarItem]
+
+
+class PriceHistoryColumnarResponse(BaseModel):
+    """format=columnar: parallel arrays, timestamps in Unix epoch seconds."""
+
+    ticker: str
+    interval: str
+    format: Literal["columnar"] = "columnar"
+    timestamps: List[int]
+    open: List[float]
+    high: List[float]
+    low: List[float]
+    close: List[float]
+    volume: List[float | None]
+
+
+class PriceMatrixResponse(BaseModel):
+    """
+    Date-aligned closes or log-returns: one row of `values` per ticker, one
+    column per timestamp (Unix epoch seconds), null where missing.
+    """
+
+    tickers: List[str]
+    values_type: Literal["close", "log_return"]
+    missing: Literal["keep", "ffill", "drop"]
+    timestamps: List[int]
+    values: List[List[float | None]]
+    missing_tickers: List[str]
+
+
+class PriceImportRequest(BaseModel):
+    """Files (names or glob patterns) relative to settings.PRICE_IMPORT_DIR."""
+
+    paths: List[str]
+    interval: str = "daily"
+    ticker: Optional[str] = None  # For files without a ticker column (default: file name)
+    replace: bool = False  # Overwrite bars that already exist
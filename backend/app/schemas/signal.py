@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -16,3 +16,19 @@ class SignalResponse(BaseModel):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PatternMatch(BaseModel):
+    ticker: str
+    pattern: str
+    timestamp: datetime
+    close: float
+
+
+class PatternScanResponse(BaseModel):
+    start: str
+    end: str
+    patterns: List[str]
+    tickers_scanned: int
+    elapsed_seconds: float
+    matches: List[PatternMatch]
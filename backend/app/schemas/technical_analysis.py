@@ -1,4 +1,4 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Literal
 
 from pydantic import BaseModel
 
@@ -11,5 +11,25 @@ class IndicatorDataPoint(BaseModel):
 
 class TechnicalAnalysisResponse(BaseModel):
     ticker: str
+    interval: str = "daily"
     price_bars: List[Dict[str, Any]]
     indicators: Dict[str, List[IndicatorDataPoint]]
+
+
+class TechnicalAnalysisColumnarResponse(BaseModel):
+    """
+    format=columnar: price arrays plus, per indicator, one array per output
+    ("value", "signal", ...), all aligned to the shared `timestamps` axis
+    (Unix epoch seconds) with null where the indicator is undefined.
+    """
+
+    ticker: str
+    interval: str = "daily"
+    format: Literal["columnar"] = "columnar"
+    timestamps: List[int]
+    open: List[float]
+    high: List[float]
+    low: List[float]
+    close: List[float]
+    volume: List[float | None]
+    indicators: Dict[str, Dict[str, List[float | None]]]
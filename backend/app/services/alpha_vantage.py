@@ -1,9 +1,43 @@
+"""
+Alpha Vantage client.
+
+Every call in the process - quotes, company overviews and price history,
+sync or async - draws from one token bucket sized to the plan's
+calls/minute (settings.ALPHA_VANTAGE_CALLS_PER_MINUTE), so concurrent
+refreshes, backfills and quote lookups share the key's real limit instead
+of each keeping its own fixed delay. Throttle responses ("Note" /
+"Information") are retried with exponential backoff.
+
+Async callers open one client with `async_client()`; at most
+settings.ALPHA_VANTAGE_MAX_CONCURRENCY of an event loop's requests hold or
+wait for a token at a time, so a large gather queues on a semaphore rather
+than reserving the bucket minutes ahead. Sync calls reuse a keep-alive
+session per thread; interactive ones (get_quote) give up after
+settings.ALPHA_VANTAGE_INTERACTIVE_MAX_WAIT seconds instead of queueing
+behind a refresh. With settings.ALPHA_VANTAGE_BULK_QUOTES,
+quote refreshes batch up to 100 symbols per REALTIME_BULK_QUOTES call.
+
+Raw responses are cached on disk under settings.ALPHA_VANTAGE_CACHE_DIR,
+keyed by function, symbol and the other query parameters, for a
+per-function TTL (_CACHE_TTLS), so a restart does not refetch what was
+just fetched. Past settings.ALPHA_VANTAGE_CACHE_MAX_MB the least recently
+written responses are pruned. With settings.ALPHA_VANTAGE_OFFLINE every call is served
+from that cache whatever its age and a miss returns None without touching
+the network - for replaying recorded responses in tests and benchmarks.
+"""
+import asyncio
+import hashlib
+import json
 import logging
+import os
+import tempfile
+import threading
 import time
-from typing import Any, Dict, Optional
+import weakref
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
+import httpx
 import requests
-from pathlib import Path
 
 from app.config import get_settings
 
@@ -13,33 +47,318 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 _API_KEY = settings.ALPHA_VANTAGE_API_KEY
+_OFFLINE = settings.ALPHA_VANTAGE_OFFLINE
+_CACHE_DIR = settings.ALPHA_VANTAGE_CACHE_DIR
 _BASE_URL = "https://www.alphavantage.co/query"
-_CACHE_TTL_SECONDS = 15 * 60  # 15 minutes
+_TIMEOUT_SECONDS = 15
 
-_quote_cache: Dict[str, Dict[str, Any]] = {}
+# Seconds a cached response stays fresh, per function
+_CACHE_TTLS = {
+    "GLOBAL_QUOTE": 15 * 60,
+    "REALTIME_BULK_QUOTES": 15 * 60,
+    "TIME_SERIES_INTRADAY": 5 * 60,
+    "TIME_SERIES_DAILY_ADJUSTED": 6 * 3600,
+    "OVERVIEW": 24 * 3600,
+}
+_DEFAULT_CACHE_TTL = 15 * 60
+
+# Size cap of the disk cache (0 = none); pruning goes down to _CACHE_PRUNE_TO
+# of it so that it does not rescan the directory on every save
+_CACHE_MAX_BYTES = settings.ALPHA_VANTAGE_CACHE_MAX_MB * 1024 * 1024
+_CACHE_PRUNE_TO = 0.8
+
+# First wait after a throttle response; doubles on each retry
+_BACKOFF_SECONDS = 15.0
+
+# Symbols per REALTIME_BULK_QUOTES call (the API's maximum)
+BULK_QUOTE_MAX_SYMBOLS = 100
+
+# Set once the key turns out not to be entitled to bulk quotes
+_bulk_unavailable = False
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by sync and async callers. A call
+    reserves a token up front and is told how long to wait for it, so
+    waiting callers are served in order without holding the lock.
+    """
+
+    def __init__(self, calls_per_minute: int, burst: int = 1):
+        self.rate = max(calls_per_minute, 1) / 60.0
+        self.capacity = float(max(burst, 1))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Take a token; returns the seconds to wait before using it. With
+        max_wait, a token that would take longer is not taken and None is
+        returned.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = 0.0 if self._tokens >= 1.0 else (1.0 - self._tokens) / self.rate
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens -= 1.0
+            return wait
+
+    def acquire(self, max_wait: Optional[float] = None) -> bool:
+        """Wait for a token; False (without waiting) when it is more than max_wait seconds away."""
+        wait = self.reserve(max_wait)
+        if wait is None:
+            return False
+        time.sleep(wait)
+        return True
+
+    async def acquire_async(self) -> None:
+        await asyncio.sleep(self.reserve())
+
+
+_bucket = TokenBucket(settings.ALPHA_VANTAGE_CALLS_PER_MINUTE)
+
+# Per-thread keep-alive session for the sync calls (requests.Session is not thread-safe)
+_local = threading.local()
+
+# Bytes this process believes the disk cache holds (None until first scanned)
+_cache_size: Dict[str, Optional[int]] = {"bytes": None}
+_cache_lock = threading.Lock()
+
+# Event loop -> semaphore capping that loop's requests in flight
+_in_flight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def api_configured() -> bool:
+    """Whether calls can be answered: an API key is set, or offline replay is on."""
+    return bool(_API_KEY) or _OFFLINE
 
 
 def _now() -> float:
     return time.time()
 
 
-def _from_cache(ticker: str) -> Optional[Dict[str, Any]]:
-    entry = _quote_cache.get(ticker)
-    if not entry:
+def _cache_path(params: Dict[str, Any]) -> str:
+    """Cache file of a query: <dir>/<FUNCTION>/<SYMBOL>-<hash of all parameters>.json."""
+    key = json.dumps(sorted((k, str(v)) for k, v in params.items() if k != "apikey"))
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    function = str(params.get("function", "")).upper()
+    symbol = str(params.get("symbol", "")).upper()
+    if not symbol or "," in symbol:
+        # No symbol, or a bulk call's symbol list
+        symbol = "_"
+    return os.path.join(_CACHE_DIR, function, f"{symbol}-{digest}.json")
+
+
+def _from_cache(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """A cached response that is still fresh (any age when offline)."""
+    if not _CACHE_DIR:
+        return None
+    try:
+        with open(_cache_path(params), encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    ttl = _CACHE_TTLS.get(str(params.get("function")), _DEFAULT_CACHE_TTL)
+    if not _OFFLINE and _now() - entry.get("fetched_at", 0) > ttl:
+        return None
+    return entry.get("data")
+
+
+def _save_cache(params: Dict[str, Any], data: Dict[str, Any]) -> None:
+    """Write a response to the cache (atomically; failures are only logged)."""
+    if not _CACHE_DIR or any(key in data for key in ("Error Message", "Information", "Note")):
+        return
+    path = _cache_path(params)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        replaced = os.path.getsize(path) if os.path.exists(path) else 0
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"fetched_at": _now(), "data": data}, f)
+        os.replace(tmp_path, path)
+        _account_cache_write(os.path.getsize(path) - replaced)
+    except OSError as e:
+        logger.warning(f"Could not cache Alpha Vantage response: {e}")
+
+
+def _cache_files() -> List[Tuple[float, int, str]]:
+    """(mtime, size, path) of every cached response."""
+    files = []
+    for root, _, names in os.walk(_CACHE_DIR):
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+    return files
+
+
+def _account_cache_write(added: int) -> None:
+    """Track the cache size after a write and prune it once past the cap."""
+    if _CACHE_MAX_BYTES <= 0:
+        return
+    with _cache_lock:
+        if _cache_size["bytes"] is None:
+            _cache_size["bytes"] = sum(size for _, size, _ in _cache_files())
+        else:
+            _cache_size["bytes"] += added
+        if _cache_size["bytes"] > _CACHE_MAX_BYTES:
+            _prune_cache()
+
+
+def _prune_cache() -> None:
+    """
+    Delete the least recently written responses until the cache is down to
+    _CACHE_PRUNE_TO of its cap. Rescans the directory, so writes from other
+    processes are counted too. Caller holds _cache_lock.
+    """
+    files = sorted(_cache_files())
+    total = sum(size for _, size, _ in files)
+    target = _CACHE_MAX_BYTES * _CACHE_PRUNE_TO
+    removed = 0
+    for _, size, path in files:
+        if total <= target:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    _cache_size["bytes"] = total
+    logger.info(f"Pruned {removed} cached Alpha Vantage responses ({total / (1024 * 1024):.1f} MB left)")
+
+
+def _session() -> requests.Session:
+    """This thread's keep-alive session."""
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        _local.session = session
+    return session
+
+
+def _semaphore() -> asyncio.Semaphore:
+    """The running event loop's in-flight request semaphore."""
+    loop = asyncio.get_running_loop()
+    semaphore = _in_flight.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(settings.ALPHA_VANTAGE_MAX_CONCURRENCY, 1))
+        _in_flight[loop] = semaphore
+    return semaphore
+
+
+def _throttle_note(data: Any) -> Optional[str]:
+    """The message of a rate-limit response, None for a normal payload."""
+    if not isinstance(data, dict):
         return None
-    if _now() - entry["timestamp"] > _CACHE_TTL_SECONDS:
+    note = data.get("Note") or data.get("Information")
+    if note and "premium" in str(note).lower():
+        # A premium-only function: retrying will not help
         return None
-    return entry["data"]
+    return note
+
+
+def request_json(
+    params: Dict[str, Any], timeout: float = _TIMEOUT_SECONDS, max_wait: Optional[float] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    GET one Alpha Vantage query (the API key is added here) through the
+    response cache and the shared rate limiter. Returns the decoded
+    payload, or None on network errors, non-200 responses, throttling that
+    outlasts the retries, an offline cache miss or - with max_wait - when
+    the rate limiter has no token, or a throttle backoff would wait, for
+    longer than that many seconds.
+    """
+    cached = _from_cache(params)
+    if cached is not None or _OFFLINE:
+        return cached
 
+    for attempt in range(settings.ALPHA_VANTAGE_MAX_RETRIES + 1):
+        if not _bucket.acquire(max_wait):
+            logger.info(f"Alpha Vantage rate limit busy; skipping {params.get('function')} call")
+            return None
+        try:
+            resp = _session().get(_BASE_URL, params={**params, "apikey": _API_KEY}, timeout=timeout)
+            if resp.status_code != 200:
+                logger.warning(f"Alpha Vantage request failed: {resp.status_code}")
+                return None
+            data = resp.json()
+        except Exception as e:
+            logger.warning(f"Alpha Vantage request error for {params.get('function')}: {e}")
+            return None
+
+        note = _throttle_note(data)
+        if note is None:
+            _save_cache(params, data)
+            return data
+        if attempt < settings.ALPHA_VANTAGE_MAX_RETRIES:
+            delay = _BACKOFF_SECONDS * 2**attempt
+            if max_wait is not None and delay > max_wait:
+                logger.info(f"Alpha Vantage throttled ({note}); not waiting {delay:.0f}s for an interactive call")
+                return None
+            logger.warning(f"Alpha Vantage throttled ({note}); retrying in {delay:.0f}s")
+            time.sleep(delay)
+
+    logger.warning(f"Alpha Vantage still throttled after {settings.ALPHA_VANTAGE_MAX_RETRIES} retries")
+    return None
+
+
+def async_client() -> httpx.AsyncClient:
+    """HTTP client for the async calls; its pool caps requests in flight."""
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(_TIMEOUT_SECONDS, pool=None),
+        limits=httpx.Limits(max_connections=settings.ALPHA_VANTAGE_MAX_CONCURRENCY),
+    )
+
+
+async def request_json_async(
+    client: httpx.AsyncClient, params: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Async counterpart of request_json, sharing its cache and rate limiter."""
+    cached = _from_cache(params)
+    if cached is not None or _OFFLINE:
+        return cached
 
-def _save_cache(ticker: str, data: Dict[str, Any]) -> None:
-    _quote_cache[ticker] = {"timestamp": _now(), "data": data}
+    for attempt in range(settings.ALPHA_VANTAGE_MAX_RETRIES + 1):
+        # Only requests about to go out reserve a token
+        async with _semaphore():
+            await _bucket.acquire_async()
+            try:
+                resp = await client.get(_BASE_URL, params={**params, "apikey": _API_KEY})
+                if resp.status_code != 200:
+                    logger.warning(f"Alpha Vantage request failed: {resp.status_code}")
+                    return None
+                data = resp.json()
+            except Exception as e:
+                logger.warning(f"Alpha Vantage request error for {params.get('function')}: {e}")
+                return None
+
+        note = _throttle_note(data)
+        if note is None:
+            _save_cache(params, data)
+            return data
+        if attempt < settings.ALPHA_VANTAGE_MAX_RETRIES:
+            delay = _BACKOFF_SECONDS * 2**attempt
+            logger.warning(f"Alpha Vantage throttled ({note}); retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+    logger.warning(f"Alpha Vantage still throttled after {settings.ALPHA_VANTAGE_MAX_RETRIES} retries")
+    return None
 
 
 def get_quote(ticker: str) -> Optional[Dict[str, Any]]:
     """
     Fetch a real-time quote for the given ticker from Alpha Vantage GLOBAL_QUOTE.
-    Uses an in-memory cache with a 15-minute TTL to avoid burning API calls.
+    Responses are cached (on disk) for 15 minutes to avoid burning API calls.
 
     Returns a dict with:
         {
@@ -49,36 +368,125 @@ def get_quote(ticker: str) -> Optional[Dict[str, Any]]:
             "change_percent": float,
             "volume": int,
         }
-    or None on any error (network, missing API key, bad response).
+    or None on any error (network, missing API key, bad response) or when
+    no rate-limit token frees up within ALPHA_VANTAGE_INTERACTIVE_MAX_WAIT.
     """
     symbol = (ticker or "").upper().strip()
     if not symbol:
         return None
 
-    # Try cache first
-    cached = _from_cache(symbol)
-    if cached is not None:
-        return cached
-
-    if not _API_KEY:
+    if not api_configured():
         # No API key configured; fail gracefully
         return None
 
-    params = {
-        "function": "GLOBAL_QUOTE",
-        "symbol": symbol,
-        "apikey": _API_KEY,
-    }
+    data = request_json(
+        {"function": "GLOBAL_QUOTE", "symbol": symbol},
+        timeout=10,
+        max_wait=settings.ALPHA_VANTAGE_INTERACTIVE_MAX_WAIT,
+    )
+    return _parse_quote(symbol, data) if data is not None else None
 
-    try:
-        resp = requests.get(_BASE_URL, params=params, timeout=10)
-        if resp.status_code != 200:
-            return None
-        data = resp.json()
-    except Exception:
-        # Network / parsing error
+
+async def get_quote_async(client: httpx.AsyncClient, ticker: str) -> Optional[Dict[str, Any]]:
+    """Async get_quote (same cache and result shape)."""
+    symbol = (ticker or "").upper().strip()
+    if not symbol:
         return None
 
+    if not api_configured():
+        return None
+
+    data = await request_json_async(client, {"function": "GLOBAL_QUOTE", "symbol": symbol})
+    return _parse_quote(symbol, data) if data is not None else None
+
+
+async def get_quotes_async(client: httpx.AsyncClient, tickers: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Quotes (get_quote's shape) for many tickers, keyed by the given tickers (see iter_quotes_async)."""
+    quotes: Dict[str, Optional[Dict[str, Any]]] = {}
+    async for batch in iter_quotes_async(client, tickers):
+        quotes.update(batch)
+    return {t: quotes.get(t) for t in tickers}
+
+
+async def iter_quotes_async(
+    client: httpx.AsyncClient, tickers: List[str]
+) -> AsyncIterator[Dict[str, Optional[Dict[str, Any]]]]:
+    """
+    Quotes for many tickers, yielded as {ticker: quote} as each call
+    completes; every ticker is yielded once (None when no quote came back).
+    With settings.ALPHA_VANTAGE_BULK_QUOTES the tickers go out in
+    REALTIME_BULK_QUOTES batches of up to BULK_QUOTE_MAX_SYMBOLS; any ticker a
+    batch does not return - or every ticker, when the key is not entitled
+    to bulk quotes - falls back to one GLOBAL_QUOTE call.
+    """
+    global _bulk_unavailable
+    by_symbol: Dict[str, List[str]] = {}
+    for t in tickers:
+        by_symbol.setdefault((t or "").upper().strip(), []).append(t)
+    if "" in by_symbol:
+        yield {t: None for t in by_symbol.pop("")}
+
+    def keyed(quotes: Dict[str, Optional[Dict[str, Any]]]) -> Dict[str, Optional[Dict[str, Any]]]:
+        return {t: quote for symbol, quote in quotes.items() for t in by_symbol[symbol]}
+
+    missing = set(by_symbol)
+    if settings.ALPHA_VANTAGE_BULK_QUOTES and not _bulk_unavailable and api_configured():
+        unique = sorted(missing)
+        batches = [unique[i : i + BULK_QUOTE_MAX_SYMBOLS] for i in range(0, len(unique), BULK_QUOTE_MAX_SYMBOLS)]
+        for next_done in asyncio.as_completed(
+            [
+                request_json_async(client, {"function": "REALTIME_BULK_QUOTES", "symbol": ",".join(batch)})
+                for batch in batches
+            ]
+        ):
+            payload = await next_done
+            if isinstance(payload, dict) and not isinstance(payload.get("data"), list):
+                note = payload.get("Information") or payload.get("message") or payload.get("Error Message")
+                if note and "premium" in str(note).lower():
+                    logger.warning("Alpha Vantage key has no bulk quote access; using per-symbol quotes")
+                    _bulk_unavailable = True
+            found = {s: q for s, q in _parse_bulk_quotes(payload).items() if s in missing}
+            missing -= found.keys()
+            if found:
+                yield keyed(found)
+
+    async def single(symbol: str):
+        return symbol, await get_quote_async(client, symbol)
+
+    for next_done in asyncio.as_completed([single(s) for s in sorted(missing)]):
+        symbol, quote = await next_done
+        yield keyed({symbol: quote})
+
+
+def _parse_bulk_quotes(data: Optional[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """symbol -> quote dict (get_quote's shape) from a REALTIME_BULK_QUOTES payload."""
+    rows = data.get("data") if isinstance(data, dict) else None
+    if not isinstance(rows, list):
+        return {}
+
+    out = {}
+    for row in rows:
+        if not isinstance(row, dict):
+            continue
+        symbol = str(row.get("symbol") or "").upper().strip()
+        price = _to_float(row.get("close"))
+        if not symbol or price is None:
+            continue
+        # change_percent may come with or without a trailing "%"
+        change_percent = _to_float(str(row.get("change_percent") or "").replace("%", ""))
+        volume = _to_float(row.get("volume"))
+        out[symbol] = {
+            "ticker": symbol,
+            "current_price": price,
+            "change": _to_float(row.get("change")) or 0.0,
+            "change_percent": change_percent or 0.0,
+            "volume": int(volume or 0),
+        }
+    return out
+
+
+def _parse_quote(symbol: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Build a quote dict from a GLOBAL_QUOTE payload."""
     try:
         quote = data.get("Global Quote") or data.get("global quote")
         if not quote or "05. price" not in quote:
@@ -102,15 +510,13 @@ def get_quote(ticker: str) -> Optional[Dict[str, Any]]:
         except Exception:
             volume = 0
 
-        result = {
+        return {
             "ticker": symbol,
             "current_price": price,
             "change": change,
             "change_percent": change_percent,
             "volume": volume,
         }
-        _save_cache(symbol, result)
-        return result
     except Exception:
         return None
 
@@ -139,23 +545,24 @@ def get_company_overview(ticker: str) -> Optional[Dict[str, Any]]:
         DividendYield, 52WeekHigh, 52WeekLow, Sector, Industry
     """
     symbol = (ticker or "").upper().strip()
-    if not symbol or not _API_KEY:
+    if not symbol or not api_configured():
         return None
 
-    params = {
-        "function": "OVERVIEW",
-        "symbol": symbol,
-        "apikey": _API_KEY,
-    }
+    data = request_json({"function": "OVERVIEW", "symbol": symbol}, timeout=10)
+    return _parse_overview(data)
 
-    try:
-        resp = requests.get(_BASE_URL, params=params, timeout=10)
-        if resp.status_code != 200:
-            return None
-        data = resp.json()
-    except Exception:
+
+async def get_company_overview_async(client: httpx.AsyncClient, ticker: str) -> Optional[Dict[str, Any]]:
+    """Async get_company_overview."""
+    symbol = (ticker or "").upper().strip()
+    if not symbol or not api_configured():
         return None
 
+    data = await request_json_async(client, {"function": "OVERVIEW", "symbol": symbol})
+    return _parse_overview(data)
+
+
+def _parse_overview(data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     if not isinstance(data, dict) or not data:
         return None
 
@@ -170,4 +577,3 @@ def get_company_overview(ticker: str) -> Optional[Dict[str, Any]]:
         "Sector": data.get("Sector"),
         "Industry": data.get("Industry"),
     }
-
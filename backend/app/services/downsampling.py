@@ -0,0 +1,89 @@
+"""
+Chart Downsampling Service
+
+Reduces a long series to at most `max_points` points for display, picking
+indices on one series (the close) so other aligned series can be cut to the
+same bars.
+
+- "minmax": per bucket, the lowest and highest point (fully vectorized;
+  every local extremum of the series survives).
+- "lttb": Largest-Triangle-Three-Buckets, one point per bucket chosen to
+  preserve the visual shape (vectorized within each bucket).
+
+No database dependencies - receives arrays and returns index arrays.
+"""
+import logging
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DOWNSAMPLE_METHODS = ("minmax", "lttb")
+
+
+def minmax_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """First and last point plus the min and max of each bucket, in order."""
+    n = len(values)
+    if max_points >= n or max_points < 4:
+        return np.arange(n)
+
+    interior = values[1:-1]
+    buckets = (max_points - 2) // 2
+    size = -(-len(interior) // buckets)  # ceil
+    rows = -(-len(interior) // size)
+    pad = rows * size - len(interior)
+
+    lows = np.concatenate((interior, np.full(pad, np.inf))).reshape(rows, size)
+    highs = np.concatenate((interior, np.full(pad, -np.inf))).reshape(rows, size)
+    offsets = np.arange(rows) * size + 1
+    picked = np.concatenate(
+        ([0, n - 1], offsets + np.argmin(lows, axis=1), offsets + np.argmax(highs, axis=1))
+    )
+    return np.unique(picked)
+
+
+def lttb_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets over equally spaced points."""
+    n = len(values)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.arange(n, dtype=np.float64)
+    y = values.astype(np.float64, copy=False)
+    # Interior buckets [edges[i], edges[i + 1]) over points 1..n-2
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+
+    # Bucket means via prefix sums; the point after the last bucket is the last point
+    csum_y = np.concatenate(([0.0], np.cumsum(y)))
+    counts = edges[1:] - edges[:-1]
+    mean_x = np.append((edges[:-1] + edges[1:] - 1) / 2.0, x[-1])
+    mean_y = np.append((csum_y[edges[1:]] - csum_y[edges[:-1]]) / counts, y[-1])
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - mean_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y[i + 1] - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_indices(values: np.ndarray, max_points: int, method: str = "minmax") -> np.ndarray:
+    """Indices (ascending) of at most `max_points` points representing `values`."""
+    if method == "lttb":
+        return lttb_indices(values, max_points)
+    if method == "minmax":
+        return minmax_indices(values, max_points)
+    raise ValueError(f"Unknown downsampling method: {method}")
+
+
+def keep_timestamps(points: List[Dict[str, Any]], timestamps: Iterable[str]) -> List[Dict[str, Any]]:
+    """Cut a list of {timestamp, ...} points to the given timestamps."""
+    keep = set(timestamps)
+    return [p for p in points if p["timestamp"] in keep]
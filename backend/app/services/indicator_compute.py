@@ -1,22 +1,49 @@
 import json
 import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, List, Optional
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 from sqlalchemy.orm import Session
 
-from app.models import IndicatorValue, PriceBar
-from app.services.technical_analysis import (
-    atr,
-    bollinger_bands,
-    ema,
-    macd,
-    rsi,
-    sma,
+from app.core.bulk import bulk_upsert
+from app.models import IndicatorBar, IndicatorState, PriceBar, Security
+from app.services.indicator_streaming import STREAMING_INDICATORS, advance_state, init_state
+from app.services.indicator_registry import (
+    BAR_FIELDS,
+    DEFAULT_INDICATORS,
+    IndicatorSeries,
+    can_be_undefined,
+    compute_indicators,
+    first_defined_index,
+    is_registered,
+    is_supported,
+    lookback_start,
+    storage_columns,
+    warmup_bars,
 )
+from app.services.price_archive import archived_bars, merge_bars
+from app.services.price_cache import get_price_arrays, range_bounds, to_datetime64
+from app.services.resampling import RESAMPLED_INTERVALS, SOURCE_INTERVAL, is_resampled, period_start, resample_bars
+from app.services.technical_analysis import as_float_array, obv_array, to_optional_list
 
 logger = logging.getLogger(__name__)
 
+# Conflict target of the unique constraint on indicator_bars
+_INDICATOR_BAR_KEY = ["ticker", "interval", "timestamp"]
+
+# Fewest bars worth computing indicators for
+_MIN_BARS = 20
+
+# Tickers whose bars are loaded per query in universe-wide runs
+_LOAD_BATCH_TICKERS = 100
+
+# Rows fetched per round of the cursor when streaming indicator reads
+_READ_BATCH_ROWS = 2000
 
 def compute_and_store_indicators(
     db: Session,
@@ -24,122 +51,301 @@ def compute_and_store_indicators(
     interval: str = "daily",
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    indicator_types: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
     """
-    Compute all configured indicators for a ticker and store results.
-    If indicators already exist for a timestamp, they are updated.
+    Compute indicators for a ticker and store results.
+    Only `indicator_types` (and their dependencies) are computed; all
+    registered indicators when omitted. Existing values are updated.
+    The computation is seeded with the indicators' warm-up lookback before
+    the window, so stored values match those of a gap fill.
     """
     if start_date is None:
         start_date = date.today() - timedelta(days=365)  # 1 year default
     if end_date is None:
         end_date = date.today()
 
-    # Fetch price bars
-    bars = (
-        db.query(PriceBar)
-        .filter(
-            PriceBar.ticker == ticker.upper(),
-            PriceBar.interval == interval,
-            PriceBar.timestamp >= datetime.combine(start_date, datetime.min.time()),
-            PriceBar.timestamp <= datetime.combine(end_date, datetime.max.time()),
-        )
-        .order_by(PriceBar.timestamp.asc())
-        .all()
-    )
+    arrays = get_price_arrays(db, ticker, interval)
+    lo, hi = range_bounds(arrays["timestamps"], start_date, end_date) if arrays else (0, 0)
+    bars_count = hi - lo
 
-    if len(bars) < 20:  # Need minimum data
-        return {"ticker": ticker, "status": "insufficient_data", "bars_count": len(bars)}
-
-    # Extract arrays
-    closes = [b.close for b in bars]
-    highs = [b.high for b in bars]
-    lows = [b.low for b in bars]
-    timestamps = [b.timestamp for b in bars]
-
-    computed = {}
-
-    # SMA indicators (common periods)
-    for period in [20, 50, 200]:
-        sma_values = sma(closes, period)
-        indicator_type = f"SMA_{period}"
-        computed[indicator_type] = sma_values
-        _store_indicator_values(db, ticker, indicator_type, timestamps, sma_values, None)
-
-    # EMA indicators
-    for period in [12, 26, 50]:
-        ema_values = ema(closes, period)
-        indicator_type = f"EMA_{period}"
-        computed[indicator_type] = ema_values
-        _store_indicator_values(db, ticker, indicator_type, timestamps, ema_values, None)
-
-    # RSI
-    rsi_values = rsi(closes, 14)
-    computed["RSI_14"] = rsi_values
-    _store_indicator_values(db, ticker, "RSI_14", timestamps, rsi_values, None)
-
-    # MACD
-    macd_line, signal_line, histogram = macd(closes, 12, 26, 9)
-    computed["MACD"] = {"macd": macd_line, "signal": signal_line, "histogram": histogram}
-    _store_indicator_values(db, ticker, "MACD", timestamps, macd_line, {"signal": signal_line, "histogram": histogram})
-
-    # Bollinger Bands
-    bb_upper, bb_middle, bb_lower = bollinger_bands(closes, 20, 2.0)
-    computed["BB_20"] = {"upper": bb_upper, "middle": bb_middle, "lower": bb_lower}
-    _store_indicator_values(db, ticker, "BB_20", timestamps, bb_middle, {"upper": bb_upper, "lower": bb_lower})
-
-    # ATR
-    atr_values = atr(highs, lows, closes, 14)
-    computed["ATR_14"] = atr_values
-    _store_indicator_values(db, ticker, "ATR_14", timestamps, atr_values, None)
+    if bars_count < _MIN_BARS:  # Need minimum data
+        return {"ticker": ticker, "status": "insufficient_data", "bars_count": bars_count}
 
+    start = max(lo - warmup_bars(indicator_types or DEFAULT_INDICATORS), 0)
+    bars = {field: arrays[field][start:hi] for field in BAR_FIELDS}
+    computed = _seed_obv(compute_indicators(bars, indicator_types), arrays, start)
+    computed = _trim_series(computed, lo - start)
+    _store_indicator_series(db, ticker, interval, arrays["timestamps"][lo:hi].tolist(), computed)
     db.commit()
 
     return {
         "ticker": ticker,
         "status": "success",
-        "bars_count": len(bars),
+        "bars_count": bars_count,
         "indicators_computed": list(computed.keys()),
     }
 
 
-def _store_indicator_values(
+def compute_indicators_for_universe(
+    db: Session,
+    tickers: Optional[List[str]] = None,
+    interval: str = "daily",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    max_workers: Optional[int] = None,
+    indicator_types: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Compute and store all configured indicators for many tickers at once.
+
+    Bars are loaded in bulk (one query per batch of tickers), the CPU work is
+    fanned out over a process pool sized to the machine's cores, and all
+    writes go through this process's session as results come back.
+    Each ticker is loaded with enough history before start_date to cover
+    the indicators' warm-up; only the window is stored. Weekly/monthly
+    runs load daily bars and resample them.
+    Defaults to every Security and every registered indicator.
+    """
+    if tickers is None:
+        tickers = [t for (t,) in db.query(Security.ticker).order_by(Security.ticker)]
+    tickers = [t.upper() for t in tickers]
+    if start_date is None:
+        start_date = date.today() - timedelta(days=365)  # 1 year default
+    if end_date is None:
+        end_date = date.today()
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    load_start = lookback_start(start_date, warmup_bars(indicator_types or DEFAULT_INDICATORS), interval)
+    load_interval = SOURCE_INTERVAL if is_resampled(interval) else interval
+
+    started = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        for offset in range(0, len(tickers), _LOAD_BATCH_TICKERS):
+            batch = tickers[offset : offset + _LOAD_BATCH_TICKERS]
+            bars_by_ticker = _load_bar_arrays(db, batch, load_interval, load_start, end_date)
+            if is_resampled(interval):
+                bars_by_ticker = {t: resample_bars(bars, interval) for t, bars in bars_by_ticker.items()}
+
+            futures = {}
+            windows = {}
+            for ticker in batch:
+                bars = bars_by_ticker.get(ticker)
+                lo, hi = range_bounds(bars["timestamps"], start_date, end_date) if bars else (0, 0)
+                if hi - lo < _MIN_BARS:
+                    results.append({"ticker": ticker, "status": "insufficient_data", "bars_count": hi - lo})
+                    continue
+                arrays = {field: bars[field] for field in BAR_FIELDS}
+                future = pool.submit(_compute_indicators_timed, arrays, indicator_types)
+                futures[future] = ticker
+                windows[ticker] = lo
+
+            # OBV of each ticker's first loaded bar, when that is not the first bar of history
+            obv_seeds = {}
+            if load_start is not None and "OBV" in (indicator_types or DEFAULT_INDICATORS):
+                first_bars = {t: bars_by_ticker[t]["timestamps"][0] for t in windows}
+                obv_seeds = _obv_seeds(db, first_bars, interval)
+
+            # Single writer: results are persisted here, in completion order
+            for future in as_completed(futures):
+                ticker = futures[future]
+                lo = windows[ticker]
+                timestamps = bars_by_ticker[ticker]["timestamps"][lo:].tolist()
+                try:
+                    computed, compute_seconds = future.result()
+                    write_started = time.perf_counter()
+                    if obv_seeds.get(ticker) and "OBV" in computed:
+                        values, extra = computed["OBV"]
+                        computed["OBV"] = (values + obv_seeds[ticker], extra)
+                    _store_indicator_series(db, ticker, interval, timestamps, _trim_series(computed, lo))
+                    db.commit()
+                    write_seconds = time.perf_counter() - write_started
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Failed to compute indicators for {ticker}: {e}")
+                    results.append({"ticker": ticker, "status": "failed", "bars_count": len(timestamps)})
+                    continue
+
+                results.append(
+                    {
+                        "ticker": ticker,
+                        "status": "success",
+                        "bars_count": len(timestamps),
+                        "compute_ms": round(compute_seconds * 1000, 3),
+                        "write_ms": round(write_seconds * 1000, 3),
+                    }
+                )
+
+    elapsed = time.perf_counter() - started
+    succeeded = sum(1 for r in results if r["status"] == "success")
+    logger.info(
+        f"Computed indicators for {succeeded}/{len(tickers)} tickers in {elapsed:.2f}s "
+        f"using {max_workers} workers"
+    )
+    return {
+        "total": len(tickers),
+        "succeeded": succeeded,
+        "workers": max_workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "results": results,
+    }
+
+
+def _load_bar_arrays(
+    db: Session,
+    tickers: List[str],
+    interval: str,
+    start_date: Optional[date],
+    end_date: date,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Load bars for several tickers in one query (from the first bar when
+    start_date is None), stitched with their archived bars. Returns
+    ticker -> {timestamps (datetime64), opens, highs, lows, closes, volumes}
+    with float64 price arrays.
+    """
+    query = db.query(
+        PriceBar.ticker,
+        PriceBar.timestamp,
+        PriceBar.open,
+        PriceBar.high,
+        PriceBar.low,
+        PriceBar.close,
+        PriceBar.volume,
+    ).filter(
+        PriceBar.ticker.in_([t.upper() for t in tickers]),
+        PriceBar.interval == interval,
+        PriceBar.timestamp <= datetime.combine(end_date, datetime.max.time()),
+    )
+    if start_date is not None:
+        query = query.filter(PriceBar.timestamp >= datetime.combine(start_date, datetime.min.time()))
+    rows = query.order_by(PriceBar.ticker.asc(), PriceBar.timestamp.asc()).all()
+
+    out: Dict[str, Dict[str, Any]] = {}
+    for ticker, group in groupby(rows, key=lambda r: r[0]):
+        _, timestamps, opens, highs, lows, closes, volumes = zip(*group)
+        out[ticker] = {
+            "timestamps": to_datetime64(timestamps),
+            "opens": as_float_array(opens),
+            "highs": as_float_array(highs),
+            "lows": as_float_array(lows),
+            "closes": as_float_array(closes),
+            # Missing volume becomes NaN
+            "volumes": np.array(volumes, dtype=np.float64),
+        }
+
+    # Stitch in archived (cold) bars from the same range
+    start = datetime.combine(start_date, datetime.min.time()) if start_date is not None else None
+    end = datetime.combine(end_date, datetime.max.time())
+    for ticker in sorted({t.upper() for t in tickers}):
+        bars = merge_bars(archived_bars(ticker, interval, start, end), out.get(ticker))
+        if bars is not None and len(bars["timestamps"]):
+            out[ticker] = bars
+    return out
+
+
+def _seed_obv(
+    computed: Dict[str, IndicatorSeries], arrays: Dict[str, np.ndarray], start: int
+) -> Dict[str, IndicatorSeries]:
+    """
+    Shift an OBV series computed from bar `start` of the full-history
+    `arrays` (where it starts at 0) by the OBV accumulated up to that bar.
+    """
+    if "OBV" in computed and start > 0:
+        values, extra = computed["OBV"]
+        computed["OBV"] = (values + _obv_at(arrays, start), extra)
+    return computed
+
+
+def _obv_at(arrays: Dict[str, np.ndarray], position: int) -> float:
+    """OBV of the bar at `position` of a full history."""
+    return float(obv_array(arrays["closes"][: position + 1], arrays["volumes"][: position + 1])[-1])
+
+
+def _obv_seeds(db: Session, first_bars: Dict[str, np.datetime64], interval: str) -> Dict[str, float]:
+    """
+    OBV at each ticker's given bar, for seeding a recompute that starts
+    there: the stored value when there is one, else accumulated from the
+    ticker's cached full history.
+    """
+    rows = db.query(IndicatorBar.ticker, IndicatorBar.timestamp, IndicatorBar.obv).filter(
+        IndicatorBar.ticker.in_(list(first_bars)),
+        IndicatorBar.interval == interval,
+        IndicatorBar.timestamp.in_({ts.item() for ts in first_bars.values()}),
+        IndicatorBar.obv.isnot(None),
+    )
+    seeds = {ticker: obv for ticker, timestamp, obv in rows if first_bars[ticker].item() == timestamp}
+
+    for ticker, first in first_bars.items():
+        if ticker in seeds:
+            continue
+        arrays = get_price_arrays(db, ticker, interval)
+        if arrays is None:
+            continue
+        seeds[ticker] = _obv_at(arrays, int(np.searchsorted(arrays["timestamps"], first)))
+    return seeds
+
+
+def _compute_indicators_timed(
+    bars: Dict[str, Any], indicator_types: Optional[List[str]]
+) -> Tuple[Dict[str, IndicatorSeries], float]:
+    """Process-pool entry point: compute the series and report CPU time spent."""
+    started = time.perf_counter()
+    computed = compute_indicators(bars, indicator_types)
+    return computed, time.perf_counter() - started
+
+
+def _trim_series(computed: Dict[str, IndicatorSeries], keep: int) -> Dict[str, IndicatorSeries]:
+    """Drop the first `keep` (warm-up) points of every computed series."""
+    return {
+        name: (values[keep:], {k: v[keep:] for k, v in extra.items()} if extra else None)
+        for name, (values, extra) in computed.items()
+    }
+
+
+def _store_indicator_series(
     db: Session,
     ticker: str,
-    indicator_type: str,
+    interval: str,
     timestamps: List[datetime],
-    values: List[float | None],
-    parameters: Optional[Dict[str, Any]],
+    computed: Dict[str, IndicatorSeries],
 ) -> None:
-    """Store indicator values in the database."""
-    for i, (ts, val) in enumerate(zip(timestamps, values)):
-        if val is None:
-            continue
+    """
+    Upsert computed series into the wide IndicatorBar rows of a ticker.
+    Only the columns of the computed indicators are written, and undefined
+    (warm-up) points never overwrite a stored value.
+    """
+    columns: Dict[str, List[float | None]] = {}
+    defined = np.zeros(len(timestamps), dtype=bool)
+    for indicator_type, (values, extra) in computed.items():
+        outputs = {"value": values, **(extra or {})}
+        for output, column in storage_columns(indicator_type).items():
+            columns[column] = to_optional_list(outputs[output])
+        defined |= ~np.isnan(values)
 
-        # Check if exists
-        existing = (
-            db.query(IndicatorValue)
-            .filter(
-                IndicatorValue.ticker == ticker.upper(),
-                IndicatorValue.indicator_type == indicator_type,
-                IndicatorValue.timestamp == ts,
-            )
-            .first()
-        )
+    names = list(columns.keys())
+    rows = [
+        {
+            "ticker": ticker.upper(),
+            "interval": interval,
+            "timestamp": ts,
+            **{name: columns[name][i] for name in names},
+        }
+        for i, ts in enumerate(timestamps)
+        if defined[i]
+    ]
 
-        params_json = json.dumps(parameters) if parameters else None
-
-        if existing:
-            existing.value = val
-            existing.parameters_json = params_json
-        else:
-            indicator = IndicatorValue(
-                ticker=ticker.upper(),
-                indicator_type=indicator_type,
-                timestamp=ts,
-                value=val,
-                parameters_json=params_json,
-            )
-            db.add(indicator)
+    bulk_upsert(
+        db,
+        IndicatorBar,
+        rows,
+        index_elements=_INDICATOR_BAR_KEY,
+        update_columns=names,
+        keep_existing_on_null=True,
+    )
 
 
 def get_indicator_values(
@@ -148,10 +354,12 @@ def get_indicator_values(
     indicator_types: List[str],
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
+    interval: str = "daily",
 ) -> Dict[str, List[Dict[str, Any]]]:
     """
     Retrieve cached indicator values for a ticker.
-    Returns dict mapping indicator_type to list of {timestamp, value, parameters_json}.
+    Returns dict mapping indicator_type to list of {timestamp, value, parameters};
+    unknown indicator types map to an empty list.
     """
     if start_date is None:
         start_date = date.today() - timedelta(days=180)
@@ -159,27 +367,498 @@ def get_indicator_values(
         end_date = date.today()
 
     results: Dict[str, List[Dict[str, Any]]] = {ind: [] for ind in indicator_types}
+    known = [ind for ind in indicator_types if is_registered(ind)]
+    if not known:
+        return results
 
-    for indicator_type in indicator_types:
-        values = (
-            db.query(IndicatorValue)
-            .filter(
-                IndicatorValue.ticker == ticker.upper(),
-                IndicatorValue.indicator_type == indicator_type,
-                IndicatorValue.timestamp >= datetime.combine(start_date, datetime.min.time()),
-                IndicatorValue.timestamp <= datetime.combine(end_date, datetime.max.time()),
-            )
-            .order_by(IndicatorValue.timestamp.asc())
-            .all()
+    # Each indicator reads its value (+ extra outputs) from fixed tuple positions
+    column_names: List[str] = []
+    layouts = []
+    for indicator_type in known:
+        positions = {}
+        for output, column in storage_columns(indicator_type).items():
+            if column not in column_names:
+                column_names.append(column)
+            positions[output] = column_names.index(column) + 1  # 0 is the timestamp
+        value_pos = positions.pop("value")
+        layouts.append((results[indicator_type].append, value_pos, list(positions.items())))
+
+    # One range query over all requested series, streamed as plain tuples
+    rows = (
+        db.query(IndicatorBar.timestamp, *[getattr(IndicatorBar, c) for c in column_names])
+        .filter(
+            IndicatorBar.ticker == ticker.upper(),
+            IndicatorBar.interval == interval,
+            IndicatorBar.timestamp >= datetime.combine(start_date, datetime.min.time()),
+            IndicatorBar.timestamp <= datetime.combine(end_date, datetime.max.time()),
         )
+        .order_by(IndicatorBar.timestamp.asc())
+        .yield_per(_READ_BATCH_ROWS)
+    )
+
+    # Single pass: each row is fanned out to every requested indicator
+    for row in rows:
+        timestamp = row[0].isoformat()
+        for append, value_pos, extra in layouts:
+            value = row[value_pos]
+            if value is None:
+                continue
+            append(
+                {
+                    "timestamp": timestamp,
+                    "value": value,
+                    "parameters": {name: row[pos] for name, pos in extra} if extra else None,
+                }
+            )
 
+    return results
+
+
+def compute_indicator_values(
+    db: Session,
+    ticker: str,
+    indicator_types: List[str],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    interval: str = "daily",
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Compute indicators on the fly (including parameterized names such as
+    SMA_100) from the in-memory price arrays, writing nothing to the database.
+    Same output shape as get_indicator_values; unsupported names map to [].
+    """
+    if start_date is None:
+        start_date = date.today() - timedelta(days=180)
+    if end_date is None:
+        end_date = date.today()
+
+    results: Dict[str, List[Dict[str, Any]]] = {ind: [] for ind in indicator_types}
+    supported = [ind for ind in indicator_types if is_supported(ind)]
+    arrays = get_price_arrays(db, ticker, interval) if supported else None
+    if arrays is None:
+        return results
+
+    lo, hi = range_bounds(arrays["timestamps"], start_date, end_date)
+    if lo >= hi:
+        return results
+
+    # Whole history up to the window end, so warm-up never eats into the window
+    bars = {field: arrays[field][:hi] for field in BAR_FIELDS}
+    timestamps = np.datetime_as_string(arrays["timestamps"][lo:hi], unit="s").tolist()
+
+    for indicator_type, (values, extra) in compute_indicators(bars, supported).items():
+        window_values = to_optional_list(values[lo:])
+        window_extra = {name: to_optional_list(series[lo:]) for name, series in (extra or {}).items()}
         results[indicator_type] = [
             {
-                "timestamp": v.timestamp.isoformat(),
-                "value": v.value,
-                "parameters": json.loads(v.parameters_json) if v.parameters_json else None,
+                "timestamp": timestamp,
+                "value": value,
+                "parameters": {name: series[i] for name, series in window_extra.items()} if extra else None,
             }
-            for v in values
+            for i, (timestamp, value) in enumerate(zip(timestamps, window_values))
+            if value is not None
         ]
 
     return results
+
+
+def get_indicator_columns(
+    db: Session,
+    ticker: str,
+    indicator_types: List[str],
+    axis: np.ndarray,
+    interval: str = "daily",
+) -> Dict[str, Dict[str, List[float | None]]]:
+    """
+    Cached indicator values aligned to a shared timestamp axis (ascending
+    datetime64): indicator -> output ("value", "signal", ...) -> list with
+    None where nothing is stored. Unknown indicator types map to {}.
+    """
+    results: Dict[str, Dict[str, List[float | None]]] = {ind: {} for ind in indicator_types}
+    known = [ind for ind in indicator_types if is_registered(ind)]
+    if not known or len(axis) == 0:
+        return results
+
+    column_names = list(dict.fromkeys(c for ind in known for c in storage_columns(ind).values()))
+    rows = (
+        db.query(IndicatorBar.timestamp, *[getattr(IndicatorBar, c) for c in column_names])
+        .filter(
+            IndicatorBar.ticker == ticker.upper(),
+            IndicatorBar.interval == interval,
+            IndicatorBar.timestamp >= axis[0].item(),
+            IndicatorBar.timestamp <= axis[-1].item(),
+        )
+        .all()
+    )
+
+    columns = {name: np.full(len(axis), np.nan) for name in column_names}
+    if rows:
+        stored_timestamps, *stored_columns = zip(*rows)
+        positions, on_axis = _axis_positions(axis, stored_timestamps)
+        for name, values in zip(column_names, stored_columns):
+            columns[name][positions[on_axis]] = np.array(values, dtype=np.float64)[on_axis]
+
+    for indicator_type in known:
+        results[indicator_type] = {
+            output: to_optional_list(columns[column]) for output, column in storage_columns(indicator_type).items()
+        }
+    return results
+
+
+def compute_indicator_columns(
+    db: Session,
+    ticker: str,
+    indicator_types: List[str],
+    axis: np.ndarray,
+    interval: str = "daily",
+) -> Dict[str, Dict[str, List[float | None]]]:
+    """
+    Columnar counterpart of compute_indicator_values: indicators computed
+    in memory, aligned to a timestamp axis taken from the same price series.
+    Unsupported names map to {}.
+    """
+    results: Dict[str, Dict[str, List[float | None]]] = {ind: {} for ind in indicator_types}
+    supported = [ind for ind in indicator_types if is_supported(ind)]
+    arrays = get_price_arrays(db, ticker, interval) if supported and len(axis) else None
+    if arrays is None:
+        return results
+
+    positions = np.searchsorted(arrays["timestamps"], axis)
+    hi = int(positions[-1]) + 1
+    bars = {field: arrays[field][:hi] for field in BAR_FIELDS}
+
+    for indicator_type, (values, extra) in compute_indicators(bars, supported).items():
+        outputs = {"value": values, **(extra or {})}
+        results[indicator_type] = {output: to_optional_list(series[positions]) for output, series in outputs.items()}
+    return results
+
+
+def fill_indicator_gaps(
+    db: Session,
+    ticker: str,
+    indicator_types: List[str],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    interval: str = "daily",
+) -> Dict[str, Any]:
+    """
+    Compute and store only the cached points missing for the requested
+    indicators in a window (same defaults as get_indicator_values).
+
+    The recompute starts at the earliest missing bar, seeded with the
+    warm-up lookback of the affected indicators, and stops at the latest
+    missing bar - a fully cached window costs one indicator query and no
+    compute.
+    """
+    if start_date is None:
+        start_date = date.today() - timedelta(days=180)
+    if end_date is None:
+        end_date = date.today()
+
+    known = [ind for ind in indicator_types if is_registered(ind)]
+    missing = {
+        ind: timestamps
+        for ind, timestamps in find_missing_indicator_points(db, ticker, known, start_date, end_date, interval).items()
+        if timestamps
+    }
+    if not missing:
+        return {"ticker": ticker, "status": "cached", "points_filled": {}}
+
+    arrays = get_price_arrays(db, ticker, interval)
+    timestamps = arrays["timestamps"]
+    first = int(np.searchsorted(timestamps, np.datetime64(min(points[0] for points in missing.values())), "left"))
+    last = int(np.searchsorted(timestamps, np.datetime64(max(points[-1] for points in missing.values())), "right"))
+
+    # Recompute from `warmup` bars before the first missing one (or the start
+    # of history) and keep only the tail; the warm-up bars are already cached
+    start = max(first - warmup_bars(missing.keys()), 0)
+    bars = {field: arrays[field][start:last] for field in BAR_FIELDS}
+    computed = _seed_obv(compute_indicators(bars, list(missing.keys())), arrays, start)
+    computed = _trim_series(computed, first - start)
+    _store_indicator_series(db, ticker, interval, timestamps[first:last].tolist(), computed)
+    db.commit()
+
+    return {
+        "ticker": ticker,
+        "status": "filled",
+        "bars_computed": last - start,
+        "points_filled": {ind: len(points) for ind, points in missing.items()},
+    }
+
+
+def find_missing_indicator_points(
+    db: Session,
+    ticker: str,
+    indicator_types: List[str],
+    start_date: date,
+    end_date: date,
+    interval: str = "daily",
+) -> Dict[str, List[datetime]]:
+    """
+    Coverage check: for each registered indicator, the bar timestamps in the
+    window that have a price bar but no cached value. Bars still inside the
+    indicator's warm-up from the start of history, and bars on which the
+    indicator is undefined (can_be_undefined), are never reported.
+    """
+    if not indicator_types:
+        return {}
+
+    missing: Dict[str, List[datetime]] = {ind: [] for ind in indicator_types}
+    arrays = get_price_arrays(db, ticker, interval)
+    if arrays is None:
+        return missing
+    # lo is also the absolute position of the window's first bar in the history
+    lo, hi = range_bounds(arrays["timestamps"], start_date, end_date)
+    if lo >= hi:
+        return missing
+    window = arrays["timestamps"][lo:hi]
+
+    value_columns = [getattr(IndicatorBar, storage_columns(ind)["value"]) for ind in indicator_types]
+    rows = (
+        db.query(IndicatorBar.timestamp, *value_columns)
+        .filter(
+            IndicatorBar.ticker == ticker.upper(),
+            IndicatorBar.interval == interval,
+            IndicatorBar.timestamp >= datetime.combine(start_date, datetime.min.time()),
+            IndicatorBar.timestamp <= datetime.combine(end_date, datetime.max.time()),
+        )
+        .all()
+    )
+
+    # Mark the window bars that have a cached value, per indicator
+    covered = np.zeros((len(indicator_types), len(window)), dtype=bool)
+    if rows:
+        stored_timestamps, *stored_values = zip(*rows)
+        positions, on_bar = _axis_positions(window, stored_timestamps)
+        for i, values in enumerate(stored_values):
+            has_value = on_bar & np.array([v is not None for v in values], dtype=bool)
+            covered[i, positions[has_value]] = True
+
+    absolute = np.arange(lo, hi)
+    gaps = {ind: ~covered[i] & (absolute >= first_defined_index(ind)) for i, ind in enumerate(indicator_types)}
+
+    # A point the bars leave undefined (e.g. VWAP without volume) is never
+    # stored; find those by computing the series rather than refilling them
+    uncertain = [ind for ind in indicator_types if gaps[ind].any() and can_be_undefined(ind)]
+    if uncertain:
+        bars = {field: arrays[field][:hi] for field in BAR_FIELDS}
+        for ind, (values, _) in compute_indicators(bars, uncertain).items():
+            gaps[ind] &= ~np.isnan(values[lo:])
+
+    for ind in indicator_types:
+        missing[ind] = window[gaps[ind]].tolist()
+    return missing
+
+
+def _axis_positions(axis: np.ndarray, timestamps: List[datetime]) -> Tuple[np.ndarray, np.ndarray]:
+    """Positions of database timestamps on a datetime64 axis, and which of them land exactly on it."""
+    stored = to_datetime64(timestamps)
+    positions = np.searchsorted(axis, stored)
+    on_axis = positions < len(axis)
+    on_axis[on_axis] = axis[positions[on_axis]] == stored[on_axis]
+    return positions, on_axis
+
+
+def advance_indicators(db: Session, bar: PriceBar) -> Dict[str, Any]:
+    """
+    Fold a new or revised bar into the persisted streaming state of every
+    indicator and store the resulting values for that bar.
+
+    A bar newer than the state advances it by one step; a revision of the
+    last bar re-applies it on top of the previous state. Anything else
+    (missing state, out-of-order bar, skipped bars) rebuilds the state by
+    replaying the indicators' warm-up from the cached history once, or
+    reports "no_history" when that history does not hold the bar.
+    """
+    ticker = bar.ticker.upper()
+    interval = bar.interval
+    timestamp = bar.timestamp
+
+    states = {
+        s.indicator_type: s
+        for s in db.query(IndicatorState).filter(
+            IndicatorState.ticker == ticker,
+            IndicatorState.interval == interval,
+        )
+    }
+
+    if _can_advance_states(db, states, ticker, interval, timestamp):
+        bar_values = {"high": bar.high, "low": bar.low, "close": bar.close}
+        outputs = {}
+        for indicator_type, row in states.items():
+            revising = row.last_timestamp == timestamp
+            base_json = row.prev_state_json if revising else row.state_json
+            state = json.loads(base_json) if base_json else init_state(indicator_type)
+            outputs[indicator_type] = advance_state(indicator_type, state, bar_values)
+            if not revising:
+                row.prev_state_json = row.state_json
+            row.state_json = json.dumps(state)
+            row.last_timestamp = timestamp
+        status = "advanced"
+    else:
+        outputs = _rebuild_indicator_states(db, ticker, interval, timestamp, states)
+        # No cached history holds the bar: no state to rebuild
+        status = "rebuilt" if outputs else "no_history"
+
+    # Too little history for any value: no row of NULLs
+    if any(value is not None for value, _ in outputs.values()):
+        _store_bar_outputs(db, ticker, interval, timestamp, outputs)
+    db.commit()
+
+    return {
+        "ticker": ticker,
+        "status": status,
+        "timestamp": timestamp.isoformat(),
+        "indicators_updated": list(outputs.keys()),
+    }
+
+
+def reset_indicator_states(db: Session, ticker: str, interval: str = "daily") -> None:
+    """
+    Drop streaming state for a ticker (e.g. after historical bars changed).
+    The state is rebuilt on the next advance_indicators call. Does not commit.
+    """
+    db.query(IndicatorState).filter(
+        IndicatorState.ticker == ticker.upper(),
+        IndicatorState.interval == interval,
+    ).delete(synchronize_session=False)
+
+
+def invalidate_indicator_bars(db: Session, ticker: str, since: datetime, interval: str = "daily") -> None:
+    """
+    Delete stored indicator rows of an interval from `since` onward, after
+    its bars from that point changed; the gap fill recomputes them on the
+    next read. Does not commit.
+    """
+    db.query(IndicatorBar).filter(
+        IndicatorBar.ticker == ticker.upper(),
+        IndicatorBar.interval == interval,
+        IndicatorBar.timestamp >= since,
+    ).delete(synchronize_session=False)
+
+
+def invalidate_resampled_indicators(db: Session, ticker: str, since: datetime) -> None:
+    """
+    Delete stored weekly/monthly indicator rows whose period contains or
+    follows `since`, after daily bars from that point changed; the gap fill
+    recomputes them on the next read. Does not commit.
+    """
+    for interval in RESAMPLED_INTERVALS:
+        db.query(IndicatorBar).filter(
+            IndicatorBar.ticker == ticker.upper(),
+            IndicatorBar.interval == interval,
+            IndicatorBar.timestamp >= period_start(since, interval),
+        ).delete(synchronize_session=False)
+
+
+def _can_advance_states(
+    db: Session,
+    states: Dict[str, IndicatorState],
+    ticker: str,
+    interval: str,
+    timestamp: datetime,
+) -> bool:
+    """Whether the stored states can take `timestamp` as a single step."""
+    if set(states.keys()) != set(STREAMING_INDICATORS.keys()):
+        return False
+
+    last_timestamps = {s.last_timestamp for s in states.values()}
+    if len(last_timestamps) != 1:
+        return False
+    last_timestamp = last_timestamps.pop()
+
+    if timestamp == last_timestamp:
+        return True
+    if timestamp < last_timestamp:
+        return False
+
+    # Bars stored between the state and this bar were never folded in
+    skipped = (
+        db.query(PriceBar.id)
+        .filter(
+            PriceBar.ticker == ticker,
+            PriceBar.interval == interval,
+            PriceBar.timestamp > last_timestamp,
+            PriceBar.timestamp < timestamp,
+        )
+        .first()
+    )
+    return skipped is None
+
+
+def _rebuild_indicator_states(
+    db: Session,
+    ticker: str,
+    interval: str,
+    timestamp: datetime,
+    states: Dict[str, IndicatorState],
+) -> Dict[str, Any]:
+    """
+    Replay the cached history (archive included) up to `timestamp` into
+    fresh streaming states. The replay starts the streaming indicators'
+    warm-up before the bar, as a batch recompute would, so both agree.
+    """
+    arrays = get_price_arrays(db, ticker, interval)
+    if arrays is None:
+        return {}
+    point = to_datetime64([timestamp])[0]
+    end = int(np.searchsorted(arrays["timestamps"], point, "right"))
+    if end == 0 or arrays["timestamps"][end - 1] != point:
+        return {}
+    start = max(end - 1 - warmup_bars(STREAMING_INDICATORS), 0)
+
+    bars = [
+        {"high": high, "low": low, "close": close}
+        for high, low, close in zip(
+            arrays["highs"][start:end].tolist(), arrays["lows"][start:end].tolist(), arrays["closes"][start:end].tolist()
+        )
+    ]
+    outputs = {}
+
+    for indicator_type in STREAMING_INDICATORS:
+        state = init_state(indicator_type)
+        for bar_values in bars[:-1]:
+            advance_state(indicator_type, state, bar_values)
+        prev_state_json = json.dumps(state)
+        outputs[indicator_type] = advance_state(indicator_type, state, bars[-1])
+
+        row = states.get(indicator_type)
+        if row is None:
+            row = IndicatorState(ticker=ticker, interval=interval, indicator_type=indicator_type)
+            db.add(row)
+        row.last_timestamp = timestamp
+        row.state_json = json.dumps(state)
+        row.prev_state_json = prev_state_json
+
+    return outputs
+
+
+def _store_bar_outputs(
+    db: Session,
+    ticker: str,
+    interval: str,
+    timestamp: datetime,
+    outputs: Dict[str, Any],
+) -> None:
+    """
+    Upsert one bar's (value, parameters) per indicator into its IndicatorBar
+    row. Stored series without a streaming form (STOCH, OBV, ADX, ...) are
+    cleared for the bar, so the gap fill recomputes them on the next read
+    instead of serving values from a previous version of the bar.
+    """
+    row: Dict[str, Any] = {"ticker": ticker, "interval": interval, "timestamp": timestamp}
+    for indicator_type in DEFAULT_INDICATORS:
+        for column in storage_columns(indicator_type).values():
+            row[column] = None
+    for indicator_type, (value, parameters) in outputs.items():
+        point = {"value": value, **(parameters or {})}
+        for output, column in storage_columns(indicator_type).items():
+            row[column] = point.get(output)
+
+    bulk_upsert(
+        db,
+        IndicatorBar,
+        [row],
+        index_elements=_INDICATOR_BAR_KEY,
+        update_columns=[c for c in row.keys() if c not in _INDICATOR_BAR_KEY],
+    )
@@ -0,0 +1,374 @@
+"""
+Indicator Registry
+
+Declarative catalogue of the indicator series we compute. Each entry names
+its kernel, its parameters and the other series it is derived from, so a
+request for a set of indicators resolves to a minimal dependency-ordered
+plan in which shared intermediates (e.g. the EMAs behind MACD) are computed
+once. Parameterized names outside the catalogue (SMA_100, RSI_7,
+MACD_5_35_5, ...) resolve to the same kernels but have no storage columns.
+
+No database dependencies - receives bar arrays and returns arrays.
+"""
+import logging
+import math
+import re
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.technical_analysis import (
+    adx_array,
+    atr_array,
+    bollinger_bands_from_sma,
+    donchian_channels_array,
+    ema_array,
+    keltner_channels_from,
+    macd_from_emas,
+    obv_array,
+    rsi_array,
+    sma_array,
+    stochastic_array,
+    vwap_array,
+)
+
+logger = logging.getLogger(__name__)
+
+# (values, extra aligned series such as MACD signal/histogram) per indicator
+IndicatorSeries = Tuple[np.ndarray, Optional[Dict[str, np.ndarray]]]
+
+# Bar arrays keyed by field (BAR_FIELDS, float64)
+BarArrays = Dict[str, np.ndarray]
+
+# Price fields the kernels read; volumes may contain NaN for missing volume
+BAR_FIELDS = ("highs", "lows", "closes", "volumes")
+
+
+def _sma(bars: BarArrays, deps: List[np.ndarray], period: int) -> IndicatorSeries:
+    return (sma_array(bars["closes"], period), None)
+
+
+def _ema(bars: BarArrays, deps: List[np.ndarray], period: int) -> IndicatorSeries:
+    return (ema_array(bars["closes"], period), None)
+
+
+def _rsi(bars: BarArrays, deps: List[np.ndarray], period: int) -> IndicatorSeries:
+    return (rsi_array(bars["closes"], period), None)
+
+
+def _macd(bars: BarArrays, deps: List[np.ndarray], signal_period: int) -> IndicatorSeries:
+    ema_fast, ema_slow = deps
+    macd_line, signal_line, histogram = macd_from_emas(ema_fast, ema_slow, signal_period)
+    return (macd_line, {"signal": signal_line, "histogram": histogram})
+
+
+def _bollinger(bars: BarArrays, deps: List[np.ndarray], period: int, num_std: float) -> IndicatorSeries:
+    (middle,) = deps
+    upper, middle, lower = bollinger_bands_from_sma(bars["closes"], middle, period, num_std)
+    return (middle, {"upper": upper, "lower": lower})
+
+
+def _atr(bars: BarArrays, deps: List[np.ndarray], period: int) -> IndicatorSeries:
+    return (atr_array(bars["highs"], bars["lows"], bars["closes"], period), None)
+
+
+def _stochastic(bars: BarArrays, deps: List[np.ndarray], k_period: int, d_period: int) -> IndicatorSeries:
+    k, d = stochastic_array(bars["highs"], bars["lows"], bars["closes"], k_period, d_period)
+    return (k, {"d": d})
+
+
+def _obv(bars: BarArrays, deps: List[np.ndarray]) -> IndicatorSeries:
+    return (obv_array(bars["closes"], bars["volumes"]), None)
+
+
+def _vwap(bars: BarArrays, deps: List[np.ndarray], period: int) -> IndicatorSeries:
+    return (vwap_array(bars["highs"], bars["lows"], bars["closes"], bars["volumes"], period), None)
+
+
+def _adx(bars: BarArrays, deps: List[np.ndarray], period: int) -> IndicatorSeries:
+    adx, plus_di, minus_di = adx_array(bars["highs"], bars["lows"], bars["closes"], period)
+    return (adx, {"plus_di": plus_di, "minus_di": minus_di})
+
+
+def _keltner(bars: BarArrays, deps: List[np.ndarray], multiplier: float) -> IndicatorSeries:
+    middle, atr_values = deps
+    upper, middle, lower = keltner_channels_from(middle, atr_values, multiplier)
+    return (middle, {"upper": upper, "lower": lower})
+
+
+def _donchian(bars: BarArrays, deps: List[np.ndarray], period: int) -> IndicatorSeries:
+    upper, middle, lower = donchian_channels_array(bars["highs"], bars["lows"], period)
+    return (middle, {"upper": upper, "lower": lower})
+
+
+# kind -> kernel(bars, dependency values in depends_on order, **params)
+_KERNELS: Dict[str, Callable[..., IndicatorSeries]] = {
+    "sma": _sma,
+    "ema": _ema,
+    "rsi": _rsi,
+    "macd": _macd,
+    "bollinger": _bollinger,
+    "atr": _atr,
+    "stochastic": _stochastic,
+    "obv": _obv,
+    "vwap": _vwap,
+    "adx": _adx,
+    "keltner": _keltner,
+    "donchian": _donchian,
+}
+
+# Recursive filters (EMA, Wilder) are seeded far enough back that the seed
+# keeps less than this weight in the first point we keep.
+_SEED_TOLERANCE = 1e-6
+
+
+def _decay_bars(alpha: float) -> int:
+    """Bars after which a filter with smoothing factor `alpha` keeps < _SEED_TOLERANCE of its seed."""
+    return math.ceil(math.log(_SEED_TOLERANCE) / math.log(1.0 - alpha)) if alpha < 1.0 else 0
+
+# kind -> (first defined index of the dependencies, **params) -> index of the
+# first defined point, counting bars from the start of history.
+_FIRST_DEFINED: Dict[str, Callable[..., int]] = {
+    "sma": lambda dep, period: period - 1,
+    "ema": lambda dep, period: period - 1,
+    "rsi": lambda dep, period: period,
+    "macd": lambda dep, signal_period: dep,
+    "bollinger": lambda dep, period, num_std: max(dep, period - 1),
+    "atr": lambda dep, period: period,
+    "stochastic": lambda dep, k_period, d_period: k_period - 1,
+    "obv": lambda dep: 0,
+    "vwap": lambda dep, period: period - 1,
+    "adx": lambda dep, period: 2 * period - 1,
+    "keltner": lambda dep, multiplier: dep,
+    "donchian": lambda dep, period: period - 1,
+}
+
+# kind -> (warm-up of the dependencies, **params) -> bars of history to load
+# before the first point to be (re)computed.
+_WARMUP: Dict[str, Callable[..., int]] = {
+    "sma": lambda dep, period: period - 1,
+    "ema": lambda dep, period: period - 1 + _decay_bars(2.0 / (period + 1)),
+    "rsi": lambda dep, period: period + _decay_bars(1.0 / period),
+    "macd": lambda dep, signal_period: dep + signal_period - 1 + _decay_bars(2.0 / (signal_period + 1)),
+    "bollinger": lambda dep, period, num_std: max(dep, period - 1),
+    "atr": lambda dep, period: period,
+    "stochastic": lambda dep, k_period, d_period: k_period + d_period - 2,
+    # OBV accumulates over the whole history: a recompute starts at 0 one bar
+    # before the first point and is shifted by the OBV there (see
+    # indicator_compute._seed_obv)
+    "obv": lambda dep: 1,
+    "vwap": lambda dep, period: period - 1,
+    # Wilder-smoothed DI, then a Wilder average of DX
+    "adx": lambda dep, period: 2 * (period + _decay_bars(1.0 / period)),
+    "keltner": lambda dep, multiplier: dep,
+    "donchian": lambda dep, period: period - 1,
+}
+
+# Kinds whose value can be undefined past the warm-up because of the bars
+# themselves: VWAP over a window without volume, ADX without any price range
+_DATA_UNDEFINED = {"vwap", "adx"}
+
+# Calendar days spanned by one bar, for turning a warm-up in bars into a
+# date range (other intervals fall back to the daily ratio, which over-reads).
+# Daily assumes a 248-session year, below any exchange calendar with its
+# holidays and unscheduled closures, so the range never holds too few bars.
+_CALENDAR_DAYS_PER_BAR = {"daily": 365 / 248, "weekly": 7, "monthly": 31}
+
+# "columns" maps each output (the value plus any extra series) to its typed
+# column on IndicatorBar.
+INDICATOR_REGISTRY: Dict[str, Dict[str, Any]] = {
+    "SMA_20": {"kind": "sma", "params": {"period": 20}, "depends_on": [], "columns": {"value": "sma_20"}},
+    "SMA_50": {"kind": "sma", "params": {"period": 50}, "depends_on": [], "columns": {"value": "sma_50"}},
+    "SMA_200": {"kind": "sma", "params": {"period": 200}, "depends_on": [], "columns": {"value": "sma_200"}},
+    "EMA_12": {"kind": "ema", "params": {"period": 12}, "depends_on": [], "columns": {"value": "ema_12"}},
+    "EMA_26": {"kind": "ema", "params": {"period": 26}, "depends_on": [], "columns": {"value": "ema_26"}},
+    "EMA_50": {"kind": "ema", "params": {"period": 50}, "depends_on": [], "columns": {"value": "ema_50"}},
+    "RSI_14": {"kind": "rsi", "params": {"period": 14}, "depends_on": [], "columns": {"value": "rsi_14"}},
+    "MACD": {
+        "kind": "macd",
+        "params": {"signal_period": 9},
+        "depends_on": ["EMA_12", "EMA_26"],
+        "columns": {"value": "macd", "signal": "macd_signal", "histogram": "macd_histogram"},
+    },
+    "BB_20": {
+        "kind": "bollinger",
+        "params": {"period": 20, "num_std": 2.0},
+        "depends_on": ["SMA_20"],
+        "columns": {"value": "bb_middle", "upper": "bb_upper", "lower": "bb_lower"},
+    },
+    "ATR_14": {"kind": "atr", "params": {"period": 14}, "depends_on": [], "columns": {"value": "atr_14"}},
+    "STOCH_14": {
+        "kind": "stochastic",
+        "params": {"k_period": 14, "d_period": 3},
+        "depends_on": [],
+        "columns": {"value": "stoch_k", "d": "stoch_d"},
+    },
+    "OBV": {"kind": "obv", "params": {}, "depends_on": [], "columns": {"value": "obv"}},
+    "VWAP_20": {"kind": "vwap", "params": {"period": 20}, "depends_on": [], "columns": {"value": "vwap_20"}},
+    "ADX_14": {
+        "kind": "adx",
+        "params": {"period": 14},
+        "depends_on": [],
+        "columns": {"value": "adx_14", "plus_di": "plus_di_14", "minus_di": "minus_di_14"},
+    },
+    "KC_20": {
+        "kind": "keltner",
+        "params": {"multiplier": 2.0},
+        "depends_on": ["EMA_20", "ATR_10"],
+        "columns": {"value": "kc_middle", "upper": "kc_upper", "lower": "kc_lower"},
+    },
+    "DC_20": {
+        "kind": "donchian",
+        "params": {"period": 20},
+        "depends_on": [],
+        "columns": {"value": "dc_middle", "upper": "dc_upper", "lower": "dc_lower"},
+    },
+}
+
+# Series written by a full (nightly / on-demand) recompute
+DEFAULT_INDICATORS: List[str] = list(INDICATOR_REGISTRY.keys())
+
+# Upper bound on any period of a parameterized indicator
+_MAX_PERIOD = 1000
+
+# name pattern -> spec builder for parameterized indicators (integer groups)
+_PARAMETRIC: List[Tuple[re.Pattern, Callable[..., Dict[str, Any]]]] = [
+    (re.compile(r"^SMA_(\d+)$"), lambda p: {"kind": "sma", "params": {"period": p}, "depends_on": []}),
+    (re.compile(r"^EMA_(\d+)$"), lambda p: {"kind": "ema", "params": {"period": p}, "depends_on": []}),
+    (re.compile(r"^RSI_(\d+)$"), lambda p: {"kind": "rsi", "params": {"period": p}, "depends_on": []}),
+    (re.compile(r"^ATR_(\d+)$"), lambda p: {"kind": "atr", "params": {"period": p}, "depends_on": []}),
+    (
+        re.compile(r"^BB_(\d+)$"),
+        lambda p: {"kind": "bollinger", "params": {"period": p, "num_std": 2.0}, "depends_on": [f"SMA_{p}"]},
+    ),
+    (
+        re.compile(r"^STOCH_(\d+)$"),
+        lambda p: {"kind": "stochastic", "params": {"k_period": p, "d_period": 3}, "depends_on": []},
+    ),
+    (re.compile(r"^VWAP_(\d+)$"), lambda p: {"kind": "vwap", "params": {"period": p}, "depends_on": []}),
+    (re.compile(r"^ADX_(\d+)$"), lambda p: {"kind": "adx", "params": {"period": p}, "depends_on": []}),
+    (
+        re.compile(r"^KC_(\d+)$"),
+        lambda p: {"kind": "keltner", "params": {"multiplier": 2.0}, "depends_on": [f"EMA_{p}", "ATR_10"]},
+    ),
+    (re.compile(r"^DC_(\d+)$"), lambda p: {"kind": "donchian", "params": {"period": p}, "depends_on": []}),
+    (
+        re.compile(r"^MACD_(\d+)_(\d+)_(\d+)$"),
+        lambda fast, slow, signal: {
+            "kind": "macd",
+            "params": {"signal_period": signal},
+            "depends_on": [f"EMA_{fast}", f"EMA_{slow}"],
+        },
+    ),
+]
+
+
+def is_registered(indicator_type: str) -> bool:
+    """Whether an indicator name is known to the registry."""
+    return indicator_type in INDICATOR_REGISTRY
+
+
+def indicator_spec(indicator_type: str) -> Optional[Dict[str, Any]]:
+    """Registry entry, or parsed spec of a parameterized name; None if unsupported."""
+    spec = INDICATOR_REGISTRY.get(indicator_type)
+    if spec is not None:
+        return spec
+    for pattern, build in _PARAMETRIC:
+        match = pattern.match(indicator_type)
+        if match:
+            periods = [int(g) for g in match.groups()]
+            if all(1 <= p <= _MAX_PERIOD for p in periods):
+                return build(*periods)
+    return None
+
+
+def is_supported(indicator_type: str) -> bool:
+    """Whether an indicator can be computed (registered or parameterized)."""
+    return indicator_spec(indicator_type) is not None
+
+
+def storage_columns(indicator_type: str) -> Dict[str, str]:
+    """Output name ("value", "signal", ...) -> IndicatorBar column for an indicator."""
+    return INDICATOR_REGISTRY[indicator_type]["columns"]
+
+
+def first_defined_index(indicator_type: str) -> int:
+    """Index (from the start of history) of an indicator's first non-warm-up point."""
+    spec = indicator_spec(indicator_type)
+    dep = max((first_defined_index(d) for d in spec["depends_on"]), default=0)
+    return _FIRST_DEFINED[spec["kind"]](dep, **spec["params"])
+
+
+def can_be_undefined(indicator_type: str) -> bool:
+    """Whether an indicator can lack a value past its warm-up (see _DATA_UNDEFINED)."""
+    spec = indicator_spec(indicator_type)
+    return spec["kind"] in _DATA_UNDEFINED or any(can_be_undefined(d) for d in spec["depends_on"])
+
+
+def warmup_bars(indicator_types: Iterable[str]) -> int:
+    """Bars of lookback needed before recomputing any of these indicators mid-history."""
+
+    def warmup(name: str) -> int:
+        spec = indicator_spec(name)
+        dep = max((warmup(d) for d in spec["depends_on"]), default=0)
+        return _WARMUP[spec["kind"]](dep, **spec["params"])
+
+    return max((warmup(name) for name in indicator_types), default=0)
+
+
+def lookback_start(start_date: date, warmup: int, interval: str = "daily") -> Optional[date]:
+    """
+    Calendar date early enough to hold `warmup` bars of `interval` before
+    start_date (weekends and holidays included); None when that reaches
+    past any history.
+    """
+    days = int(warmup * _CALENDAR_DAYS_PER_BAR.get(interval, _CALENDAR_DAYS_PER_BAR["daily"])) + 10
+    if days >= (start_date - date.min).days:
+        return None
+    return start_date - timedelta(days=days)
+
+
+def resolve_plan(indicator_types: Iterable[str]) -> List[str]:
+    """
+    Resolve requested indicators to every series that must be computed,
+    dependencies first, each exactly once. Raises ValueError for unsupported names.
+    """
+    plan: List[str] = []
+    visiting: set = set()
+
+    def visit(name: str) -> None:
+        if name in plan:
+            return
+        if name in visiting:
+            raise ValueError(f"Indicator dependency cycle at {name}")
+        spec = indicator_spec(name)
+        if spec is None:
+            raise ValueError(f"Unknown indicator: {name}")
+        visiting.add(name)
+        for dep in spec["depends_on"]:
+            visit(dep)
+        visiting.discard(name)
+        plan.append(name)
+
+    for name in indicator_types:
+        visit(name)
+    return plan
+
+
+def compute_indicators(
+    bars: BarArrays, indicator_types: Optional[Iterable[str]] = None
+) -> Dict[str, IndicatorSeries]:
+    """
+    Compute the requested indicators (default: DEFAULT_INDICATORS) from bar arrays.
+    Intermediates pulled in only as dependencies are not returned.
+    """
+    requested = list(indicator_types) if indicator_types is not None else DEFAULT_INDICATORS
+    computed: Dict[str, IndicatorSeries] = {}
+
+    for name in resolve_plan(requested):
+        spec = indicator_spec(name)
+        deps = [computed[dep][0] for dep in spec["depends_on"]]
+        computed[name] = _KERNELS[spec["kind"]](bars, deps, **spec["params"])
+
+    return {name: computed[name] for name in requested}
@@ -0,0 +1,222 @@
+"""
+Streaming Indicator Service
+
+Incremental counterparts of the technical_analysis kernels. Each indicator
+keeps a small JSON-serializable state dict and advances by exactly one bar,
+so a new or revised bar costs O(1) (O(period) for the Bollinger variance)
+instead of a full-history recompute.
+
+No database dependencies - persistence lives in indicator_compute.
+"""
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (value, extra outputs such as MACD signal/histogram) for one bar
+IndicatorOutput = Tuple[Optional[float], Optional[Dict[str, Optional[float]]]]
+
+
+def _sma_init(period: int) -> Dict[str, Any]:
+    return {"period": period, "window": [], "sum": 0.0}
+
+
+def _sma_step(state: Dict[str, Any], x: float) -> Optional[float]:
+    period = state["period"]
+    window = state["window"]
+    window.append(x)
+    state["sum"] += x
+    if len(window) > period:
+        state["sum"] -= window.pop(0)
+    if len(window) < period:
+        return None
+    return state["sum"] / period
+
+
+def _ema_init(period: int) -> Dict[str, Any]:
+    return {"period": period, "seed": [], "value": None}
+
+
+def _ema_step(state: Dict[str, Any], x: float) -> Optional[float]:
+    period = state["period"]
+    if state["value"] is None:
+        # Warm-up: seed with the SMA of the first `period` values
+        state["seed"].append(x)
+        if len(state["seed"]) < period:
+            return None
+        state["value"] = sum(state["seed"]) / period
+        state["seed"] = []
+        return state["value"]
+
+    state["value"] = (x - state["value"]) * (2.0 / (period + 1)) + state["value"]
+    return state["value"]
+
+
+def _rsi_init(period: int) -> Dict[str, Any]:
+    return {
+        "period": period,
+        "prev_close": None,
+        "gains": [],
+        "losses": [],
+        "avg_gain": None,
+        "avg_loss": None,
+    }
+
+
+def _rsi_step(state: Dict[str, Any], x: float) -> Optional[float]:
+    period = state["period"]
+    prev_close = state["prev_close"]
+    state["prev_close"] = x
+    if prev_close is None:
+        return None
+
+    change = x - prev_close
+    gain = change if change > 0 else 0.0
+    loss = -change if change < 0 else 0.0
+
+    if state["avg_gain"] is None:
+        state["gains"].append(gain)
+        state["losses"].append(loss)
+        if len(state["gains"]) < period:
+            return None
+        state["avg_gain"] = sum(state["gains"]) / period
+        state["avg_loss"] = sum(state["losses"]) / period
+        state["gains"] = []
+        state["losses"] = []
+    else:
+        # Wilder's smoothing
+        state["avg_gain"] = (state["avg_gain"] * (period - 1) + gain) / period
+        state["avg_loss"] = (state["avg_loss"] * (period - 1) + loss) / period
+
+    if state["avg_loss"] == 0:
+        return 100.0
+    rs = state["avg_gain"] / state["avg_loss"]
+    return 100.0 - (100.0 / (1.0 + rs))
+
+
+def _macd_init(fast_period: int, slow_period: int, signal_period: int) -> Dict[str, Any]:
+    return {
+        "fast": _ema_init(fast_period),
+        "slow": _ema_init(slow_period),
+        "signal": _ema_init(signal_period),
+    }
+
+
+def _macd_step(
+    state: Dict[str, Any], x: float
+) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    fast = _ema_step(state["fast"], x)
+    slow = _ema_step(state["slow"], x)
+    if fast is None or slow is None:
+        return (None, None, None)
+
+    macd_value = fast - slow
+    signal = _ema_step(state["signal"], macd_value)
+    histogram = macd_value - signal if signal is not None else None
+    return (macd_value, signal, histogram)
+
+
+def _bollinger_init(period: int, num_std: float) -> Dict[str, Any]:
+    return {"period": period, "num_std": num_std, "window": []}
+
+
+def _bollinger_step(
+    state: Dict[str, Any], x: float
+) -> Tuple[Optional[float], Optional[float], Optional[float]]:
+    period = state["period"]
+    window = state["window"]
+    window.append(x)
+    if len(window) > period:
+        window.pop(0)
+    if len(window) < period:
+        return (None, None, None)
+
+    mean = sum(window) / period
+    variance = sum((p - mean) ** 2 for p in window) / period
+    std_dev = variance ** 0.5
+    return (mean + state["num_std"] * std_dev, mean, mean - state["num_std"] * std_dev)
+
+
+def _atr_init(period: int) -> Dict[str, Any]:
+    return {"prev_close": None, "true_range": _sma_init(period)}
+
+
+def _atr_step(state: Dict[str, Any], high: float, low: float, close: float) -> Optional[float]:
+    prev_close = state["prev_close"]
+    state["prev_close"] = close
+    if prev_close is None:
+        return None
+
+    true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+    return _sma_step(state["true_range"], true_range)
+
+
+def _single(value: Optional[float]) -> IndicatorOutput:
+    return (value, None)
+
+
+def _macd_output(values: Tuple[Optional[float], Optional[float], Optional[float]]) -> IndicatorOutput:
+    macd_value, signal, histogram = values
+    if macd_value is None:
+        return (None, None)
+    return (macd_value, {"signal": signal, "histogram": histogram})
+
+
+def _bollinger_output(values: Tuple[Optional[float], Optional[float], Optional[float]]) -> IndicatorOutput:
+    upper, middle, lower = values
+    if middle is None:
+        return (None, None)
+    return (middle, {"upper": upper, "lower": lower})
+
+
+# indicator_type -> (state factory, step taking (state, bar) -> (value, parameters)).
+# Periods mirror the series written by compute_and_store_indicators.
+STREAMING_INDICATORS: Dict[
+    str, Tuple[Callable[[], Dict[str, Any]], Callable[[Dict[str, Any], Dict[str, float]], IndicatorOutput]]
+] = {
+    **{
+        f"SMA_{period}": (
+            lambda period=period: _sma_init(period),
+            lambda state, bar: _single(_sma_step(state, bar["close"])),
+        )
+        for period in (20, 50, 200)
+    },
+    **{
+        f"EMA_{period}": (
+            lambda period=period: _ema_init(period),
+            lambda state, bar: _single(_ema_step(state, bar["close"])),
+        )
+        for period in (12, 26, 50)
+    },
+    "RSI_14": (
+        lambda: _rsi_init(14),
+        lambda state, bar: _single(_rsi_step(state, bar["close"])),
+    ),
+    "MACD": (
+        lambda: _macd_init(12, 26, 9),
+        lambda state, bar: _macd_output(_macd_step(state, bar["close"])),
+    ),
+    "BB_20": (
+        lambda: _bollinger_init(20, 2.0),
+        lambda state, bar: _bollinger_output(_bollinger_step(state, bar["close"])),
+    ),
+    "ATR_14": (
+        lambda: _atr_init(14),
+        lambda state, bar: _single(_atr_step(state, bar["high"], bar["low"], bar["close"])),
+    ),
+}
+
+
+def init_state(indicator_type: str) -> Dict[str, Any]:
+    """Return a fresh (empty) streaming state for an indicator."""
+    factory, _ = STREAMING_INDICATORS[indicator_type]
+    return factory()
+
+
+def advance_state(indicator_type: str, state: Dict[str, Any], bar: Dict[str, float]) -> IndicatorOutput:
+    """
+    Advance an indicator state by one bar (dict with high, low, close).
+    Mutates `state` in place and returns (value, parameters) for that bar.
+    """
+    _, step = STREAMING_INDICATORS[indicator_type]
+    return step(state, bar)
@@ -0,0 +1,210 @@
+"""
+Pattern Scanner Service
+
+Evaluates a library of candlestick / price patterns over the whole universe
+at once. Daily bars for every ticker are loaded in one query into
+(tickers, bars) OHLC matrices on a shared date axis (NaN where a ticker has
+no bar), and each pattern is a vectorized boolean mask over those matrices,
+so a scan costs a handful of array operations rather than a per-ticker loop.
+
+Comparisons against NaN are False, so a missing bar never matches.
+"""
+import logging
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models import PriceBar
+from app.services.indicator_registry import lookback_start
+from app.services.price_matrix import load_bar_matrices
+from app.services.technical_analysis import rolling_max_array, rolling_min_array
+
+logger = logging.getLogger(__name__)
+
+# Bars in a 52-week range
+_YEAR_BARS = 252
+
+# Doji: body at most this fraction of the bar's range
+_DOJI_BODY_RATIO = 0.1
+
+# Hammer / shooting star: long shadow at least this multiple of the body
+_SHADOW_BODY_RATIO = 2.0
+
+_OHLC_FIELDS = ("opens", "highs", "lows", "closes")
+
+# OHLC matrices, each (tickers, bars)
+Matrices = Dict[str, np.ndarray]
+
+
+def _previous(values: np.ndarray) -> np.ndarray:
+    """The prior bar's value at each position along the bar axis (NaN for the first)."""
+    out = np.full(values.shape, np.nan, dtype=np.float64)
+    out[:, 1:] = values[:, :-1]
+    return out
+
+
+def _prior_extreme(values: np.ndarray, period: int, highest: bool) -> np.ndarray:
+    """
+    Highest/lowest value over the `period` bars before each position; NaN
+    when the ticker has no bar at the start of that window.
+    """
+    if highest:
+        rolled = rolling_max_array(np.where(np.isnan(values), -np.inf, values), period)
+    else:
+        rolled = rolling_min_array(np.where(np.isnan(values), np.inf, values), period)
+    prior = _previous(rolled)
+    prior[:, period:][np.isnan(values[:, :-period])] = np.nan
+    return prior
+
+
+def bullish_engulfing(m: Matrices) -> np.ndarray:
+    """A bullish body that engulfs the prior bar's bearish body."""
+    prev_open, prev_close = _previous(m["opens"]), _previous(m["closes"])
+    return (
+        (prev_close < prev_open)
+        & (m["closes"] > m["opens"])
+        & (m["opens"] <= prev_close)
+        & (m["closes"] >= prev_open)
+    )
+
+
+def bearish_engulfing(m: Matrices) -> np.ndarray:
+    """A bearish body that engulfs the prior bar's bullish body."""
+    prev_open, prev_close = _previous(m["opens"]), _previous(m["closes"])
+    return (
+        (prev_close > prev_open)
+        & (m["closes"] < m["opens"])
+        & (m["opens"] >= prev_close)
+        & (m["closes"] <= prev_open)
+    )
+
+
+def hammer(m: Matrices) -> np.ndarray:
+    """Small body near the high with a long lower shadow."""
+    body = np.abs(m["closes"] - m["opens"])
+    lower = np.minimum(m["opens"], m["closes"]) - m["lows"]
+    upper = m["highs"] - np.maximum(m["opens"], m["closes"])
+    return (body > 0) & (lower >= _SHADOW_BODY_RATIO * body) & (upper <= body)
+
+
+def shooting_star(m: Matrices) -> np.ndarray:
+    """Small body near the low with a long upper shadow."""
+    body = np.abs(m["closes"] - m["opens"])
+    lower = np.minimum(m["opens"], m["closes"]) - m["lows"]
+    upper = m["highs"] - np.maximum(m["opens"], m["closes"])
+    return (body > 0) & (upper >= _SHADOW_BODY_RATIO * body) & (lower <= body)
+
+
+def doji(m: Matrices) -> np.ndarray:
+    """Open and close (nearly) equal relative to the bar's range."""
+    span = m["highs"] - m["lows"]
+    return (span > 0) & (np.abs(m["closes"] - m["opens"]) <= _DOJI_BODY_RATIO * span)
+
+
+def gap_up(m: Matrices) -> np.ndarray:
+    """The whole bar trades above the prior bar's high."""
+    return m["lows"] > _previous(m["highs"])
+
+
+def gap_down(m: Matrices) -> np.ndarray:
+    """The whole bar trades below the prior bar's low."""
+    return m["highs"] < _previous(m["lows"])
+
+
+def breakout_52w(m: Matrices) -> np.ndarray:
+    """Close above the highest high of the prior 52 weeks."""
+    return m["closes"] > _prior_extreme(m["highs"], _YEAR_BARS, highest=True)
+
+
+def breakdown_52w(m: Matrices) -> np.ndarray:
+    """Close below the lowest low of the prior 52 weeks."""
+    return m["closes"] < _prior_extreme(m["lows"], _YEAR_BARS, highest=False)
+
+
+# pattern name -> (mask over OHLC matrices, bars of history needed before the scanned bar)
+PATTERNS: Dict[str, Tuple[Callable[[Matrices], np.ndarray], int]] = {
+    "bullish_engulfing": (bullish_engulfing, 1),
+    "bearish_engulfing": (bearish_engulfing, 1),
+    "hammer": (hammer, 0),
+    "shooting_star": (shooting_star, 0),
+    "doji": (doji, 0),
+    "gap_up": (gap_up, 1),
+    "gap_down": (gap_down, 1),
+    "breakout_52w": (breakout_52w, _YEAR_BARS),
+    "breakdown_52w": (breakdown_52w, _YEAR_BARS),
+}
+
+
+def load_ohlc_matrices(
+    db: Session,
+    start_date: Optional[date],
+    end_date: date,
+    tickers: Optional[List[str]] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Load daily bars dated start_date..end_date for the universe (or the
+    given tickers), stitched with archived bars. Returns {tickers,
+    timestamps (datetime64), opens, highs, lows, closes} with (tickers,
+    bars) float64 matrices, or None when there are no bars.
+    """
+    return load_bar_matrices(db, start_date, end_date, tickers, _OHLC_FIELDS)
+
+
+def scan_patterns(
+    db: Session,
+    patterns: Optional[List[str]] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    tickers: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Find every (ticker, bar) dated start_date..end_date that matches one of
+    `patterns` (default: all). Without dates, scans the latest bar in the
+    database. Bars before start_date are loaded only as pattern history.
+    """
+    patterns = [p for p in (patterns or list(PATTERNS)) if p in PATTERNS]
+    if end_date is None:
+        latest = db.query(PriceBar.timestamp).filter(PriceBar.interval == "daily")
+        if tickers:
+            latest = latest.filter(PriceBar.ticker.in_([t.upper() for t in tickers]))
+        latest = latest.order_by(PriceBar.timestamp.desc()).first()
+        end_date = latest[0].date() if latest else date.today()
+    if start_date is None:
+        start_date = end_date
+
+    started = time.perf_counter()
+    history = max((PATTERNS[p][1] for p in patterns), default=0)
+    data = load_ohlc_matrices(db, lookback_start(start_date, history + 1), end_date, tickers)
+
+    matches: List[Dict[str, Any]] = []
+    if data is not None and patterns:
+        window = data["timestamps"] >= np.datetime64(datetime.combine(start_date, datetime.min.time()))
+        for pattern in patterns:
+            mask, _ = PATTERNS[pattern]
+            rows, cols = np.nonzero(mask(data) & window)
+            for row, col in zip(rows.tolist(), cols.tolist()):
+                matches.append(
+                    {
+                        "ticker": str(data["tickers"][row]),
+                        "pattern": pattern,
+                        "timestamp": data["timestamps"][col].item().isoformat(),
+                        "close": float(data["closes"][row, col]),
+                    }
+                )
+    # Newest bar first, then by ticker
+    matches.sort(key=lambda m: (m["ticker"], m["pattern"]))
+    matches.sort(key=lambda m: m["timestamp"], reverse=True)
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Scanned {len(patterns)} patterns: {len(matches)} matches in {elapsed:.2f}s")
+    return {
+        "start": start_date.isoformat(),
+        "end": end_date.isoformat(),
+        "patterns": patterns,
+        "tickers_scanned": 0 if data is None else len(data["tickers"]),
+        "elapsed_seconds": round(elapsed, 3),
+        "matches": matches,
+    }
@@ -0,0 +1,138 @@
+"""
+Price Archive Service
+
+Cold tier for historical bars. Bars older than
+settings.PRICE_ARCHIVE_AFTER_DAYS move out of price_bars into one
+fixed-width binary file per (ticker, interval) that is opened with
+numpy.memmap, so reading years of history is a slice of the page cache
+rather than a row-by-row database read.
+
+File layout (<PRICE_ARCHIVE_DIR>/<interval>/<TICKER>.bars), little-endian
+8-byte words: a magic word and the bar count n, then n timestamps (int64
+microseconds since the epoch, naive UTC, ascending) followed by n opens,
+highs, lows, closes and volumes (float64; missing volume is NaN). Files
+are rewritten whole and swapped in with os.replace, so a reader sees
+either the old or the new archive; existing maps keep the old file.
+
+Readers stitch the archive with the rows still in price_bars through
+merge_bars (database rows win on equal timestamps). No database
+dependencies - moving bars into the archive is
+price_history.archive_cold_bars.
+"""
+import logging
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Array fields of an archived series, besides "timestamps" (same as price_cache.PRICE_FIELDS)
+_FIELDS = ("opens", "highs", "lows", "closes", "volumes")
+
+_MAGIC = np.frombuffer(b"QVBARS01", dtype="<i8")[0]
+_HEADER_WORDS = 2
+
+
+def archive_path(ticker: str, interval: str) -> str:
+    return os.path.join(settings.PRICE_ARCHIVE_DIR, interval, f"{ticker.upper()}.bars")
+
+
+def archived_tickers(interval: str) -> List[str]:
+    """Tickers with an archive file for an interval."""
+    try:
+        names = os.listdir(os.path.join(settings.PRICE_ARCHIVE_DIR, interval))
+    except FileNotFoundError:
+        return []
+    return sorted(name[: -len(".bars")] for name in names if name.endswith(".bars"))
+
+
+def read_archive(ticker: str, interval: str) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Memory-map a ticker's archived bars as read-only arrays (timestamps +
+    opens/highs/lows/closes/volumes). None when nothing is archived.
+    """
+    path = archive_path(ticker, interval)
+    try:
+        words = np.memmap(path, dtype="<i8", mode="r")
+    except (FileNotFoundError, ValueError):
+        # ValueError: an empty file cannot be mapped
+        return None
+    if len(words) < _HEADER_WORDS or words[0] != _MAGIC:
+        logger.warning(f"Ignoring malformed price archive {path}")
+        return None
+
+    n = int(words[1])
+    out = {"timestamps": words[_HEADER_WORDS : _HEADER_WORDS + n].view("datetime64[us]")}
+    prices = words[_HEADER_WORDS + n : _HEADER_WORDS + 6 * n].view("<f8").reshape(5, n)
+    for field, values in zip(_FIELDS, prices):
+        out[field] = values
+    return out
+
+
+def archived_bars(
+    ticker: str, interval: str, start: Optional[datetime] = None, end: Optional[datetime] = None
+) -> Optional[Dict[str, np.ndarray]]:
+    """Archived bars timestamped start..end (inclusive, either open) as zero-copy views."""
+    archive = read_archive(ticker, interval)
+    if archive is None:
+        return None
+    timestamps = archive["timestamps"]
+    lo = 0 if start is None else int(np.searchsorted(timestamps, np.datetime64(start, "us"), "left"))
+    hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, np.datetime64(end, "us"), "right"))
+    return {field: values[lo:hi] for field, values in archive.items()}
+
+
+def write_archive(ticker: str, interval: str, bars: Dict[str, np.ndarray]) -> int:
+    """Replace a ticker's archive with `bars` (time-ordered). Returns the bar count."""
+    n = len(bars["timestamps"])
+    words = np.empty(_HEADER_WORDS + 6 * n, dtype="<i8")
+    words[0] = _MAGIC
+    words[1] = n
+    words[_HEADER_WORDS : _HEADER_WORDS + n] = bars["timestamps"].astype("datetime64[us]").view(np.int64)
+    prices = words[_HEADER_WORDS + n :].view("<f8").reshape(5, n)
+    for row, field in zip(prices, _FIELDS):
+        row[:] = bars[field]
+
+    path = archive_path(ticker, interval)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(words.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return n
+
+
+def merge_bars(
+    archived: Optional[Dict[str, np.ndarray]], hot: Optional[Dict[str, np.ndarray]]
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Stitch archived and database bars into one time-ordered series; a
+    database bar replaces an archived bar with the same timestamp. When
+    either side is empty the other is returned as is (no copy).
+    """
+    if archived is None or not len(archived["timestamps"]):
+        return hot
+    if hot is None or not len(hot["timestamps"]):
+        return archived
+
+    if hot["timestamps"][0] > archived["timestamps"][-1]:
+        # The usual case: the database holds only bars newer than the archive
+        return {field: np.concatenate((archived[field], hot[field])) for field in archived}
+
+    keep = ~np.isin(archived["timestamps"], hot["timestamps"])
+    merged = {field: np.concatenate((archived[field][keep], hot[field])) for field in archived}
+    order = np.argsort(merged["timestamps"], kind="stable")
+    return {field: values[order] for field, values in merged.items()}
@@ -0,0 +1,357 @@
+"""
+Price Series Cache
+
+Process-level columnar cache of each (ticker, interval) price history as
+contiguous NumPy arrays: timestamps (datetime64[us], UTC) plus
+open/high/low/close/volume (float64). Every price read path (chart history,
+indicators, risk) goes through it, so a hot ticker is read from the
+database once. Weekly and monthly series are resampled from the cached
+daily series rather than read from the database. Archived (cold) bars are
+stitched in from their memory-mapped files; a ticker with no bars left in
+the database is served straight from the map.
+
+Callers get read-only views: whole-history arrays or a date range sliced
+without copying. Writers in this process keep entries current -
+upsert_today_bar appends the new bar or swaps in a copy with the last bar
+revised (views already handed out never change), anything else
+that rewrites history invalidates the entry, and any daily write drops
+the series resampled from it. Entries are evicted least-recently-used
+once the cache grows past settings.PRICE_CACHE_MAX_MB.
+
+Writers that rewrite history also stamp it in price_revisions
+(mark_history_revised); every process polls those stamps at most every
+settings.PRICE_CACHE_REVISION_CHECK_SECONDS and drops the series another
+process (the import CLI, another server worker) rewrote.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.core.bulk import bulk_upsert
+from app.models import PriceBar, PriceRevision
+from app.services.price_archive import merge_bars, read_archive
+from app.services.resampling import RESAMPLED_INTERVALS, SOURCE_INTERVAL, is_resampled, resample_bars
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+_MAX_BYTES = settings.PRICE_CACHE_MAX_MB * 1024 * 1024
+
+# Array fields of a series, besides "timestamps"
+PRICE_FIELDS = ("opens", "highs", "lows", "closes", "volumes")
+
+# Spare capacity allocated when a series grows by appends
+_GROWTH_FACTOR = 1.5
+_MIN_SPARE = 16
+
+# (ticker, interval) -> {"length": bars in use, "buffers": field -> array with spare capacity},
+# most recently used last
+_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_cache_bytes = 0
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "appends": 0, "revisions": 0, "invalidations": 0}
+_lock = threading.Lock()
+
+_REVISION_CHECK_SECONDS = settings.PRICE_CACHE_REVISION_CHECK_SECONDS
+# Stamps up to this much older than the newest one seen are re-read: a
+# writer stamps before it commits, so commits can land out of stamp order
+_REVISION_OVERLAP = timedelta(minutes=5)
+
+# (ticker, interval) -> history revision this process has acted on
+_revisions: Dict[Tuple[str, str], datetime] = {}
+# Last poll of price_revisions (monotonic) and the newest stamp seen
+_revision_poll: Dict[str, Any] = {"at": None, "newest": datetime.utcnow()}
+
+
+def to_datetime64(timestamps: List[datetime]) -> np.ndarray:
+    """Convert database timestamps (naive or aware) to a naive-UTC datetime64[us] array."""
+    return np.array(
+        [ts if ts.tzinfo is None else ts.astimezone(timezone.utc).replace(tzinfo=None) for ts in timestamps],
+        dtype="datetime64[us]",
+    )
+
+
+def range_bounds(timestamps: np.ndarray, start_date: Optional[date], end_date: Optional[date]) -> Tuple[int, int]:
+    """[lo, hi) positions of the bars dated start_date..end_date (inclusive, either open)."""
+    lo = 0
+    hi = len(timestamps)
+    if start_date is not None:
+        lo = int(np.searchsorted(timestamps, np.datetime64(datetime.combine(start_date, datetime.min.time())), "left"))
+    if end_date is not None:
+        hi = int(np.searchsorted(timestamps, np.datetime64(datetime.combine(end_date, datetime.max.time())), "right"))
+    return lo, max(lo, hi)
+
+
+def _entry_bytes(entry: Dict[str, Any]) -> int:
+    return sum(buf.nbytes for buf in entry["buffers"].values())
+
+
+def _views(entry: Dict[str, Any], lo: int = 0, hi: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Read-only views of an entry's arrays over [lo, hi)."""
+    hi = entry["length"] if hi is None else hi
+    out = {}
+    for field, buf in entry["buffers"].items():
+        view = buf[lo:hi]
+        view.flags.writeable = False
+        out[field] = view
+    return out
+
+
+def load_bar_rows(rows: List[Tuple]) -> Optional[Dict[str, np.ndarray]]:
+    """(timestamp, open, high, low, close, volume) rows as bar arrays; None when empty."""
+    if not rows:
+        return None
+    timestamps, opens, highs, lows, closes, volumes = zip(*rows)
+    return {
+        "timestamps": to_datetime64(timestamps),
+        "opens": np.array(opens, dtype=np.float64),
+        "highs": np.array(highs, dtype=np.float64),
+        "lows": np.array(lows, dtype=np.float64),
+        "closes": np.array(closes, dtype=np.float64),
+        # Missing volume is stored as NaN
+        "volumes": np.array(volumes, dtype=np.float64),
+    }
+
+
+def _load_entry(db: Session, ticker: str, interval: str) -> Optional[Dict[str, Any]]:
+    """Load a ticker's whole history: archived bars plus one tuple query for the rest."""
+    rows = (
+        db.query(PriceBar.timestamp, PriceBar.open, PriceBar.high, PriceBar.low, PriceBar.close, PriceBar.volume)
+        .filter(PriceBar.ticker == ticker, PriceBar.interval == interval)
+        .order_by(PriceBar.timestamp.asc())
+        .all()
+    )
+    buffers = merge_bars(read_archive(ticker, interval), load_bar_rows(rows))
+    if buffers is None:
+        return None
+    return {"length": len(buffers["timestamps"]), "buffers": buffers}
+
+
+def _store_entry(key: Tuple[str, str], entry: Dict[str, Any]) -> None:
+    """Insert or replace an entry and evict down to the budget. Caller holds _lock."""
+    global _cache_bytes
+    previous = _cache.pop(key, None)
+    if previous is not None:
+        _cache_bytes -= _entry_bytes(previous)
+    _cache[key] = entry
+    _cache_bytes += _entry_bytes(entry)
+    while _cache_bytes > _MAX_BYTES and len(_cache) > 1:
+        _, evicted = _cache.popitem(last=False)
+        _cache_bytes -= _entry_bytes(evicted)
+        _stats["evictions"] += 1
+
+
+def _get_entry(db: Session, ticker: str, interval: str) -> Optional[Dict[str, Any]]:
+    key = (ticker.upper(), interval)
+    _sync_revisions(db)
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return entry
+        _stats["misses"] += 1
+
+    # Load outside the lock; a concurrent miss for the same key just loads twice
+    if is_resampled(interval):
+        source = _get_entry(db, key[0], SOURCE_INTERVAL)
+        if source is None:
+            return None
+        buffers = resample_bars(_views(source), interval)
+        entry = {"length": len(buffers["timestamps"]), "buffers": buffers}
+    else:
+        entry = _load_entry(db, key[0], interval)
+    if entry is None:
+        return None
+
+    if _entry_bytes(entry) > _MAX_BYTES:
+        logger.warning(f"Price series for {key[0]} exceeds the cache budget; not cached")
+        return entry
+
+    with _lock:
+        _store_entry(key, entry)
+    return entry
+
+
+def get_price_arrays(db: Session, ticker: str, interval: str = "daily") -> Optional[Dict[str, np.ndarray]]:
+    """
+    Return a ticker's full history as read-only arrays (timestamps + PRICE_FIELDS),
+    loading it on a miss. None when there are no bars.
+    """
+    entry = _get_entry(db, ticker, interval)
+    return _views(entry) if entry is not None else None
+
+
+def get_price_series(
+    db: Session,
+    ticker: str,
+    interval: str = "daily",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Return the bars dated start_date..end_date as read-only array views
+    (no copy). None when the ticker has no bars at all.
+    """
+    entry = _get_entry(db, ticker, interval)
+    if entry is None:
+        return None
+    lo, hi = range_bounds(entry["buffers"]["timestamps"][: entry["length"]], start_date, end_date)
+    return _views(entry, lo, hi)
+
+
+def append_price_bar(
+    ticker: str,
+    interval: str,
+    timestamp: datetime,
+    open: float,
+    high: float,
+    low: float,
+    close: float,
+    volume: Optional[float],
+) -> None:
+    """
+    Fold a stored bar into a cached series: appended when newer than the
+    last bar (into spare capacity no existing view covers), revised on a
+    copy of the buffers when it is the last bar, and the series is
+    invalidated otherwise. No-op for tickers that are not cached.
+    """
+    key = (ticker.upper(), interval)
+    ts = to_datetime64([timestamp])[0]
+    if interval == SOURCE_INTERVAL:
+        _invalidate_derived(key[0])
+    values = {
+        "timestamps": ts,
+        "opens": open,
+        "highs": high,
+        "lows": low,
+        "closes": close,
+        "volumes": np.nan if volume is None else volume,
+    }
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return
+        length = entry["length"]
+        last = entry["buffers"]["timestamps"][length - 1]
+
+        if ts == last:
+            # Copy-on-write: views handed out earlier keep the previous bar
+            # instead of seeing it half-revised
+            revised = {field: buf.copy() for field, buf in entry["buffers"].items()}
+            for field, value in values.items():
+                revised[field][length - 1] = value
+            _store_entry(key, {"length": length, "buffers": revised})
+            _stats["revisions"] += 1
+            return
+        if ts < last:
+            # Older history
+            _invalidate_key(key)
+            return
+
+        if length == len(entry["buffers"]["timestamps"]):
+            # Out of capacity: move to larger buffers; existing views keep the old ones
+            capacity = max(int(length * _GROWTH_FACTOR), length + _MIN_SPARE)
+            grown = {}
+            for field, buf in entry["buffers"].items():
+                new_buf = np.empty(capacity, dtype=buf.dtype)
+                new_buf[:length] = buf[:length]
+                grown[field] = new_buf
+            entry = {"length": length, "buffers": grown}
+            _store_entry(key, entry)
+
+        for field, value in values.items():
+            entry["buffers"][field][length] = value
+        entry["length"] = length + 1
+        _stats["appends"] += 1
+
+
+def _invalidate_key(key: Tuple[str, str]) -> None:
+    """Drop one entry. Caller holds _lock."""
+    global _cache_bytes
+    entry = _cache.pop(key, None)
+    if entry is not None:
+        _cache_bytes -= _entry_bytes(entry)
+        _stats["invalidations"] += 1
+
+
+def _invalidate_derived(symbol: str) -> None:
+    """Drop the series resampled from a ticker's daily bars."""
+    with _lock:
+        for interval in RESAMPLED_INTERVALS:
+            _invalidate_key((symbol, interval))
+
+
+def invalidate_price_arrays(ticker: str, interval: Optional[str] = None) -> None:
+    """
+    Drop cached series for a ticker (one interval, or all when omitted);
+    dropping the daily series also drops the series resampled from it.
+    """
+    symbol = ticker.upper()
+    with _lock:
+        for key in [k for k in _cache if k[0] == symbol and (interval is None or k[1] == interval)]:
+            _invalidate_key(key)
+    if interval == SOURCE_INTERVAL:
+        _invalidate_derived(symbol)
+
+
+def mark_history_revised(db: Session, ticker: str, interval: str = "daily") -> None:
+    """
+    Stamp a ticker's stored bars as rewritten so other processes drop their
+    cached copy (this process invalidates its own). Does not commit.
+    """
+    key = (ticker.upper(), interval)
+    revised_at = datetime.utcnow()
+    bulk_upsert(
+        db,
+        PriceRevision,
+        [{"ticker": key[0], "interval": interval, "revised_at": revised_at}],
+        ["ticker", "interval"],
+        ["revised_at"],
+    )
+    with _lock:
+        _revisions[key] = revised_at
+
+
+def _sync_revisions(db: Session) -> None:
+    """Drop cached series whose history another process stamped as rewritten (polled, not per read)."""
+    now = time.monotonic()
+    with _lock:
+        last = _revision_poll["at"]
+        if last is not None and now - last < _REVISION_CHECK_SECONDS:
+            return
+        _revision_poll["at"] = now
+        since = _revision_poll["newest"] - _REVISION_OVERLAP
+
+    with db.no_autoflush:
+        rows = (
+            db.query(PriceRevision.ticker, PriceRevision.interval, PriceRevision.revised_at)
+            .filter(PriceRevision.revised_at > since)
+            .all()
+        )
+
+    stale = []
+    with _lock:
+        for ticker, interval, revised_at in rows:
+            if revised_at.tzinfo is not None:
+                revised_at = revised_at.astimezone(timezone.utc).replace(tzinfo=None)
+            if _revisions.get((ticker, interval)) != revised_at:
+                _revisions[(ticker, interval)] = revised_at
+                stale.append((ticker, interval))
+            _revision_poll["newest"] = max(_revision_poll["newest"], revised_at)
+    for ticker, interval in stale:
+        invalidate_price_arrays(ticker, interval)
+
+
+def price_cache_stats() -> Dict[str, Any]:
+    """Hit/miss/eviction counters and current size of the cache."""
+    with _lock:
+        return {**_stats, "entries": len(_cache), "bytes": _cache_bytes, "max_bytes": _MAX_BYTES}
@@ -1,67 +1,108 @@
+import asyncio
+import json
 import logging
 import time
-from datetime import date, datetime, timedelta
-from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
 
-import requests
+import httpx
+import numpy as np
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
-from app.models import PriceBar, Security
+from app.core.bulk import bulk_insert_missing, bulk_upsert
+from app.models import PriceBar, PriceWatermark, Security
+from app.services.alpha_vantage import api_configured, async_client, request_json, request_json_async
+from app.services.indicator_compute import (
+    advance_indicators,
+    invalidate_indicator_bars,
+    invalidate_resampled_indicators,
+    reset_indicator_states,
+)
+from app.services.downsampling import downsample_indices
+from app.services.price_archive import archived_bars, merge_bars, read_archive, write_archive
+from app.services.price_cache import (
+    append_price_bar,
+    get_price_series,
+    invalidate_price_arrays,
+    load_bar_rows,
+    mark_history_revised,
+    to_datetime64,
+)
+from app.services.resampling import aggregate_bars
+from app.services.technical_analysis import to_optional_list
 
 logger = logging.getLogger(__name__)
 
 settings = get_settings()
-_API_KEY = settings.ALPHA_VANTAGE_API_KEY
-_BASE_URL = "https://www.alphavantage.co/query"
 
+# Bars encoded per chunk of a streamed history response
+STREAM_CHUNK_BARS = 5_000
 
-def _wait_for_rate_limit(last_call_ts: Optional[float]) -> float:
-    """Wait if needed to respect Alpha Vantage rate limits (12s between calls)."""
-    if last_call_ts is None:
-        return time.time()
-    elapsed = time.time() - last_call_ts
-    if elapsed < 12:
-        time.sleep(12 - elapsed)
-    return time.time()
+# Bars in an outputsize=compact payload
+_COMPACT_BARS = 100
 
+# App interval -> Alpha Vantage TIME_SERIES_INTRADAY interval
+INTRADAY_INTERVALS = {"1m": "1min", "5m": "5min", "15m": "15min", "30m": "30min", "1h": "60min"}
 
-def fetch_daily_ohlcv(ticker: str) -> Optional[List[Dict[str, Any]]]:
+# Intraday bars roll up into trading days on this exchange's calendar
+_EXCHANGE_TZ = ZoneInfo("America/New_York")
+
+# Bar ids per DELETE when moving bars into the archive (below SQLite's bound-parameter limit)
+_DELETE_CHUNK = 500
+
+
+def _daily_params(ticker: str, outputsize: str) -> Dict[str, Any]:
+    return {"function": "TIME_SERIES_DAILY_ADJUSTED", "symbol": ticker.upper().strip(), "outputsize": outputsize}
+
+
+def fetch_daily_ohlcv(
+    ticker: str, outputsize: str = "full", since: Optional[date] = None
+) -> Optional[List[Dict[str, Any]]]:
     """
     Fetch daily OHLCV data from Alpha Vantage TIME_SERIES_DAILY_ADJUSTED.
+    outputsize is "full" (20+ years) or "compact" (latest 100 bars); rows
+    dated before `since` are skipped without being parsed.
     Returns a list of dicts with keys: date, open, high, low, close, volume.
     """
-    if not _API_KEY:
+    if not api_configured():
         logger.warning("Alpha Vantage API key not configured")
         return None
+    return _parse_daily_series(ticker, request_json(_daily_params(ticker, outputsize)), since)
 
-    symbol = ticker.upper().strip()
-    params = {
-        "function": "TIME_SERIES_DAILY_ADJUSTED",
-        "symbol": symbol,
-        "apikey": _API_KEY,
-        "outputsize": "full",  # Get full history
-    }
 
-    try:
-        resp = requests.get(_BASE_URL, params=params, timeout=15)
-        if resp.status_code != 200:
-            logger.warning(f"Alpha Vantage request failed: {resp.status_code}")
-            return None
-        data = resp.json()
+async def fetch_daily_ohlcv_async(
+    client: httpx.AsyncClient, ticker: str, outputsize: str = "full", since: Optional[date] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """Async fetch_daily_ohlcv, sharing the client's rate limiter."""
+    if not api_configured():
+        logger.warning("Alpha Vantage API key not configured")
+        return None
+    return _parse_daily_series(ticker, await request_json_async(client, _daily_params(ticker, outputsize)), since)
 
-        if "Error Message" in data or "Note" in data:
-            logger.warning(
-                f"Alpha Vantage API warning: {data.get('Error Message') or data.get('Note')}"
-            )
+
+def _parse_daily_series(
+    ticker: str, data: Optional[Dict[str, Any]], since: Optional[date]
+) -> Optional[List[Dict[str, Any]]]:
+    """Bars (oldest first) from a TIME_SERIES_DAILY_ADJUSTED payload, from `since` on."""
+    if data is None:
+        return None
+    try:
+        if "Error Message" in data:
+            logger.warning(f"Alpha Vantage API warning: {data.get('Error Message')}")
             return None
 
         time_series = data.get("Time Series (Daily)") or data.get("time series (daily)")
         if not time_series:
             return None
 
+        # ISO dates compare correctly as strings
+        since_str = since.isoformat() if since is not None else None
         bars = []
         for date_str, values in time_series.items():
+            if since_str is not None and date_str < since_str:
+                continue
             try:
                 bar_date = datetime.strptime(date_str, "%Y-%m-%d").date()
                 bars.append(
@@ -81,131 +122,348 @@ def fetch_daily_ohlcv(ticker: str) -> Optional[List[Dict[str, Any]]]:
         bars.sort(key=lambda x: x["date"])
         return bars
     except Exception as e:
-        logger.error(f"Error fetching daily OHLCV for {ticker}: {e}")
+        logger.error(f"Error parsing daily OHLCV for {ticker}: {e}")
+        return None
+
+
+def get_watermark(db: Session, ticker: str, interval: str = "daily") -> Optional[datetime]:
+    """Latest bar stored from the history feed for a ticker, or None before its first backfill."""
+    row = (
+        db.query(PriceWatermark.last_timestamp)
+        .filter(PriceWatermark.ticker == ticker.upper(), PriceWatermark.interval == interval)
+        .first()
+    )
+    return row[0] if row else None
+
+
+def _advance_watermark(db: Session, ticker: str, interval: str, timestamp: datetime) -> None:
+    """Move a ticker's watermark forward to `timestamp` (never backward). Does not commit."""
+    watermark = (
+        db.query(PriceWatermark)
+        .filter(PriceWatermark.ticker == ticker.upper(), PriceWatermark.interval == interval)
+        .first()
+    )
+    if watermark is None:
+        db.add(PriceWatermark(ticker=ticker.upper(), interval=interval, last_timestamp=timestamp))
+    elif to_datetime64([watermark.last_timestamp])[0] < to_datetime64([timestamp])[0]:
+        watermark.last_timestamp = timestamp
+
+
+def _compact_since(watermark: Optional[datetime], full: bool) -> Optional[date]:
+    """The watermark date when the gap since it fits in a compact payload, else None."""
+    if watermark is None or full:
         return None
+    since = watermark.date()
+    # Business days over-count trading days, so this errs towards "full"
+    return since if np.busday_count(since, date.today()) < _COMPACT_BARS else None
+
+
+def _fetch_since_watermark(
+    ticker: str, watermark: Optional[datetime], full: bool
+) -> Tuple[Optional[List[Dict[str, Any]]], str]:
+    """
+    Fetch the bars from the watermark on: the compact payload when the gap
+    fits in it, the full history otherwise (or when forced). Returns
+    (bars, outputsize used).
+    """
+    since = _compact_since(watermark, full)
+    if since is not None:
+        bars_data = fetch_daily_ohlcv(ticker, "compact", since)
+        # The compact payload reached back to the watermark: no gap left behind
+        if bars_data and bars_data[0]["date"] <= since:
+            return bars_data, "compact"
+
+    since = watermark.date() if watermark is not None and not full else None
+    return fetch_daily_ohlcv(ticker, "full", since), "full"
+
+
+async def _fetch_since_watermark_async(
+    client: httpx.AsyncClient, ticker: str, watermark: Optional[datetime], full: bool
+) -> Tuple[Optional[List[Dict[str, Any]]], str]:
+    """Async _fetch_since_watermark."""
+    since = _compact_since(watermark, full)
+    if since is not None:
+        bars_data = await fetch_daily_ohlcv_async(client, ticker, "compact", since)
+        if bars_data and bars_data[0]["date"] <= since:
+            return bars_data, "compact"
 
+    since = watermark.date() if watermark is not None and not full else None
+    return await fetch_daily_ohlcv_async(client, ticker, "full", since), "full"
 
-def backfill_ticker(db: Session, ticker: str) -> Dict[str, Any]:
+
+def backfill_ticker(db: Session, ticker: str, full: bool = False) -> Dict[str, Any]:
     """
     Backfill historical daily bars for a ticker.
-    Skips rows that already exist (based on unique constraint).
+
+    Only bars from the ticker's watermark on are fetched and parsed, using
+    the compact payload when the gap fits in it; the first backfill (or
+    `full`) fetches and scans the whole history.
+    Skips rows that already exist: stored timestamps are read once and the
+    new bars are bulk-inserted in one transaction.
     """
     logger.info(f"Backfilling price history for {ticker}")
 
-    bars_data = fetch_daily_ohlcv(ticker)
+    watermark = get_watermark(db, ticker)
+    bars_data, outputsize = _fetch_since_watermark(ticker, watermark, full)
+    return _store_backfill(db, ticker, bars_data, outputsize)
+
+
+def _store_backfill(
+    db: Session, ticker: str, bars_data: Optional[List[Dict[str, Any]]], outputsize: str
+) -> Dict[str, Any]:
+    """Write fetched history bars that are not stored yet and advance the watermark."""
     if not bars_data:
         return {"ticker": ticker, "status": "failed", "message": "Failed to fetch data"}
 
-    inserted = 0
-    skipped = 0
+    symbol = ticker.upper()
 
-    for bar_data in bars_data:
-        # Check if already exists
-        existing = (
-            db.query(PriceBar)
-            .filter(
-                PriceBar.ticker == ticker.upper(),
-                PriceBar.interval == "daily",
-                PriceBar.timestamp == datetime.combine(bar_data["date"], datetime.min.time()),
-            )
-            .first()
-        )
+    # Existing timestamps in one query instead of one lookup per bar
+    stored = db.query(PriceBar.timestamp).filter(PriceBar.ticker == symbol, PriceBar.interval == "daily")
+    existing = set(to_datetime64([ts for (ts,) in stored]).tolist())
+    archived = read_archive(symbol, "daily")
+    if archived is not None:
+        existing.update(archived["timestamps"].tolist())
 
-        if existing:
-            skipped += 1
+    new_rows: Dict[datetime, Dict[str, Any]] = {}
+    for bar_data in bars_data:
+        timestamp = datetime.combine(bar_data["date"], datetime.min.time())
+        if timestamp in existing or timestamp in new_rows:
             continue
+        new_rows[timestamp] = {
+            "ticker": symbol,
+            "interval": "daily",
+            "timestamp": timestamp,
+            "open": bar_data["open"],
+            "high": bar_data["high"],
+            "low": bar_data["low"],
+            "close": bar_data["close"],
+            "volume": bar_data["volume"],
+        }
 
-        bar = PriceBar(
-            ticker=ticker.upper(),
-            interval="daily",
-            timestamp=datetime.combine(bar_data["date"], datetime.min.time()),
-            open=bar_data["open"],
-            high=bar_data["high"],
-            low=bar_data["low"],
-            close=bar_data["close"],
-            volume=bar_data["volume"],
-        )
-        db.add(bar)
-        inserted += 1
+    # Chunked inserts; rows written concurrently since the read are left
+    # untouched and not counted
+    inserted_keys = bulk_insert_missing(db, PriceBar, list(new_rows.values()), ["ticker", "interval", "timestamp"])
+    inserted = len(inserted_keys)
+    skipped = len(bars_data) - inserted
+    earliest_inserted: Optional[datetime] = min(ts for _, _, ts in inserted_keys) if inserted_keys else None
+    _advance_watermark(db, symbol, "daily", datetime.combine(bars_data[-1]["date"], datetime.min.time()))
+
+    if inserted:
+        # History changed underneath the stored indicators, the streaming
+        # indicator state and the weekly/monthly bars built from it
+        reset_indicator_states(db, ticker)
+        invalidate_indicator_bars(db, ticker, earliest_inserted)
+        invalidate_resampled_indicators(db, ticker, earliest_inserted)
+        mark_history_revised(db, ticker)
 
     db.commit()
+    if inserted:
+        invalidate_price_arrays(ticker, "daily")
     logger.info(f"Backfilled {ticker}: {inserted} inserted, {skipped} skipped")
     return {
         "ticker": ticker,
         "status": "success",
         "inserted": inserted,
         "skipped": skipped,
+        "outputsize": outputsize,
     }
 
 
-def backfill_all_securities(db: Session) -> Dict[str, Any]:
-    """Backfill historical data for all securities, respecting rate limits."""
-    securities = db.query(Security).order_by(Security.ticker).all()
-    results = []
-    last_call_ts: Optional[float] = None
-
-    for sec in securities:
-        last_call_ts = _wait_for_rate_limit(last_call_ts)
-        result = backfill_ticker(db, sec.ticker)
-        results.append(result)
-        last_call_ts = time.time()
+def backfill_all_securities(db: Session, full: bool = False) -> Dict[str, Any]:
+    """
+    Backfill historical data for all securities. Fetches run concurrently
+    within the shared Alpha Vantage rate limit; each ticker is written as
+    its payload arrives.
+    """
+    tickers = [t for (t,) in db.query(Security.ticker).order_by(Security.ticker)]
+    watermarks = dict(
+        db.query(PriceWatermark.ticker, PriceWatermark.last_timestamp).filter(PriceWatermark.interval == "daily")
+    )
+    results = asyncio.run(_backfill_concurrently(db, tickers, watermarks, full))
+    results.sort(key=lambda r: r["ticker"])
 
     return {
-        "total": len(securities),
+        "total": len(tickers),
         "results": results,
     }
 
 
-def get_price_history(
+async def _backfill_concurrently(
+    db: Session, tickers: List[str], watermarks: Dict[str, datetime], full: bool
+) -> List[Dict[str, Any]]:
+    async def fetch(ticker: str):
+        bars_data, outputsize = await _fetch_since_watermark_async(
+            client, ticker, watermarks.get(ticker.upper()), full
+        )
+        return ticker, bars_data, outputsize
+
+    results = []
+    async with async_client() as client:
+        # Single writer: payloads are stored here, in completion order
+        for next_done in asyncio.as_completed([fetch(t) for t in tickers]):
+            ticker, bars_data, outputsize = await next_done
+            logger.info(f"Backfilling price history for {ticker}")
+            try:
+                results.append(_store_backfill(db, ticker, bars_data, outputsize))
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Failed to store backfill for {ticker}: {e}")
+                results.append({"ticker": ticker, "status": "failed", "message": "Failed to store data"})
+    return results
+
+
+def select_price_series(
     db: Session,
     ticker: str,
     interval: str = "daily",
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-) -> List[Dict[str, Any]]:
+    max_points: Optional[int] = None,
+    downsample: str = "minmax",
+) -> Optional[Dict[str, np.ndarray]]:
     """
-    Get price history for a ticker within a date range.
-    Defaults to last 6 months if no range specified.
+    Price arrays (timestamps + PRICE_FIELDS) for a ticker within a date range.
+    Defaults to last 6 months if no range specified. With max_points, the
+    bars are downsampled on the close series (see downsampling).
     """
     if start_date is None:
         start_date = date.today() - timedelta(days=180)  # 6 months
     if end_date is None:
         end_date = date.today()
 
-    bars = (
-        db.query(PriceBar)
-        .filter(
-            PriceBar.ticker == ticker.upper(),
-            PriceBar.interval == interval,
-            PriceBar.timestamp >= datetime.combine(start_date, datetime.min.time()),
-            PriceBar.timestamp <= datetime.combine(end_date, datetime.max.time()),
-        )
-        .order_by(PriceBar.timestamp.asc())
-        .all()
-    )
+    series = get_price_series(db, ticker, interval, start_date, end_date)
+    if series is not None and max_points is not None:
+        picked = downsample_indices(series["closes"], max_points, downsample)
+        series = {field: values[picked] for field, values in series.items()}
+    return series
 
+
+def get_price_history(
+    db: Session,
+    ticker: str,
+    interval: str = "daily",
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    max_points: Optional[int] = None,
+    downsample: str = "minmax",
+) -> List[Dict[str, Any]]:
+    """
+    Get price history for a ticker within a date range, one dict per bar.
+    Defaults to last 6 months if no range specified. With max_points, the
+    bars are downsampled on the close series (see downsampling).
+    """
+    series = select_price_series(db, ticker, interval, start_date, end_date, max_points, downsample)
+    if series is None:
+        return []
+    return bar_rows(series)
+
+
+def bar_rows(series: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Price arrays as one {timestamp, open, high, low, close, volume} dict per bar."""
+    columns = zip(
+        np.datetime_as_string(series["timestamps"], unit="s").tolist(),
+        series["opens"].tolist(),
+        series["highs"].tolist(),
+        series["lows"].tolist(),
+        series["closes"].tolist(),
+        to_optional_list(series["volumes"]),
+    )
     return [
         {
-            "timestamp": bar.timestamp.isoformat(),
-            "open": bar.open,
-            "high": bar.high,
-            "low": bar.low,
-            "close": bar.close,
-            "volume": bar.volume,
+            "timestamp": timestamp,
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": volume,
         }
-        for bar in bars
+        for timestamp, open_, high, low, close, volume in columns
     ]
 
 
+def _chunks(series: Optional[Dict[str, np.ndarray]], chunk_bars: int) -> Iterator[Dict[str, np.ndarray]]:
+    """Consecutive slices (views) of at most chunk_bars bars."""
+    if series is None:
+        return
+    for lo in range(0, len(series["timestamps"]), chunk_bars):
+        yield {field: values[lo : lo + chunk_bars] for field, values in series.items()}
+
+
+def stream_ndjson(series: Optional[Dict[str, np.ndarray]], chunk_bars: int = STREAM_CHUNK_BARS) -> Iterator[str]:
+    """Price arrays as NDJSON (one bar object per line), encoded chunk_bars bars at a time."""
+    for chunk in _chunks(series, chunk_bars):
+        yield "".join(json.dumps(row) + "\n" for row in bar_rows(chunk))
+
+
+def stream_history_json(
+    series: Optional[Dict[str, np.ndarray]], ticker: str, interval: str, chunk_bars: int = STREAM_CHUNK_BARS
+) -> Iterator[str]:
+    """
+    The {ticker, interval, bars} history document, written incrementally:
+    the envelope goes out first, then the bars chunk_bars at a time.
+    """
+    yield json.dumps({"ticker": ticker, "interval": interval})[:-1] + ', "bars": ['
+    separator = ""
+    for chunk in _chunks(series, chunk_bars):
+        yield separator + ", ".join(json.dumps(row) for row in bar_rows(chunk))
+        separator = ", "
+    yield "]}"
+
+
+def epoch_seconds(timestamps: np.ndarray) -> List[int]:
+    """datetime64 (UTC) timestamps as a list of Unix epoch seconds."""
+    return timestamps.astype("datetime64[s]").astype(np.int64).tolist()
+
+
+def price_columns(series: Optional[Dict[str, np.ndarray]]) -> Dict[str, List[Any]]:
+    """
+    Columnar form of price arrays: parallel lists keyed timestamps (epoch
+    seconds), open, high, low, close and volume.
+    """
+    if series is None:
+        return {name: [] for name in ("timestamps", "open", "high", "low", "close", "volume")}
+    return {
+        "timestamps": epoch_seconds(series["timestamps"]),
+        "open": series["opens"].tolist(),
+        "high": series["highs"].tolist(),
+        "low": series["lows"].tolist(),
+        "close": series["closes"].tolist(),
+        "volume": to_optional_list(series["volumes"]),
+    }
+
+
 def upsert_today_bar(db: Session, ticker: str, quote: Dict[str, Any]) -> None:
-    """Insert or update today's daily bar from a quote."""
+    """
+    Insert or update today's daily bar from a quote. The first quote of the
+    day (or the intraday rollup) sets the open; later quotes only extend
+    the high/low and move the close.
+    """
     if not quote or quote.get("current_price") is None:
         return
 
-    today = date.today()
-    timestamp = datetime.combine(today, datetime.min.time())
+    timestamp = datetime.combine(date.today(), datetime.min.time())
+    price = float(quote["current_price"])
+    volume = float(quote.get("volume") or 0.0)
+
+    existing = _daily_bar(db, ticker, timestamp)
+    if existing:
+        _store_daily_bar(
+            db,
+            ticker,
+            timestamp,
+            existing,
+            existing.open,
+            max(existing.high, price),
+            min(existing.low, price),
+            price,
+            volume,
+        )
+    else:
+        _store_daily_bar(db, ticker, timestamp, None, price, price, price, price, volume)
+
 
-    existing = (
+def _daily_bar(db: Session, ticker: str, timestamp: datetime) -> Optional[PriceBar]:
+    return (
         db.query(PriceBar)
         .filter(
             PriceBar.ticker == ticker.upper(),
@@ -215,28 +473,292 @@ def upsert_today_bar(db: Session, ticker: str, quote: Dict[str, Any]) -> None:
         .first()
     )
 
-    price = float(quote["current_price"])
-    volume = quote.get("volume") or 0.0
 
-    if existing:
-        # Update existing bar
-        existing.open = price  # Use current price as open if we don't have intraday data
-        existing.high = max(existing.high, price)
-        existing.low = min(existing.low, price)
-        existing.close = price
-        existing.volume = float(volume)
-    else:
-        # Create new bar
-        bar = PriceBar(
-            ticker=ticker.upper(),
-            interval="daily",
-            timestamp=timestamp,
-            open=price,
-            high=price,
-            low=price,
-            close=price,
-            volume=float(volume),
-        )
+def _store_daily_bar(
+    db: Session,
+    ticker: str,
+    timestamp: datetime,
+    bar: Optional[PriceBar],
+    open: float,
+    high: float,
+    low: float,
+    close: float,
+    volume: Optional[float],
+) -> None:
+    """
+    Write one daily bar and fold it into the price cache and streaming
+    indicators. `bar` is the stored bar at `timestamp` the caller already
+    looked up, or None when there is none.
+    """
+    if bar is None:
+        bar = PriceBar(ticker=ticker.upper(), interval="daily", timestamp=timestamp)
         db.add(bar)
+    bar.open = open
+    bar.high = high
+    bar.low = low
+    bar.close = close
+    bar.volume = volume
+
+    # The weekly/monthly bars containing this day changed too
+    invalidate_resampled_indicators(db, ticker, timestamp)
+    db.commit()
+    append_price_bar(ticker, "daily", bar.timestamp, bar.open, bar.high, bar.low, bar.close, bar.volume)
+
+    # Advance streaming indicators by this bar instead of a full recompute
+    try:
+        advance_indicators(db, bar)
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Failed to advance indicators for {ticker}: {e}")
+
+
+def fetch_intraday_ohlcv(ticker: str, interval: str, outputsize: str = "compact") -> Optional[List[Dict[str, Any]]]:
+    """
+    Fetch regular-session bars from Alpha Vantage TIME_SERIES_INTRADAY.
+    outputsize is "compact" (latest 100 bars) or "full" (about 30 days).
+    Timestamps are converted from the feed's exchange time zone to naive UTC.
+    Returns a list of dicts with keys: timestamp, open, high, low, close, volume.
+    """
+    if not api_configured():
+        logger.warning("Alpha Vantage API key not configured")
+        return None
 
+    av_interval = INTRADAY_INTERVALS[interval]
+    data = request_json(
+        {
+            "function": "TIME_SERIES_INTRADAY",
+            "symbol": ticker.upper().strip(),
+            "interval": av_interval,
+            "outputsize": outputsize,
+            "extended_hours": "false",
+        }
+    )
+    if data is None:
+        return None
+    if "Error Message" in data:
+        logger.warning(f"Alpha Vantage API warning: {data.get('Error Message')}")
+        return None
+
+    time_series = data.get(f"Time Series ({av_interval})")
+    if not time_series:
+        return None
+    try:
+        zone = ZoneInfo(data.get("Meta Data", {}).get("6. Time Zone", "US/Eastern"))
+    except Exception:
+        zone = _EXCHANGE_TZ
+
+    bars = []
+    for ts_str, values in time_series.items():
+        try:
+            local = datetime.strptime(ts_str, "%Y-%m-%d %H:%M:%S").replace(tzinfo=zone)
+            bars.append(
+                {
+                    "timestamp": local.astimezone(timezone.utc).replace(tzinfo=None),
+                    "open": float(values["1. open"]),
+                    "high": float(values["2. high"]),
+                    "low": float(values["3. low"]),
+                    "close": float(values["4. close"]),
+                    "volume": float(values.get("5. volume", 0)),
+                }
+            )
+        except (ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Skipping invalid intraday bar for {ts_str}: {e}")
+            continue
+
+    bars.sort(key=lambda x: x["timestamp"])
+    return bars
+
+
+def ingest_intraday_bars(
+    db: Session, ticker: str, interval: str, bars: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Store intraday bars (dicts with timestamp in naive UTC, open, high, low,
+    close, volume) and roll the trading days they fall in up into daily bars.
+    Bars already stored are overwritten: the latest one is revised while it
+    is still forming.
+    """
+    symbol = ticker.upper()
+    rows = {
+        bar["timestamp"]: {
+            "ticker": symbol,
+            "interval": interval,
+            "timestamp": bar["timestamp"],
+            "open": bar["open"],
+            "high": bar["high"],
+            "low": bar["low"],
+            "close": bar["close"],
+            "volume": bar.get("volume"),
+        }
+        for bar in bars
+    }
+    if not rows:
+        return {"ticker": symbol, "interval": interval, "bars": 0, "daily_bars": 0}
+
+    bulk_upsert(
+        db,
+        PriceBar,
+        list(rows.values()),
+        ["ticker", "interval", "timestamp"],
+        update_columns=["open", "high", "low", "close", "volume"],
+    )
     db.commit()
+    for timestamp in sorted(rows):
+        row = rows[timestamp]
+        append_price_bar(symbol, interval, timestamp, row["open"], row["high"], row["low"], row["close"], row["volume"])
+
+    daily_bars = rollup_daily_bars(db, symbol, interval, min(rows))
+    return {"ticker": symbol, "interval": interval, "bars": len(rows), "daily_bars": daily_bars}
+
+
+def backfill_intraday(db: Session, ticker: str, interval: str, outputsize: str = "compact") -> Dict[str, Any]:
+    """Fetch a ticker's latest intraday bars and ingest them."""
+    bars = fetch_intraday_ohlcv(ticker, interval, outputsize)
+    if bars is None:
+        return {"ticker": ticker, "status": "failed", "message": "Failed to fetch data"}
+    return {"status": "success", **ingest_intraday_bars(db, ticker, interval, bars)}
+
+
+def exchange_days(timestamps: np.ndarray) -> np.ndarray:
+    """Trading date (as midnight datetime64[us]) on the exchange of each naive-UTC timestamp."""
+    utc_days, inverse = np.unique(timestamps.astype("datetime64[D]"), return_inverse=True)
+    # One offset per UTC day: DST switches happen outside trading hours
+    offsets = np.array(
+        [_EXCHANGE_TZ.utcoffset(datetime(d.year, d.month, d.day, 12)) for d in utc_days.tolist()],
+        dtype="timedelta64[us]",
+    )
+    return (timestamps + offsets[inverse]).astype("datetime64[D]").astype("datetime64[us]")
+
+
+def rollup_daily_bars(db: Session, ticker: str, interval: str, since: datetime) -> int:
+    """
+    Rebuild daily bars from the stored `interval` bars, from the trading day
+    containing `since` (naive UTC) on - normally only the current day's
+    bucket. Returns the number of daily bars written.
+    """
+    day = since.replace(tzinfo=timezone.utc).astimezone(_EXCHANGE_TZ).date()
+    day_start = datetime.combine(day, datetime.min.time(), tzinfo=_EXCHANGE_TZ).astimezone(timezone.utc)
+    rows = (
+        db.query(PriceBar.timestamp, PriceBar.open, PriceBar.high, PriceBar.low, PriceBar.close, PriceBar.volume)
+        .filter(
+            PriceBar.ticker == ticker.upper(),
+            PriceBar.interval == interval,
+            PriceBar.timestamp >= day_start.replace(tzinfo=None),
+        )
+        .order_by(PriceBar.timestamp.asc())
+        .all()
+    )
+    if not rows:
+        return 0
+
+    # Bars of an old day may be partly archived already
+    archived = archived_bars(ticker, interval, start=day_start.replace(tzinfo=None))
+    intraday = merge_bars(archived, load_bar_rows(rows))
+    daily = aggregate_bars(intraday, exchange_days(intraday["timestamps"]))
+    daily_rows = [
+        {
+            "ticker": ticker.upper(),
+            "interval": "daily",
+            "timestamp": ts,
+            "open": o,
+            "high": h,
+            "low": l,
+            "close": c,
+            "volume": None if v != v else v,
+        }
+        for ts, o, h, l, c, v in zip(
+            daily["timestamps"].tolist(),
+            daily["opens"].tolist(),
+            daily["highs"].tolist(),
+            daily["lows"].tolist(),
+            daily["closes"].tolist(),
+            daily["volumes"].tolist(),
+        )
+    ]
+
+    if len(daily_rows) == 1:
+        # The usual case: only the current day's bucket changed
+        row = daily_rows[0]
+        _store_daily_bar(
+            db,
+            ticker,
+            row["timestamp"],
+            _daily_bar(db, ticker, row["timestamp"]),
+            row["open"],
+            row["high"],
+            row["low"],
+            row["close"],
+            row["volume"],
+        )
+        return 1
+
+    # Several days rewritten (e.g. an intraday import): reset the derived state instead
+    bulk_upsert(
+        db,
+        PriceBar,
+        daily_rows,
+        ["ticker", "interval", "timestamp"],
+        update_columns=["open", "high", "low", "close", "volume"],
+    )
+    reset_indicator_states(db, ticker)
+    invalidate_indicator_bars(db, ticker, daily_rows[0]["timestamp"])
+    invalidate_resampled_indicators(db, ticker, daily_rows[0]["timestamp"])
+    mark_history_revised(db, ticker)
+    db.commit()
+    invalidate_price_arrays(ticker, "daily")
+    return len(daily_rows)
+
+
+def archive_cold_bars(
+    db: Session, before: Optional[date] = None, tickers: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Move bars dated before `before` (default: settings.PRICE_ARCHIVE_AFTER_DAYS
+    ago) out of price_bars into the per-ticker archive files (see
+    price_archive). Readers stitch the archive back in, so cached series and
+    indicator state stay valid.
+    """
+    if before is None:
+        before = date.today() - timedelta(days=settings.PRICE_ARCHIVE_AFTER_DAYS)
+    cutoff = datetime.combine(before, datetime.min.time())
+    started = time.perf_counter()
+
+    pairs = db.query(PriceBar.ticker, PriceBar.interval).filter(PriceBar.timestamp < cutoff)
+    if tickers:
+        pairs = pairs.filter(PriceBar.ticker.in_([t.upper() for t in tickers]))
+    pairs = pairs.distinct().order_by(PriceBar.ticker, PriceBar.interval).all()
+
+    archived = 0
+    for ticker, interval in pairs:
+        rows = (
+            db.query(
+                PriceBar.id,
+                PriceBar.timestamp,
+                PriceBar.open,
+                PriceBar.high,
+                PriceBar.low,
+                PriceBar.close,
+                PriceBar.volume,
+            )
+            .filter(PriceBar.ticker == ticker, PriceBar.interval == interval, PriceBar.timestamp < cutoff)
+            .order_by(PriceBar.timestamp.asc())
+            .all()
+        )
+        # Write the archive before deleting: a crash in between leaves bars in
+        # both places, which readers resolve in favour of the database copy
+        cold = load_bar_rows([r[1:] for r in rows])
+        write_archive(ticker, interval, merge_bars(read_archive(ticker, interval), cold))
+        ids = [r[0] for r in rows]
+        for i in range(0, len(ids), _DELETE_CHUNK):
+            db.query(PriceBar).filter(PriceBar.id.in_(ids[i : i + _DELETE_CHUNK])).delete(synchronize_session=False)
+        db.commit()
+        archived += len(ids)
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Archived {archived} bars before {before} for {len(pairs)} series in {elapsed:.1f}s")
+    return {
+        "before": before.isoformat(),
+        "series": len(pairs),
+        "bars_archived": archived,
+        "elapsed_seconds": round(elapsed, 3),
+    }
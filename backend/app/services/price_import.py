@@ -0,0 +1,377 @@
+"""
+Bulk Price Import Service
+
+Streams OHLCV bars from vendor CSV files (plain or gzip) into price_bars.
+Each file is read in fixed-size chunks of lines; a chunk is split into
+columns in one C-level parse and converted with vectorized NumPy casts,
+validated with array masks, and written through bulk_upsert. Memory use is
+bounded by the chunk size regardless of file size.
+
+Expected layout: a header row naming the columns (case-insensitive)
+timestamp (or date/datetime), open, high, low, close, and optionally
+volume and ticker (or symbol). Without a ticker column the ticker comes
+from the caller or the file name (AAPL.csv.gz -> AAPL). Timestamps are
+ISO dates or datetimes in UTC.
+"""
+import csv
+import glob
+import gzip
+import io
+import logging
+import os
+import time
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.bulk import bulk_upsert
+from app.models import PriceBar
+from app.services.indicator_compute import (
+    invalidate_indicator_bars,
+    invalidate_resampled_indicators,
+    reset_indicator_states,
+)
+from app.services.price_cache import invalidate_price_arrays, mark_history_revised
+from app.services.price_history import INTRADAY_INTERVALS, rollup_daily_bars
+from app.services.resampling import is_resampled
+
+# Intervals stored in price_bars (weekly/monthly are resampled on read)
+STORED_INTERVALS = ("daily", *INTRADAY_INTERVALS)
+
+logger = logging.getLogger(__name__)
+
+# Lines parsed (and rows written) per chunk
+DEFAULT_CHUNK_ROWS = 50_000
+
+# Header names accepted for each field
+_COLUMN_ALIASES = {
+    "ticker": ("ticker", "symbol"),
+    "timestamp": ("timestamp", "date", "datetime", "time"),
+    "open": ("open",),
+    "high": ("high",),
+    "low": ("low",),
+    "close": ("close",),
+    "volume": ("volume",),
+}
+_REQUIRED_COLUMNS = ("timestamp", "open", "high", "low", "close")
+
+_PRICE_FIELDS = ("open", "high", "low", "close")
+
+# Rejected row numbers kept per file for the report
+_MAX_REJECTED_SAMPLES = 20
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+def _open_text(path: str) -> Tuple[TextIO, Any]:
+    """Open a CSV as text (gzip detected from its magic bytes); also returns the raw file for progress."""
+    raw = open(path, "rb")
+    if raw.read(2) == b"\x1f\x8b":
+        raw.seek(0)
+        return io.TextIOWrapper(gzip.GzipFile(fileobj=raw), encoding="utf-8-sig", newline=""), raw
+    raw.seek(0)
+    return io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""), raw
+
+
+def _ticker_from_filename(path: str) -> str:
+    name = os.path.basename(path)
+    for suffix in (".gz", ".csv", ".txt"):
+        if name.lower().endswith(suffix):
+            name = name[: -len(suffix)]
+    return name.upper()
+
+
+def _column_positions(header: List[str]) -> Dict[str, int]:
+    """field -> column index for the fields present in a header row."""
+    names = [h.strip().lower() for h in header]
+    positions = {}
+    for field, aliases in _COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in names:
+                positions[field] = names.index(alias)
+                break
+    return positions
+
+
+def _split_chunk(lines: List[str], width: int) -> np.ndarray:
+    """
+    Split CSV lines into a (rows, width) string array in one parse. A chunk
+    with malformed lines falls back to the csv module, blanking the rows of
+    the wrong width so validation rejects them in place.
+    """
+    try:
+        return np.loadtxt(lines, delimiter=",", dtype=str, quotechar='"', ndmin=2, comments=None)
+    except ValueError:
+        rows = [row if len(row) == width else [""] * width for row in csv.reader(lines)]
+        return np.array(rows, dtype=str).reshape(len(rows), width)
+
+
+def _to_float64(values: np.ndarray) -> np.ndarray:
+    """Vectorized string -> float64 cast; blanks and unparseable values become NaN."""
+    values = np.char.strip(values)
+    try:
+        return np.where(values == "", "nan", values).astype(np.float64)
+    except ValueError:
+        out = np.full(len(values), np.nan)
+        for i, value in enumerate(values.tolist()):
+            try:
+                out[i] = float(value)
+            except ValueError:
+                pass
+        return out
+
+
+def _to_timestamps(values: np.ndarray) -> np.ndarray:
+    """Vectorized ISO string -> datetime64[us] cast; unparseable values become NaT."""
+    values = np.char.strip(values)
+    try:
+        return values.astype("datetime64[us]")
+    except ValueError:
+        out = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[us]")
+        for i, value in enumerate(values.tolist()):
+            try:
+                out[i] = np.datetime64(value, "us")
+            except ValueError:
+                pass
+        return out
+
+
+def validate_bars(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Mask of valid bars: a parsed timestamp and ticker, positive finite
+    prices, high/low bracketing open and close, and no negative volume.
+    """
+    opens, highs, lows, closes = (columns[f] for f in _PRICE_FIELDS)
+    valid = ~np.isnat(columns["timestamp"]) & (columns["ticker"] != "")
+    for values in (opens, highs, lows, closes):
+        valid &= np.isfinite(values) & (values > 0)
+    valid &= (highs >= np.maximum(opens, closes)) & (lows <= np.minimum(opens, closes))
+    valid &= ~(columns["volume"] < 0)
+    return valid
+
+
+def _read_chunks(
+    text: TextIO, positions: Dict[str, int], width: int, ticker: str, chunk_rows: int
+) -> Iterable[Tuple[Dict[str, np.ndarray], int]]:
+    """Yield (typed column arrays, lines read) per chunk."""
+    while True:
+        lines = [line for line in islice(text, chunk_rows) if line.strip()]
+        if not lines:
+            return
+        cells = _split_chunk(lines, width)
+        n = len(cells)
+        columns = {
+            "timestamp": _to_timestamps(cells[:, positions["timestamp"]]),
+            "ticker": (
+                np.char.upper(np.char.strip(cells[:, positions["ticker"]]))
+                if "ticker" in positions
+                else np.full(n, ticker)
+            ),
+            "volume": _to_float64(cells[:, positions["volume"]]) if "volume" in positions else np.full(n, np.nan),
+        }
+        for field in _PRICE_FIELDS:
+            columns[field] = _to_float64(cells[:, positions[field]])
+        yield columns, len(lines)
+
+
+def import_price_file(
+    db: Session,
+    path: str,
+    interval: str = "daily",
+    ticker: Optional[str] = None,
+    replace: bool = False,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Stream one CSV (or CSV.gz) file into price_bars, committing per chunk.
+    Existing bars are kept unless `replace`, which overwrites their OHLCV;
+    a bar repeated within a chunk is written once (the last one with
+    `replace`, else the first). Returns counts of rows read, accepted (valid rows submitted; bars that
+    already exist are left as they are unless `replace`) and rejected.
+    """
+    started = time.perf_counter()
+    report: Dict[str, Any] = {
+        "file": path,
+        "status": "success",
+        "rows_read": 0,
+        "rows_accepted": 0,
+        "rows_rejected": 0,
+        "rejected_rows": [],
+        "tickers": 0,
+    }
+    # ticker -> earliest bar written, for cache/indicator invalidation
+    touched: Dict[str, datetime] = {}
+
+    if is_resampled(interval):
+        report.update(status="failed", message=f"{interval} bars are built from daily bars, not imported")
+        return report
+    if interval not in STORED_INTERVALS:
+        report.update(status="failed", message=f"Unsupported interval: {interval}")
+        return report
+
+    text, raw = _open_text(path)
+    size = os.fstat(raw.fileno()).st_size
+    try:
+        header = next(csv.reader([text.readline()]), [])
+        positions = _column_positions(header)
+        missing = [c for c in _REQUIRED_COLUMNS if c not in positions]
+        if missing:
+            report.update(status="failed", message=f"Missing columns: {', '.join(missing)}")
+            return report
+
+        default_ticker = (ticker or _ticker_from_filename(path)).upper()
+        update_columns = ["open", "high", "low", "close", "volume"] if replace else None
+
+        for columns, lines_read in _read_chunks(text, positions, len(header), default_ticker, chunk_rows):
+            valid = validate_bars(columns)
+            # 1-based data row numbers of a sample of the rejected rows
+            rejected = np.flatnonzero(~valid)
+            room = _MAX_REJECTED_SAMPLES - len(report["rejected_rows"])
+            report["rejected_rows"].extend((rejected[:room] + report["rows_read"] + 1).tolist())
+            report["rows_read"] += lines_read
+            report["rows_rejected"] += len(rejected)
+
+            timestamps = columns["timestamp"][valid]
+            tickers = columns["ticker"][valid]
+            volumes = columns["volume"][valid]
+            rows = [
+                {
+                    "ticker": t,
+                    "interval": interval,
+                    "timestamp": ts,
+                    "open": o,
+                    "high": h,
+                    "low": l,
+                    "close": c,
+                    "volume": None if v != v else v,
+                }
+                for t, ts, o, h, l, c, v in zip(
+                    tickers.tolist(),
+                    timestamps.tolist(),
+                    columns["open"][valid].tolist(),
+                    columns["high"][valid].tolist(),
+                    columns["low"][valid].tolist(),
+                    columns["close"][valid].tolist(),
+                    volumes.tolist(),
+                )
+            ]
+            # One row per bar: PostgreSQL refuses to update a row twice in a statement
+            unique: Dict[Tuple[str, datetime], Dict[str, Any]] = {}
+            for row in rows:
+                key = (row["ticker"], row["timestamp"])
+                if replace or key not in unique:
+                    unique[key] = row
+            rows = list(unique.values())
+            report["rows_accepted"] += bulk_upsert(
+                db, PriceBar, rows, ["ticker", "interval", "timestamp"], update_columns
+            )
+            db.commit()
+
+            if len(tickers):
+                names, index = np.unique(tickers, return_inverse=True)
+                earliest = np.full(len(names), np.datetime64("9999-12-31"), dtype="datetime64[us]")
+                np.minimum.at(earliest, index, timestamps)
+                for name, ts in zip(names.tolist(), earliest.tolist()):
+                    touched[name] = min(touched.get(name, ts), ts)
+
+            if progress is not None:
+                progress(
+                    {
+                        **{k: v for k, v in report.items() if k != "rejected_rows"},
+                        "fraction": round(raw.tell() / size, 4) if size else 1.0,
+                    }
+                )
+    except Exception:
+        db.rollback()
+        # The chunks committed before the failure changed history too; a
+        # failure here must not hide the import's own error
+        try:
+            _invalidate_imported(db, interval, touched)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Failed to invalidate history imported from {path}: {e}")
+        raise
+    finally:
+        text.close()
+
+    _invalidate_imported(db, interval, touched)
+
+    report["tickers"] = len(touched)
+    report["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(
+        f"Imported {path}: {report['rows_accepted']} bars for {len(touched)} tickers, "
+        f"{report['rows_rejected']} rejected in {report['elapsed_seconds']:.1f}s"
+    )
+    return report
+
+
+def _invalidate_imported(db: Session, interval: str, touched: Dict[str, datetime]) -> None:
+    """
+    History changed underneath the price cache, stored indicators,
+    streaming states and resampled indicators; imported intraday bars also
+    roll up into daily bars.
+    """
+    for ticker, earliest in touched.items():
+        if interval in INTRADAY_INTERVALS:
+            rollup_daily_bars(db, ticker, interval, earliest)
+        reset_indicator_states(db, ticker, interval)
+        invalidate_indicator_bars(db, ticker, earliest, interval)
+        if interval == "daily":
+            invalidate_resampled_indicators(db, ticker, earliest)
+        # Other processes (the server, when this runs from the CLI) drop their copies too
+        mark_history_revised(db, ticker, interval)
+        if interval in INTRADAY_INTERVALS:
+            mark_history_revised(db, ticker, "daily")
+        invalidate_price_arrays(ticker, interval)
+    db.commit()
+
+
+def import_price_files(
+    db: Session,
+    paths: List[str],
+    interval: str = "daily",
+    ticker: Optional[str] = None,
+    replace: bool = False,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """Import several files in turn; a failing file is reported and skipped."""
+    started = time.perf_counter()
+    results = []
+    for path in paths:
+        try:
+            results.append(import_price_file(db, path, interval, ticker, replace, chunk_rows, progress))
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Failed to import {path}: {e}")
+            results.append({"file": path, "status": "failed", "message": str(e)})
+
+    return {
+        "files": len(paths),
+        "rows_accepted": sum(r.get("rows_accepted", 0) for r in results),
+        "rows_rejected": sum(r.get("rows_rejected", 0) for r in results),
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+        "results": results,
+    }
+
+
+def resolve_import_paths(patterns: List[str], base_dir: str) -> List[str]:
+    """
+    Expand file names / glob patterns relative to `base_dir` into sorted
+    file paths. Raises ValueError for a pattern reaching outside base_dir.
+    """
+    root = os.path.realpath(base_dir)
+    paths = set()
+    for pattern in patterns:
+        full_pattern = os.path.join(root, pattern)
+        if os.path.commonpath([root, os.path.realpath(os.path.dirname(full_pattern))]) != root:
+            raise ValueError(f"Path outside the import directory: {pattern}")
+        for path in glob.glob(full_pattern):
+            real = os.path.realpath(path)
+            if os.path.isfile(real) and os.path.commonpath([root, real]) == root:
+                paths.add(real)
+    return sorted(paths)
@@ -0,0 +1,170 @@
+"""
+Price Matrix Service
+
+Date-aligned (tickers, dates) matrices of daily bars for many tickers at
+once: one query (plus the archived bars) scattered onto a shared date axis,
+NaN where a ticker has no bar. The pattern scanner, portfolio risk and the
+/prices/matrix endpoint build on it.
+
+Missing-value policies for closes / log-returns:
+- "keep": missing stays missing (a return needs both closes).
+- "ffill": carry the last close forward (never backwards, so no look-ahead);
+  a filled day has a zero return and leading gaps stay missing.
+- "drop": keep only the dates on which every ticker has a bar.
+"""
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models import PriceBar
+from app.services.price_archive import archived_bars, archived_tickers
+from app.services.price_cache import to_datetime64
+
+logger = logging.getLogger(__name__)
+
+MATRIX_VALUES = ("close", "log_return")
+MISSING_POLICIES = ("keep", "ffill", "drop")
+
+# Matrix field -> price_bars column
+_COLUMNS = {
+    "opens": PriceBar.open,
+    "highs": PriceBar.high,
+    "lows": PriceBar.low,
+    "closes": PriceBar.close,
+    "volumes": PriceBar.volume,
+}
+
+
+def load_bar_matrices(
+    db: Session,
+    start_date: Optional[date],
+    end_date: date,
+    tickers: Optional[List[str]] = None,
+    fields: Sequence[str] = ("closes",),
+) -> Optional[Dict[str, Any]]:
+    """
+    Load daily bars dated start_date..end_date for the universe (or the
+    given tickers) in one query, stitched with archived bars. Returns
+    {tickers, timestamps (datetime64), <fields>} with (tickers, bars)
+    float64 matrices, or None when there are no bars.
+    """
+    start = datetime.combine(start_date, datetime.min.time()) if start_date is not None else None
+    end = datetime.combine(end_date, datetime.max.time())
+    query = db.query(PriceBar.ticker, PriceBar.timestamp, *(_COLUMNS[f] for f in fields)).filter(
+        PriceBar.interval == "daily",
+        PriceBar.timestamp <= end,
+    )
+    if start is not None:
+        query = query.filter(PriceBar.timestamp >= start)
+    if tickers:
+        query = query.filter(PriceBar.ticker.in_([t.upper() for t in tickers]))
+    rows = query.all()
+
+    # (tickers, timestamps, *fields) per source; database rows are written
+    # last so they win over archived bars with the same timestamp
+    pieces = []
+    for symbol in [t.upper() for t in tickers] if tickers else archived_tickers("daily"):
+        bars = archived_bars(symbol, "daily", start, end)
+        if bars is not None and len(bars["timestamps"]):
+            pieces.append(
+                (np.full(len(bars["timestamps"]), symbol), bars["timestamps"]) + tuple(bars[f] for f in fields)
+            )
+    if rows:
+        symbols, timestamps, *values = zip(*rows)
+        pieces.append(
+            (np.array(symbols), to_datetime64(timestamps))
+            # Missing volume becomes NaN
+            + tuple(np.array(column, dtype=np.float64) for column in values)
+        )
+    if not pieces:
+        return None
+
+    ticker_axis, row_index = np.unique(np.concatenate([p[0] for p in pieces]), return_inverse=True)
+    time_axis, col_index = np.unique(np.concatenate([p[1] for p in pieces]), return_inverse=True)
+    bounds = np.cumsum([0] + [len(p[1]) for p in pieces])
+
+    out: Dict[str, Any] = {"tickers": ticker_axis, "timestamps": time_axis}
+    shape = (len(ticker_axis), len(time_axis))
+    for k, field in enumerate(fields, start=2):
+        matrix = np.full(shape, np.nan, dtype=np.float64)
+        for piece, lo, hi in zip(pieces, bounds[:-1], bounds[1:]):
+            matrix[row_index[lo:hi], col_index[lo:hi]] = piece[k]
+        out[field] = matrix
+    return out
+
+
+def fill_forward(matrix: np.ndarray) -> np.ndarray:
+    """Replace NaNs with the last earlier value along the date axis (leading NaNs stay)."""
+    positions = np.where(np.isnan(matrix), 0, np.arange(matrix.shape[1]))
+    np.maximum.accumulate(positions, axis=1, out=positions)
+    return np.take_along_axis(matrix, positions, axis=1)
+
+
+def log_returns(closes: np.ndarray) -> np.ndarray:
+    """log(close / previous close) along the date axis; one date shorter, NaN where either is missing."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.log(closes[:, 1:] / closes[:, :-1])
+    returns[~np.isfinite(returns)] = np.nan
+    return returns
+
+
+def aligned_closes(
+    closes: np.ndarray, timestamps: np.ndarray, missing: str = "keep"
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Apply a missing-value policy to a close matrix; returns (closes, timestamps)."""
+    if missing == "ffill":
+        return fill_forward(closes), timestamps
+    if missing == "drop":
+        complete = ~np.isnan(closes).any(axis=0)
+        return closes[:, complete], timestamps[complete]
+    return closes, timestamps
+
+
+def price_matrix(
+    db: Session,
+    tickers: List[str],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    values: str = "close",
+    missing: str = "keep",
+) -> Dict[str, Any]:
+    """
+    Date-aligned closes or log-returns for `tickers` (defaults to the last
+    year). Returns {tickers, timestamps (datetime64), values (tickers, dates)
+    matrix with NaN for missing, missing_tickers (no bars in the range)}.
+    A log-return is stamped with the later of its two dates.
+    """
+    if end_date is None:
+        end_date = date.today()
+    if start_date is None:
+        start_date = end_date - timedelta(days=365)
+    symbols = list(dict.fromkeys(t.upper() for t in tickers))
+
+    data = load_bar_matrices(db, start_date, end_date, symbols) if symbols else None
+    if data is None:
+        return {
+            "tickers": [],
+            "timestamps": np.empty(0, dtype="datetime64[us]"),
+            "values": np.empty((0, 0)),
+            "missing_tickers": symbols,
+        }
+
+    # Rows in the requested order
+    found = {t: i for i, t in enumerate(data["tickers"].tolist())}
+    present = [t for t in symbols if t in found]
+    closes = data["closes"][[found[t] for t in present]]
+
+    closes, timestamps = aligned_closes(closes, data["timestamps"], missing)
+    if values == "log_return":
+        matrix, timestamps = log_returns(closes), timestamps[1:]
+    else:
+        matrix = closes
+    return {
+        "tickers": present,
+        "timestamps": timestamps,
+        "values": matrix,
+        "missing_tickers": [t for t in symbols if t not in found],
+    }
@@ -1,6 +1,6 @@
+import asyncio
 import json
 import logging
-import time
 from datetime import date, datetime, timedelta
 from typing import Any, Dict, List, Optional
 
@@ -8,7 +8,7 @@ from sqlalchemy.orm import Session
 
 from app.core.audit import audit
 from app.models import CompanyOverview, PortfolioSnapshot, Security
-from app.services.alpha_vantage import get_company_overview, get_quote
+from app.services.alpha_vantage import async_client, get_company_overview_async, iter_quotes_async
 from app.services.holdings import recompute_holdings
 from app.services.portfolio import _compute_portfolio_performance
 from app.services.price_history import upsert_today_bar
@@ -25,72 +25,35 @@ def refresh_all_prices(db: Session) -> Dict[str, Any]:
     Also refreshes cached company overview data when older than 24 hours
     (or missing) and records a daily portfolio snapshot.
 
-    Uses a 12-second minimum delay between all Alpha Vantage calls to respect
-    the free-tier rate limits.
+    Quotes and overviews are fetched concurrently through the shared
+    Alpha Vantage rate limiter (quotes in bulk batches when
+    settings.ALPHA_VANTAGE_BULK_QUOTES is on) and applied and committed as
+    each call completes, so an interrupted refresh keeps what it fetched.
     """
     securities: List[Security] = db.query(Security).order_by(Security.ticker).all()
-    updated: List[str] = []
-    failed: List[str] = []
-
-    last_call_ts: Optional[float] = None
-
-    def _wait_for_rate_limit() -> None:
-        nonlocal last_call_ts
-        if last_call_ts is None:
-            return
-        elapsed = time.time() - last_call_ts
-        if elapsed < 12:
-            time.sleep(12 - elapsed)
-
-    for sec in securities:
-        # Quote
-        _wait_for_rate_limit()
-        quote = get_quote(sec.ticker)
-        last_call_ts = time.time()
-        if quote and quote.get("current_price") is not None:
-            sec.price = float(quote["current_price"])
-            # Also upsert today's daily bar
-            upsert_today_bar(db, sec.ticker, quote)
-            updated.append(sec.ticker)
-        else:
-            failed.append(sec.ticker)
 
-        # Company overview (if missing or stale > 24h)
-        overview = (
-            db.query(CompanyOverview)
-            .filter(CompanyOverview.ticker == sec.ticker.upper())
-            .first()
+    overviews = {
+        o.ticker: o
+        for o in db.query(CompanyOverview).filter(
+            CompanyOverview.ticker.in_([sec.ticker.upper() for sec in securities])
         )
-        needs_overview = False
-        if overview is None:
-            needs_overview = True
-        elif overview.last_updated is None:
-            needs_overview = True
-        else:
-            age = datetime.utcnow() - overview.last_updated
-            if age > timedelta(hours=24):
-                needs_overview = True
-
-        if needs_overview:
-            _wait_for_rate_limit()
-            ov_data = get_company_overview(sec.ticker)
-            last_call_ts = time.time()
-            if ov_data:
-                if overview is None:
-                    overview = CompanyOverview(ticker=sec.ticker.upper())
-                    db.add(overview)
-                overview.shares_outstanding = ov_data.get("SharesOutstanding")
-                overview.market_cap = ov_data.get("MarketCapitalization")
-                overview.beta = ov_data.get("Beta")
-                overview.pe_ratio = ov_data.get("PERatio")
-                overview.dividend_yield = ov_data.get("DividendYield")
-                overview.fifty_two_week_high = ov_data.get("52WeekHigh")
-                overview.fifty_two_week_low = ov_data.get("52WeekLow")
-                overview.sector = ov_data.get("Sector")
-                overview.industry = ov_data.get("Industry")
-                overview.last_updated = datetime.utcnow()
+    }
 
-    db.commit()
+    # Company overview (if missing or stale > 24h)
+    stale_overviews: List[str] = []
+    for sec in securities:
+        overview = overviews.get(sec.ticker.upper())
+        if (
+            overview is None
+            or overview.last_updated is None
+            or datetime.utcnow() - overview.last_updated > timedelta(hours=24)
+        ):
+            stale_overviews.append(sec.ticker)
+
+    updated = asyncio.run(_refresh_concurrently(db, securities, overviews, stale_overviews))
+    updated.sort()
+    updated_set = set(updated)
+    failed = [sec.ticker for sec in securities if sec.ticker not in updated_set]
 
     # After updating prices and overviews, store/update today's portfolio snapshot
     perf = _compute_portfolio_performance(db)
@@ -139,7 +102,6 @@ def refresh_all_prices(db: Session) -> Dict[str, Any]:
 
     # Broadcast price refresh event (fire and forget)
     try:
-        import asyncio
         loop = asyncio.get_event_loop()
         if loop.is_running():
             asyncio.create_task(manager.broadcast_event(
@@ -169,3 +131,85 @@ def refresh_all_prices(db: Session) -> Dict[str, Any]:
         "failed_tickers": failed,
     }
 
+
+async def _refresh_concurrently(
+    db: Session,
+    securities: List[Security],
+    overviews: Dict[str, CompanyOverview],
+    overview_tickers: List[str],
+) -> List[str]:
+    """
+    Fetch quotes and the stale overviews concurrently and apply each
+    result as it arrives (single writer: all database work happens here,
+    one commit per result). Returns the tickers whose price was updated.
+    """
+    by_ticker = {sec.ticker: sec for sec in securities}
+    updated: List[str] = []
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async with async_client() as client:
+
+        async def quotes() -> None:
+            try:
+                async for batch in iter_quotes_async(client, list(by_ticker)):
+                    await queue.put(("quotes", batch))
+            finally:
+                await queue.put(None)
+
+        async def overview(ticker: str) -> None:
+            try:
+                await queue.put(("overview", {ticker: await get_company_overview_async(client, ticker)}))
+            finally:
+                await queue.put(None)
+
+        producers = [asyncio.create_task(quotes())]
+        producers += [asyncio.create_task(overview(t)) for t in overview_tickers]
+        running = len(producers)
+        while running:
+            item = await queue.get()
+            if item is None:
+                running -= 1
+                continue
+            kind, results = item
+            for ticker, data in results.items():
+                try:
+                    if kind == "quotes":
+                        if _apply_quote(db, by_ticker[ticker], data):
+                            updated.append(ticker)
+                    elif data:
+                        _apply_overview(db, overviews, ticker, data)
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(f"Failed to store refreshed {kind} for {ticker}: {e}")
+        await asyncio.gather(*producers)
+    return updated
+
+
+def _apply_quote(db: Session, sec: Security, quote: Optional[Dict[str, Any]]) -> bool:
+    """Store a quote as the security's price and today's daily bar (commits)."""
+    if not quote or quote.get("current_price") is None:
+        return False
+    sec.price = float(quote["current_price"])
+    upsert_today_bar(db, sec.ticker, quote)
+    return True
+
+
+def _apply_overview(
+    db: Session, overviews: Dict[str, CompanyOverview], ticker: str, ov_data: Dict[str, Any]
+) -> None:
+    overview = overviews.get(ticker.upper())
+    if overview is None:
+        overview = CompanyOverview(ticker=ticker.upper())
+        db.add(overview)
+        overviews[ticker.upper()] = overview
+    overview.shares_outstanding = ov_data.get("SharesOutstanding")
+    overview.market_cap = ov_data.get("MarketCapitalization")
+    overview.beta = ov_data.get("Beta")
+    overview.pe_ratio = ov_data.get("PERatio")
+    overview.dividend_yield = ov_data.get("DividendYield")
+    overview.fifty_two_week_high = ov_data.get("52WeekHigh")
+    overview.fifty_two_week_low = ov_data.get("52WeekLow")
+    overview.sector = ov_data.get("Sector")
+    overview.industry = ov_data.get("Industry")
+    overview.last_updated = datetime.utcnow()
+    db.commit()
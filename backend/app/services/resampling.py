@@ -0,0 +1,88 @@
+"""
+Bar Resampling Service
+
+Builds weekly and monthly OHLCV bars from daily bar arrays (and, through
+aggregate_bars, bars of any period from finer ones) with vectorized
+group reductions. A resampled bar is stamped with the start of its period
+(Monday / first of the month, midnight) so its key stays stable while the
+period is still in progress.
+
+No database dependencies - receives arrays and returns arrays.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Intervals derived from daily bars rather than stored
+RESAMPLED_INTERVALS = ("weekly", "monthly")
+
+# Source interval every resampled interval is built from
+SOURCE_INTERVAL = "daily"
+
+
+def is_resampled(interval: str) -> bool:
+    """Whether an interval is built from daily bars on read."""
+    return interval in RESAMPLED_INTERVALS
+
+
+def period_starts(timestamps: np.ndarray, interval: str) -> np.ndarray:
+    """Start of the weekly/monthly period of each datetime64 timestamp."""
+    days = timestamps.astype("datetime64[D]")
+    if interval == "weekly":
+        # datetime64 day 0 (1970-01-01) is a Thursday; shift so weeks start on Monday
+        day_numbers = days.astype(np.int64)
+        monday = day_numbers - (day_numbers + 3) % 7
+        return monday.astype("datetime64[D]").astype("datetime64[us]")
+    if interval == "monthly":
+        return days.astype("datetime64[M]").astype("datetime64[us]")
+    raise ValueError(f"Unsupported resample interval: {interval}")
+
+
+def period_start(timestamp: datetime, interval: str) -> datetime:
+    """Start of the weekly/monthly period containing one timestamp."""
+    day = datetime.combine(timestamp.date(), datetime.min.time())
+    if interval == "weekly":
+        return day - timedelta(days=day.weekday())
+    if interval == "monthly":
+        return day.replace(day=1)
+    raise ValueError(f"Unsupported resample interval: {interval}")
+
+
+def resample_bars(bars: Dict[str, np.ndarray], interval: str) -> Dict[str, np.ndarray]:
+    """
+    Aggregate daily bar arrays (timestamps + opens/highs/lows/closes/volumes)
+    into weekly or monthly bars: first open, highest high, lowest low, last
+    close and summed volume (NaN when no bar in the period had volume).
+    """
+    if len(bars["timestamps"]) == 0:
+        return {field: np.array(values[:0], copy=True) for field, values in bars.items()}
+    return aggregate_bars(bars, period_starts(bars["timestamps"], interval))
+
+
+def aggregate_bars(bars: Dict[str, np.ndarray], keys: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Aggregate time-ordered bar arrays into one bar per run of equal `keys`
+    (the period each bar belongs to), stamped with that key.
+    """
+    if len(keys) == 0:
+        return {field: np.array(values[:0], copy=True) for field, values in bars.items()}
+
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    ends = np.concatenate((starts[1:], [len(keys)])) - 1
+
+    volumes = bars["volumes"]
+    has_volume = np.logical_or.reduceat(~np.isnan(volumes), starts)
+    summed_volume = np.add.reduceat(np.nan_to_num(volumes), starts)
+
+    return {
+        "timestamps": keys[starts],
+        "opens": bars["opens"][starts],
+        "highs": np.maximum.reduceat(bars["highs"], starts),
+        "lows": np.minimum.reduceat(bars["lows"], starts),
+        "closes": bars["closes"][ends],
+        "volumes": np.where(has_volume, summed_volume, np.nan),
+    }
@@ -4,9 +4,12 @@ Risk metrics service for portfolio risk analysis.
 import logging
 from typing import Any, Dict, List, Optional
 
+import numpy as np
 from sqlalchemy.orm import Session
 
 from app.models import CompanyOverview, MaterializedHolding, PortfolioSnapshot, Security
+from app.services.price_cache import get_price_series
+from app.services.price_matrix import load_bar_matrices
 
 logger = logging.getLogger(__name__)
 
@@ -41,47 +44,52 @@ def compute_var(
     confidence_level: float = 0.95,
 ) -> Optional[float]:
     """
-    Compute Value at Risk using historical daily returns from PriceBar data.
+    Compute Value at Risk using historical daily returns from PriceBar data:
+    one ticker's returns (read through the price series cache), or without
+    a ticker the equal-weighted universe return on each date, from closes
+    aligned by date.
     Returns VaR as a positive number (loss amount).
     """
-    from app.models import PriceBar
     from datetime import date, timedelta
 
     # Get last 252 trading days (approx 1 year)
     end_date = date.today()
     start_date = end_date - timedelta(days=365)
 
-    query = db.query(PriceBar).filter(
-        PriceBar.interval == "daily",
-        PriceBar.timestamp >= start_date,
-        PriceBar.timestamp <= end_date,
-    )
-
     if ticker:
-        query = query.filter(PriceBar.ticker == ticker.upper())
-
-    bars = query.order_by(PriceBar.timestamp.asc()).all()
-
-    if len(bars) < 30:  # Need minimum data
-        return None
-
-    # Calculate daily returns
-    returns = []
-    for i in range(1, len(bars)):
-        if bars[i - 1].close and bars[i].close and bars[i - 1].close > 0:
-            daily_return = (bars[i].close - bars[i - 1].close) / bars[i - 1].close
-            returns.append(daily_return)
-
-    if not returns:
+        series = get_price_series(db, ticker, "daily", start_date, end_date)
+        closes = series["closes"] if series is not None else np.empty(0)
+        if len(closes) < 30:  # Need minimum data
+            return None
+
+        # Calculate daily returns
+        prev_closes = closes[:-1]
+        valid = (prev_closes > 0) & (closes[1:] != 0)
+        returns = (closes[1:][valid] - prev_closes[valid]) / prev_closes[valid]
+    else:
+        data = load_bar_matrices(db, start_date, end_date)
+        if data is None or data["closes"].shape[1] < 30:
+            return None
+
+        # Per-ticker returns between consecutive dates, averaged over the tickers with both closes
+        closes = data["closes"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ticker_returns = closes[:, 1:] / closes[:, :-1] - 1.0
+        ticker_returns[~np.isfinite(ticker_returns)] = np.nan
+        priced = ~np.isnan(ticker_returns)
+        counts = priced.sum(axis=0)
+        returns = np.where(priced, ticker_returns, 0.0).sum(axis=0)[counts > 0] / counts[counts > 0]
+
+    if not len(returns):
         return None
 
     # Sort returns and find percentile
-    returns_sorted = sorted(returns)
+    returns_sorted = np.sort(returns)
     percentile_index = int((1 - confidence_level) * len(returns_sorted))
     if percentile_index >= len(returns_sorted):
         percentile_index = len(returns_sorted) - 1
 
-    var = abs(returns_sorted[percentile_index])
+    var = abs(float(returns_sorted[percentile_index]))
     return round(var, 6)
 
 
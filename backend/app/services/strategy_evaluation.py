@@ -6,7 +6,7 @@ from typing import Any, Dict, List, Optional
 from sqlalchemy.orm import Session
 
 from app.core.audit import audit
-from app.models import IndicatorValue, Signal, Strategy
+from app.models import IndicatorBar, Signal, Strategy
 from app.services.websocket_manager import manager
 
 logger = logging.getLogger(__name__)
@@ -60,17 +60,18 @@ def evaluate_active_strategies(db: Session, ticker: str) -> List[Dict[str, Any]]
         if "RSI" in strategy.name.upper() or "MEAN_REVERSION" in strategy.name.upper():
             # Get latest RSI value
             latest_rsi = (
-                db.query(IndicatorValue)
+                db.query(IndicatorBar.rsi_14)
                 .filter(
-                    IndicatorValue.ticker == ticker.upper(),
-                    IndicatorValue.indicator_type == "RSI_14",
+                    IndicatorBar.ticker == ticker.upper(),
+                    IndicatorBar.interval == "daily",
+                    IndicatorBar.rsi_14.isnot(None),
                 )
-                .order_by(IndicatorValue.timestamp.desc())
+                .order_by(IndicatorBar.timestamp.desc())
                 .first()
             )
 
             if latest_rsi:
-                signal = evaluate_rsi_mean_reversion(db, ticker, strategy.id, latest_rsi.value)
+                signal = evaluate_rsi_mean_reversion(db, ticker, strategy.id, latest_rsi.rsi_14)
                 if signal:
                     signals.append(signal)
 
@@ -3,27 +3,339 @@ Technical Analysis Service
 
 Pure functions that compute technical indicators from OHLCV arrays.
 No database dependencies - receives arrays and returns arrays.
+
+Every indicator is implemented once as a vectorized NumPy kernel
+(``*_array``) over float64 arrays, with NaN marking the warm-up positions.
+The list-based functions (``sma``, ``ema``, ...) wrap those kernels and keep
+the original None-padded list outputs for existing callers.
 """
 import logging
-from typing import List, Tuple
+import math
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 logger = logging.getLogger(__name__)
 
+# Largest growth factor allowed inside one block of the closed-form EMA
+# filter before the running sum is rescaled (keeps values well inside float64).
+_FILTER_BLOCK_GROWTH = 1e100
+
+
+def as_float_array(values: Sequence[float] | np.ndarray) -> np.ndarray:
+    """Convert a price sequence to a contiguous float64 array."""
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def to_optional_list(values: np.ndarray) -> List[float | None]:
+    """Convert a NaN-padded float array to a list with None in place of NaN."""
+    out = values.astype(object)
+    out[np.isnan(values)] = None
+    return out.tolist()
+
+
+def _nan_array(length: int) -> np.ndarray:
+    return np.full(length, np.nan, dtype=np.float64)
+
+
+def exponential_filter(values: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    """
+    First-order recursive filter y[i] = y[i-1] + alpha * (x[i] - y[i-1]), y[-1] = seed.
+
+    Evaluated in closed form, y[i] = d^(i+1) * (seed + alpha * sum_k x[k] / d^(k+1))
+    with d = 1 - alpha, one block at a time so d^-k never overflows.
+    """
+    n = len(values)
+    if n == 0:
+        return np.empty(0, dtype=np.float64)
+    if alpha >= 1.0:
+        return values.astype(np.float64, copy=True)
+
+    decay = 1.0 - alpha
+    block = max(1, int(math.log(_FILTER_BLOCK_GROWTH) / -math.log(decay)))
+    block = min(block, n)
+    powers = decay ** np.arange(1, block + 1, dtype=np.float64)
+
+    out = np.empty(n, dtype=np.float64)
+    prev = seed
+    for start in range(0, n, block):
+        chunk = values[start : start + block]
+        pw = powers[: len(chunk)]
+        out[start : start + len(chunk)] = pw * (prev + alpha * np.cumsum(chunk / pw))
+        prev = out[start + len(chunk) - 1]
+    return out
+
+
+def sma_array(prices: np.ndarray, period: int) -> np.ndarray:
+    """Simple Moving Average over a float64 array via cumulative sums."""
+    n = len(prices)
+    out = _nan_array(n)
+    if n < period:
+        return out
+
+    # Offset by the first price so the running sum stays small (less drift)
+    base = prices[0]
+    csum = np.concatenate(([0.0], np.cumsum(prices - base)))
+    out[period - 1 :] = (csum[period:] - csum[:-period]) / period + base
+    return out
+
+
+def ema_array(prices: np.ndarray, period: int) -> np.ndarray:
+    """Exponential Moving Average over a float64 array, seeded with the first SMA."""
+    n = len(prices)
+    out = _nan_array(n)
+    if n < period:
+        return out
+
+    seed = float(prices[:period].sum()) / period
+    out[period - 1] = seed
+    out[period:] = exponential_filter(prices[period:], 2.0 / (period + 1), seed)
+    return out
+
+
+def rsi_array(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """Relative Strength Index over a float64 array using Wilder's smoothing."""
+    n = len(prices)
+    out = _nan_array(n)
+    if n < period + 1:
+        return out
+
+    changes = np.diff(prices)
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes < 0, -changes, 0.0)
+
+    alpha = 1.0 / period
+    first_gain = float(gains[:period].sum()) / period
+    first_loss = float(losses[:period].sum()) / period
+    avg_gain = np.concatenate(([first_gain], exponential_filter(gains[period:], alpha, first_gain)))
+    avg_loss = np.concatenate(([first_loss], exponential_filter(losses[period:], alpha, first_loss)))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        out[period:] = np.where(avg_loss == 0, 100.0, 100.0 - (100.0 / (1.0 + rs)))
+    return out
+
+
+def macd_array(
+    prices: np.ndarray, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram over a float64 array."""
+    return macd_from_emas(ema_array(prices, fast_period), ema_array(prices, slow_period), signal_period)
+
+
+def macd_from_emas(
+    ema_fast: np.ndarray, ema_slow: np.ndarray, signal_period: int = 9
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """MACD line, signal line and histogram from precomputed fast/slow EMA arrays."""
+    macd_line = ema_fast - ema_slow
+
+    # Signal line = EMA of the defined part of the MACD line, mapped back in place
+    signal_line = _nan_array(len(macd_line))
+    defined = ~np.isnan(macd_line)
+    macd_values = macd_line[defined]
+    if len(macd_values) >= signal_period:
+        signal_line[defined] = ema_array(macd_values, signal_period)
+
+    histogram = macd_line - signal_line
+    return (macd_line, signal_line, histogram)
+
+
+def bollinger_bands_array(
+    prices: np.ndarray, period: int = 20, num_std: float = 2.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Upper, middle (SMA) and lower Bollinger Bands over a float64 array."""
+    return bollinger_bands_from_sma(prices, sma_array(prices, period), period, num_std)
+
+
+def bollinger_bands_from_sma(
+    prices: np.ndarray, middle: np.ndarray, period: int = 20, num_std: float = 2.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger Bands around a precomputed SMA array of the same period."""
+    n = len(prices)
+    upper = _nan_array(n)
+    lower = _nan_array(n)
+    if n < period:
+        return (upper, middle, lower)
+
+    # Population variance of each rolling window around its own mean
+    windows = sliding_window_view(prices, period)
+    deviations = windows - middle[period - 1 :, None]
+    std_dev = np.sqrt(np.einsum("ij,ij->i", deviations, deviations) / period)
+
+    upper[period - 1 :] = middle[period - 1 :] + num_std * std_dev
+    lower[period - 1 :] = middle[period - 1 :] - num_std * std_dev
+    return (upper, middle, lower)
+
+
+def true_range_array(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> np.ndarray:
+    """True Range for bars 1..n-1 (one element shorter than the inputs)."""
+    prev_close = closes[:-1]
+    return np.maximum.reduce(
+        [
+            highs[1:] - lows[1:],
+            np.abs(highs[1:] - prev_close),
+            np.abs(lows[1:] - prev_close),
+        ]
+    )
+
+
+def atr_array(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = 14) -> np.ndarray:
+    """Average True Range (SMA of True Range) over float64 arrays."""
+    n = len(highs)
+    if len(lows) != n or len(closes) != n or n < period + 1:
+        return _nan_array(n)
+    return np.concatenate(([np.nan], sma_array(true_range_array(highs, lows, closes), period)))
+
+
+def _rolling_extreme(values: np.ndarray, period: int, op: np.ufunc, fill: float) -> np.ndarray:
+    """
+    Trailing-window max/min in O(n) (van Herk / Gil-Werman): per block of
+    `period` values, a window is op(suffix scan at its start, prefix scan at its end).
+    Works along the last axis, so a (tickers, bars) matrix is handled in one pass.
+    """
+    n = values.shape[-1]
+    out = np.full(values.shape, np.nan, dtype=np.float64)
+    if n < period:
+        return out
+
+    lead = values.shape[:-1]
+    padded = np.concatenate((values, np.full(lead + (-n % period,), fill)), axis=-1)
+    blocks = padded.reshape(lead + (-1, period))
+    prefix = op.accumulate(blocks, axis=-1).reshape(padded.shape)
+    suffix = op.accumulate(blocks[..., ::-1], axis=-1)[..., ::-1].reshape(padded.shape)
+    out[..., period - 1 :] = op(suffix[..., : n - period + 1], prefix[..., period - 1 : n])
+    return out
+
+
+def rolling_max_array(values: np.ndarray, period: int) -> np.ndarray:
+    """Highest value over each trailing window of `period` elements."""
+    return _rolling_extreme(values, period, np.maximum, -np.inf)
+
+
+def rolling_min_array(values: np.ndarray, period: int) -> np.ndarray:
+    """Lowest value over each trailing window of `period` elements."""
+    return _rolling_extreme(values, period, np.minimum, np.inf)
+
+
+def _wilder_average(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's smoothing seeded with the mean of the first `period` values."""
+    out = _nan_array(len(values))
+    if len(values) < period:
+        return out
+    seed = float(values[:period].sum()) / period
+    out[period - 1] = seed
+    out[period:] = exponential_filter(values[period:], 1.0 / period, seed)
+    return out
+
+
+def stochastic_array(
+    highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, k_period: int = 14, d_period: int = 3
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Stochastic oscillator %K and %D (SMA of %K) over float64 arrays."""
+    highest = rolling_max_array(highs, k_period)
+    lowest = rolling_min_array(lows, k_period)
+    span = highest - lowest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # A flat window has no range; report the midpoint
+        k = np.where(span > 0, 100.0 * (closes - lowest) / span, 50.0)
+    k[np.isnan(span)] = np.nan
+
+    d = _nan_array(len(k))
+    if len(k) >= k_period - 1 + d_period:
+        d[k_period - 1 :] = sma_array(k[k_period - 1 :], d_period)
+    return (k, d)
+
+
+def obv_array(closes: np.ndarray, volumes: np.ndarray) -> np.ndarray:
+    """On-Balance Volume, accumulated from 0 at the first bar (missing volume counts as 0)."""
+    if len(closes) == 0:
+        return np.empty(0, dtype=np.float64)
+    signed = np.sign(np.diff(closes)) * np.nan_to_num(volumes[1:])
+    return np.concatenate(([0.0], np.cumsum(signed)))
+
+
+def vwap_array(
+    highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, volumes: np.ndarray, period: int = 20
+) -> np.ndarray:
+    """Rolling Volume-Weighted Average Price of the typical price over `period` bars."""
+    n = len(closes)
+    out = _nan_array(n)
+    if n < period:
+        return out
+
+    volumes = np.nan_to_num(volumes)
+    typical = (highs + lows + closes) / 3.0
+    pv = np.concatenate(([0.0], np.cumsum(typical * volumes)))
+    vol = np.concatenate(([0.0], np.cumsum(volumes)))
+    window_pv = pv[period:] - pv[:-period]
+    window_vol = vol[period:] - vol[:-period]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[period - 1 :] = np.where(window_vol > 0, window_pv / window_vol, np.nan)
+    return out
+
+
+def adx_array(
+    highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int = 14
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Average Directional Index, +DI and -DI (Wilder) over float64 arrays."""
+    n = len(highs)
+    adx, plus_di, minus_di = _nan_array(n), _nan_array(n), _nan_array(n)
+    if n < period + 1:
+        return (adx, plus_di, minus_di)
+
+    up = highs[1:] - highs[:-1]
+    down = lows[:-1] - lows[1:]
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+
+    # Element i of the smoothed series belongs to bar i + 1
+    smoothed_tr = _wilder_average(true_range_array(highs, lows, closes), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di[1:] = 100.0 * _wilder_average(plus_dm, period) / smoothed_tr
+        minus_di[1:] = 100.0 * _wilder_average(minus_dm, period) / smoothed_tr
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum > 0, 100.0 * np.abs(plus_di - minus_di) / di_sum, 0.0)
+    dx[np.isnan(di_sum)] = np.nan
+
+    adx[period:] = _wilder_average(dx[period:], period)
+    return (adx, plus_di, minus_di)
+
+
+def keltner_channels_array(
+    highs: np.ndarray,
+    lows: np.ndarray,
+    closes: np.ndarray,
+    period: int = 20,
+    multiplier: float = 2.0,
+    atr_period: int = 10,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Upper, middle (EMA) and lower Keltner Channels over float64 arrays."""
+    return keltner_channels_from(ema_array(closes, period), atr_array(highs, lows, closes, atr_period), multiplier)
+
+
+def keltner_channels_from(
+    middle: np.ndarray, atr_values: np.ndarray, multiplier: float = 2.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Keltner Channels from precomputed EMA and ATR arrays."""
+    return (middle + multiplier * atr_values, middle, middle - multiplier * atr_values)
+
+
+def donchian_channels_array(
+    highs: np.ndarray, lows: np.ndarray, period: int = 20
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Upper (highest high), middle and lower (lowest low) Donchian Channels."""
+    upper = rolling_max_array(highs, period)
+    lower = rolling_min_array(lows, period)
+    return (upper, (upper + lower) / 2.0, lower)
+
 
 def sma(prices: List[float], period: int) -> List[float | None]:
     """
     Simple Moving Average.
     Returns array of same length as input, with None for first (period-1) values.
     """
-    if len(prices) < period:
-        return [None] * len(prices)
-
-    result: List[float | None] = [None] * (period - 1)
-    for i in range(period - 1, len(prices)):
-        window = prices[i - period + 1 : i + 1]
-        avg = sum(window) / period
-        result.append(avg)
-    return result
+    return to_optional_list(sma_array(as_float_array(prices), period))
 
 
 def ema(prices: List[float], period: int) -> List[float | None]:
@@ -31,23 +343,7 @@ def ema(prices: List[float], period: int) -> List[float | None]:
     Exponential Moving Average.
     Uses standard EMA formula: EMA = (Price - EMA_prev) * (2 / (period + 1)) + EMA_prev
     """
-    if len(prices) < period:
-        return [None] * len(prices)
-
-    result: List[float | None] = [None] * (period - 1)
-    multiplier = 2.0 / (period + 1)
-
-    # Initialize with SMA of first period values
-    initial_sma = sum(prices[:period]) / period
-    result.append(initial_sma)
-    ema_prev = initial_sma
-
-    for i in range(period, len(prices)):
-        ema_current = (prices[i] - ema_prev) * multiplier + ema_prev
-        result.append(ema_current)
-        ema_prev = ema_current
-
-    return result
+    return to_optional_list(ema_array(as_float_array(prices), period))
 
 
 def rsi(prices: List[float], period: int = 14) -> List[float | None]:
@@ -56,44 +352,7 @@ def rsi(prices: List[float], period: int = 14) -> List[float | None]:
     RSI = 100 - (100 / (1 + RS))
     RS = Average Gain / Average Loss over period
     """
-    if len(prices) < period + 1:
-        return [None] * len(prices)
-
-    result: List[float | None] = [None] * period
-
-    # Calculate price changes
-    changes = [prices[i] - prices[i - 1] for i in range(1, len(prices))]
-
-    # Calculate initial average gain and loss
-    gains = [c if c > 0 else 0.0 for c in changes[:period]]
-    losses = [-c if c < 0 else 0.0 for c in changes[:period]]
-    avg_gain = sum(gains) / period
-    avg_loss = sum(losses) / period
-
-    if avg_loss == 0:
-        result.append(100.0)
-    else:
-        rs = avg_gain / avg_loss
-        rsi_value = 100.0 - (100.0 / (1.0 + rs))
-        result.append(rsi_value)
-
-    # Calculate subsequent RSI values using Wilder's smoothing
-    for i in range(period, len(changes)):
-        change = changes[i]
-        gain = change if change > 0 else 0.0
-        loss = -change if change < 0 else 0.0
-
-        avg_gain = (avg_gain * (period - 1) + gain) / period
-        avg_loss = (avg_loss * (period - 1) + loss) / period
-
-        if avg_loss == 0:
-            result.append(100.0)
-        else:
-            rs = avg_gain / avg_loss
-            rsi_value = 100.0 - (100.0 / (1.0 + rs))
-            result.append(rsi_value)
-
-    return result
+    return to_optional_list(rsi_array(as_float_array(prices), period))
 
 
 def macd(
@@ -103,42 +362,10 @@ def macd(
     Moving Average Convergence Divergence.
     Returns (MACD line, Signal line, Histogram) as three arrays.
     """
-    ema_fast = ema(prices, fast_period)
-    ema_slow = ema(prices, slow_period)
-
-    # MACD line = EMA(fast) - EMA(slow)
-    macd_line: List[float | None] = []
-    for i in range(len(prices)):
-        if ema_fast[i] is None or ema_slow[i] is None:
-            macd_line.append(None)
-        else:
-            macd_line.append(ema_fast[i] - ema_slow[i])
-
-    # Signal line = EMA of MACD line
-    # Filter out None values for EMA calculation
-    macd_values = [v for v in macd_line if v is not None]
-    if len(macd_values) < signal_period:
-        signal_line = [None] * len(macd_line)
-    else:
-        signal_line_raw = ema(macd_values, signal_period)
-        # Map back to original positions
-        signal_line = [None] * len(macd_line)
-        signal_idx = 0
-        for i in range(len(macd_line)):
-            if macd_line[i] is not None:
-                if signal_idx < len(signal_line_raw):
-                    signal_line[i] = signal_line_raw[signal_idx]
-                signal_idx += 1
-
-    # Histogram = MACD - Signal
-    histogram: List[float | None] = []
-    for i in range(len(macd_line)):
-        if macd_line[i] is None or signal_line[i] is None:
-            histogram.append(None)
-        else:
-            histogram.append(macd_line[i] - signal_line[i])
-
-    return (macd_line, signal_line, histogram)
+    macd_line, signal_line, histogram = macd_array(
+        as_float_array(prices), fast_period, slow_period, signal_period
+    )
+    return (to_optional_list(macd_line), to_optional_list(signal_line), to_optional_list(histogram))
 
 
 def bollinger_bands(
@@ -148,29 +375,8 @@ def bollinger_bands(
     Bollinger Bands.
     Returns (Upper band, Middle band (SMA), Lower band) as three arrays.
     """
-    sma_values = sma(prices, period)
-    result_upper: List[float | None] = []
-    result_middle: List[float | None] = sma_values
-    result_lower: List[float | None] = []
-
-    for i in range(len(prices)):
-        if sma_values[i] is None:
-            result_upper.append(None)
-            result_lower.append(None)
-        else:
-            # Calculate standard deviation of the window
-            start_idx = i - period + 1
-            window = prices[start_idx : i + 1]
-            mean = sma_values[i]
-            variance = sum((p - mean) ** 2 for p in window) / period
-            std_dev = variance ** 0.5
-
-            upper = mean + (num_std * std_dev)
-            lower = mean - (num_std * std_dev)
-            result_upper.append(upper)
-            result_lower.append(lower)
-
-    return (result_upper, result_middle, result_lower)
+    upper, middle, lower = bollinger_bands_array(as_float_array(prices), period, num_std)
+    return (to_optional_list(upper), to_optional_list(middle), to_optional_list(lower))
 
 
 def atr(highs: List[float], lows: List[float], closes: List[float], period: int = 14) -> List[float | None]:
@@ -179,19 +385,6 @@ def atr(highs: List[float], lows: List[float], closes: List[float], period: int
     True Range = max(high - low, abs(high - prev_close), abs(low - prev_close))
     ATR = SMA of True Range
     """
-    if len(highs) != len(lows) or len(highs) != len(closes) or len(highs) < period + 1:
-        return [None] * len(highs)
-
-    true_ranges: List[float] = []
-
-    for i in range(1, len(highs)):
-        tr1 = highs[i] - lows[i]
-        tr2 = abs(highs[i] - closes[i - 1])
-        tr3 = abs(lows[i] - closes[i - 1])
-        true_range = max(tr1, tr2, tr3)
-        true_ranges.append(true_range)
-
-    # Calculate ATR as SMA of True Range
-    atr_values = sma(true_ranges, period)
-    # Pad with None at the beginning to match input length
-    return [None] + atr_values
+    return to_optional_list(
+        atr_array(as_float_array(highs), as_float_array(lows), as_float_array(closes), period)
+    )
@@ -0,0 +1,65 @@
+"""
+Bulk-import OHLCV bars from CSV / CSV.gz files into price history.
+
+    python import_prices.py data/vendor/*.csv.gz
+    python import_prices.py AAPL.csv --interval daily --replace
+
+See app.services.price_import for the expected file layout. A running
+server notices the rewritten tickers within
+PRICE_CACHE_REVISION_CHECK_SECONDS (they are stamped in price_revisions)
+and reloads them from the database; no restart is needed.
+"""
+import argparse
+import sys
+
+from app.database import SessionLocal
+from app.services.price_import import DEFAULT_CHUNK_ROWS, import_price_files
+
+
+def _print_progress(progress):
+    print(
+        f"\r{progress['file']}: {progress['rows_read']:,} rows read, "
+        f"{progress['rows_rejected']:,} rejected ({progress['fraction']:.0%})",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="CSV or CSV.gz files")
+    parser.add_argument("--interval", default="daily", help="Bar interval of the files (default: daily)")
+    parser.add_argument("--ticker", help="Ticker for files without a ticker column (default: file name)")
+    parser.add_argument("--replace", action="store_true", help="Overwrite bars that already exist")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows parsed per chunk")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = import_price_files(
+            db, args.paths, args.interval, args.ticker, args.replace, args.chunk_rows, _print_progress
+        )
+    finally:
+        db.close()
+    print(file=sys.stderr)
+
+    for r in result["results"]:
+        if r["status"] != "success":
+            print(f"{r['file']}: FAILED - {r.get('message')}")
+            continue
+        print(
+            f"{r['file']}: {r['rows_accepted']:,} bars for {r['tickers']} tickers, "
+            f"{r['rows_rejected']:,} rejected in {r['elapsed_seconds']:.1f}s"
+        )
+        if r["rejected_rows"]:
+            print(f"  first rejected rows: {', '.join(map(str, r['rejected_rows']))}")
+    print(
+        f"Total: {result['rows_accepted']:,} bars, {result['rows_rejected']:,} rejected "
+        f"in {result['elapsed_seconds']:.1f}s"
+    )
+    return 0 if all(r["status"] == "success" for r in result["results"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
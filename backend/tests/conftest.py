@@ -0,0 +1,102 @@
+"""
+Shared pytest fixtures.
+
+Settings are read at import time, so the environment is pointed at a
+throwaway SQLite database (and away from the network and the real data
+directories) before anything from `app` is imported.
+"""
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+_TMP_DIR = tempfile.mkdtemp(prefix="quantvault-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}"
+os.environ["ALPHA_VANTAGE_API_KEY"] = ""
+os.environ["ALPHA_VANTAGE_CACHE_DIR"] = ""
+os.environ["PRICE_ARCHIVE_DIR"] = os.path.join(_TMP_DIR, "archive")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pytest  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import PriceBar, Security, User  # noqa: E402
+from app.services.price_cache import invalidate_price_arrays  # noqa: E402
+
+# (month, day) of a year's worth of exchange holidays, approximating the
+# NYSE calendar (about 251 sessions a year)
+_HOLIDAYS = {(1, 1), (1, 20), (2, 17), (4, 18), (5, 26), (6, 19), (7, 4), (9, 1), (11, 27), (12, 25)}
+
+
+def _is_holiday(day: date) -> bool:
+    """A _HOLIDAYS date, or the Friday/Monday it is observed on when it falls on a weekend."""
+    observed = {day, day + timedelta(days=1)} if day.weekday() == 4 else {day}
+    if day.weekday() == 0:
+        observed.add(day - timedelta(days=1))
+    return any((d.month, d.day) in _HOLIDAYS for d in observed)
+
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables."""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client(db):
+    """TestClient authenticated as an admin user."""
+    from fastapi.testclient import TestClient
+
+    from app import create_app
+    from app.services.auth import create_access_token
+
+    user = User(username="admin", email="admin@example.com", hashed_password="x", role="admin")
+    db.add(user)
+    db.commit()
+    test_client = TestClient(create_app())
+    test_client.headers["Authorization"] = "Bearer " + create_access_token({"sub": str(user.id)})
+    return test_client
+
+
+@pytest.fixture
+def add_daily_bars(db):
+    """
+    Insert `days` of random-walk daily bars (weekdays only, and with
+    holidays=True no bars on _HOLIDAYS) ending today for a ticker.
+    """
+
+    def add(ticker: str, days: int = 60, start_price: float = 100.0, holidays: bool = False) -> None:
+        db.add(Security(ticker=ticker, name=ticker, sector="Tech", price=start_price))
+        # A reproducible random walk per ticker
+        rng = np.random.default_rng(sum(map(ord, ticker)))
+        price = start_price
+        first = date.today() - timedelta(days=days)
+        for i in range(days + 1):
+            day = first + timedelta(days=i)
+            if day.weekday() >= 5 or (holidays and _is_holiday(day)):
+                continue
+            open_price = price
+            price *= 1.0 + rng.normal(0.0, 0.015)
+            db.add(
+                PriceBar(
+                    ticker=ticker,
+                    interval="daily",
+                    timestamp=datetime.combine(day, datetime.min.time()),
+                    open=open_price,
+                    high=max(open_price, price) * (1.0 + rng.uniform(0.0, 0.01)),
+                    low=min(open_price, price) * (1.0 - rng.uniform(0.0, 0.01)),
+                    close=price,
+                    volume=float(rng.integers(100_000, 5_000_000)),
+                )
+            )
+        db.commit()
+        invalidate_price_arrays(ticker)
+
+    return add
@@ -0,0 +1,107 @@
+import asyncio
+import os
+
+from app.config import get_settings
+from app.services import alpha_vantage as av
+
+
+class _Response:
+    status_code = 200
+
+    def json(self):
+        return {"Global Quote": {"05. price": "10.0"}}
+
+
+class _Client:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def get(self, url, params=None):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return _Response()
+
+
+def test_reserve_with_max_wait_fails_fast_without_taking_a_token():
+    bucket = av.TokenBucket(calls_per_minute=60)
+    assert bucket.reserve(max_wait=0) == 0.0
+    assert bucket.reserve(max_wait=0.5) is None
+    # The refused call left the bucket as it was
+    wait = bucket.reserve(max_wait=5)
+    assert wait is not None and 0.5 < wait <= 1.0
+
+
+def test_queued_async_requests_do_not_reserve_tokens_ahead(monkeypatch):
+    limit = get_settings().ALPHA_VANTAGE_MAX_CONCURRENCY
+    bucket = av.TokenBucket(calls_per_minute=60)
+    monkeypatch.setattr(av, "_bucket", bucket)
+    client = _Client()
+
+    async def run():
+        tasks = [
+            asyncio.create_task(av.request_json_async(client, {"function": "GLOBAL_QUOTE", "symbol": f"T{i}"}))
+            for i in range(50)
+        ]
+        for _ in range(20):
+            await asyncio.sleep(0)
+        debt = -bucket._tokens
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return debt
+
+    debt = asyncio.run(run())
+    assert debt <= limit
+    assert client.peak <= limit
+
+
+def test_interactive_quote_gives_up_when_the_bucket_is_busy(monkeypatch):
+    bucket = av.TokenBucket(calls_per_minute=1)
+    bucket.reserve()
+    monkeypatch.setattr(av, "_bucket", bucket)
+    monkeypatch.setattr(av, "_API_KEY", "demo")
+    called = []
+    monkeypatch.setattr(av, "_session", lambda: called.append(1))
+
+    assert av.get_quote("AAPL") is None
+    assert not called
+
+
+def test_disk_cache_prunes_the_oldest_responses_past_its_cap(tmp_path, monkeypatch):
+    monkeypatch.setattr(av, "_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(av, "_CACHE_MAX_BYTES", 2000)
+    monkeypatch.setitem(av._cache_size, "bytes", None)
+    data = {"Global Quote": {"05. price": "1" * 400}}
+
+    for i, symbol in enumerate(["A", "B", "C", "D", "E", "F"]):
+        params = {"function": "GLOBAL_QUOTE", "symbol": symbol}
+        av._save_cache(params, data)
+        os.utime(av._cache_path(params), (1000 + i, 1000 + i))
+
+    remaining = sorted(os.path.basename(path)[0] for _, _, path in av._cache_files())
+    assert sum(size for _, size, _ in av._cache_files()) <= 2000
+    assert remaining and remaining[-1] == "F" and "A" not in remaining
+
+
+def test_interactive_quote_does_not_back_off_when_throttled(monkeypatch):
+    class _Throttled:
+        status_code = 200
+
+        def json(self):
+            return {"Note": "Thank you for using Alpha Vantage! Our standard API rate limit is 25 requests per day."}
+
+    class _Session:
+        def get(self, *args, **kwargs):
+            return _Throttled()
+
+    monkeypatch.setattr(av, "_bucket", av.TokenBucket(calls_per_minute=600, burst=10))
+    monkeypatch.setattr(av, "_API_KEY", "demo")
+    monkeypatch.setattr(av, "_session", _Session)
+    slept = []
+    monkeypatch.setattr(av.time, "sleep", slept.append)
+
+    assert av.get_quote("AAPL") is None
+    assert all(delay <= get_settings().ALPHA_VANTAGE_INTERACTIVE_MAX_WAIT for delay in slept)
@@ -0,0 +1,145 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from app.models import IndicatorBar, PriceBar
+from app.services.indicator_compute import (
+    advance_indicators,
+    compute_and_store_indicators,
+    compute_indicators_for_universe,
+    fill_indicator_gaps,
+    find_missing_indicator_points,
+)
+from app.services.price_history import _store_daily_bar
+from app.services.indicator_registry import BAR_FIELDS, DEFAULT_INDICATORS, compute_indicators, warmup_bars
+from app.services.price_cache import get_price_arrays, invalidate_price_arrays
+from app.services.technical_analysis import obv_array
+
+
+def _stored(db, ticker, column):
+    rows = (
+        db.query(IndicatorBar.timestamp, getattr(IndicatorBar, column))
+        .filter(IndicatorBar.ticker == ticker, IndicatorBar.interval == "daily")
+        .order_by(IndicatorBar.timestamp)
+        .all()
+    )
+    return {ts: value for ts, value in rows if value is not None}
+
+
+def _full_history_obv(db, ticker):
+    arrays = get_price_arrays(db, ticker)
+    values = obv_array(arrays["closes"], arrays["volumes"])
+    return dict(zip(arrays["timestamps"].astype("datetime64[us]").tolist(), values.tolist()))
+
+
+def test_default_indicators_do_not_need_the_whole_history():
+    assert warmup_bars(DEFAULT_INDICATORS) < 2000
+
+
+def test_windowed_obv_matches_the_full_history(db, add_daily_bars):
+    add_daily_bars("AAPL", days=900)
+
+    compute_and_store_indicators(db, "AAPL", start_date=date.today() - timedelta(days=200))
+
+    stored = _stored(db, "AAPL", "obv")
+    expected = _full_history_obv(db, "AAPL")
+    assert len(stored) > 100
+    assert all(np.isclose(value, expected[ts]) for ts, value in stored.items())
+
+
+def test_universe_obv_is_seeded_from_stored_and_cached_history(db, add_daily_bars):
+    add_daily_bars("AAPL", days=900)
+    add_daily_bars("MSFT", days=900, start_price=300.0)
+    start = date.today() - timedelta(days=120)
+
+    # MSFT has a stored OBV at its first loaded bar, AAPL has nothing stored
+    compute_and_store_indicators(db, "MSFT", start_date=date.today() - timedelta(days=800))
+    compute_indicators_for_universe(db, ["AAPL", "MSFT"], start_date=start, max_workers=1)
+
+    for ticker in ("AAPL", "MSFT"):
+        stored = _stored(db, ticker, "obv")
+        expected = _full_history_obv(db, ticker)
+        assert all(np.isclose(value, expected[ts]) for ts, value in stored.items())
+
+
+def test_points_undefined_by_the_data_are_not_refilled(db, add_daily_bars):
+    add_daily_bars("AAPL", days=200)
+    db.query(PriceBar).filter(PriceBar.ticker == "AAPL").update({"volume": None})
+    db.commit()
+    invalidate_price_arrays("AAPL")
+    start = date.today() - timedelta(days=90)
+
+    first = fill_indicator_gaps(db, "AAPL", ["VWAP_20", "SMA_20"], start_date=start)
+    missing = find_missing_indicator_points(db, "AAPL", ["VWAP_20", "SMA_20"], start, date.today())
+
+    assert first["status"] == "filled"
+    assert missing == {"VWAP_20": [], "SMA_20": []}
+    assert fill_indicator_gaps(db, "AAPL", ["VWAP_20", "SMA_20"], start_date=start)["status"] == "cached"
+
+
+def test_windowed_recursive_series_match_the_full_history(db, add_daily_bars):
+    add_daily_bars("AAPL", days=1500)
+    compute_and_store_indicators(db, "AAPL", start_date=date.today() - timedelta(days=200))
+
+    arrays = get_price_arrays(db, "AAPL")
+    full = compute_indicators({f: arrays[f] for f in BAR_FIELDS}, ["EMA_50", "RSI_14", "MACD", "ADX_14"])
+    timestamps = arrays["timestamps"].astype("datetime64[us]").tolist()
+    for name, column in (("EMA_50", "ema_50"), ("RSI_14", "rsi_14"), ("MACD", "macd"), ("ADX_14", "adx_14")):
+        expected = dict(zip(timestamps, full[name][0].tolist()))
+        stored = _stored(db, "AAPL", column)
+        assert len(stored) > 100
+        np.testing.assert_allclose(list(stored.values()), [expected[ts] for ts in stored], rtol=1e-6, atol=1e-6)
+
+
+def test_rebuilt_streaming_state_matches_the_batch_values(db, add_daily_bars):
+    add_daily_bars("AAPL", days=1500)
+    start = date.today() - timedelta(days=200)
+    compute_and_store_indicators(db, "AAPL", start_date=start)
+    last = db.query(PriceBar).filter(PriceBar.ticker == "AAPL").order_by(PriceBar.timestamp.desc()).first()
+
+    # No streaming state yet, so the revision rebuilds it from the history
+    _store_daily_bar(
+        db, "AAPL", last.timestamp, last, last.open, last.high * 1.05, last.low, last.high * 1.04, last.volume
+    )
+
+    arrays = get_price_arrays(db, "AAPL")
+    full = compute_indicators({f: arrays[f] for f in BAR_FIELDS}, ["EMA_50", "RSI_14"])
+    row = db.query(IndicatorBar).filter(IndicatorBar.ticker == "AAPL", IndicatorBar.timestamp == last.timestamp).one()
+    np.testing.assert_allclose([row.ema_50, row.rsi_14], [full["EMA_50"][0][-1], full["RSI_14"][0][-1]], rtol=1e-6)
+
+    # Series without a streaming form are left for the gap fill
+    assert row.obv is None and row.adx_14 is None
+    assert fill_indicator_gaps(db, "AAPL", ["OBV", "ADX_14"], start_date=start)["status"] == "filled"
+    db.refresh(row)
+    assert np.isclose(row.obv, _full_history_obv(db, "AAPL")[last.timestamp])
+
+
+def test_universe_window_matches_the_full_history_on_a_holiday_calendar(db, add_daily_bars):
+    add_daily_bars("AAPL", days=900, holidays=True)
+    arrays = get_price_arrays(db, "AAPL")
+    full = compute_indicators({f: arrays[f] for f in BAR_FIELDS}, ["SMA_200"])
+    timestamps = arrays["timestamps"].astype("datetime64[us]").tolist()
+    expected = dict(zip(timestamps, full["SMA_200"][0].tolist()))
+
+    # SMA_200 alone needs a long lookback with no longer warm-up to hide a
+    # short one; windows starting across the year see different holidays
+    for days in (40, 120, 200, 280):
+        start = date.today() - timedelta(days=days)
+        db.query(IndicatorBar).delete()
+        compute_indicators_for_universe(db, ["AAPL"], start_date=start, max_workers=1, indicator_types=["SMA_200"])
+
+        window = [ts for ts in timestamps if ts.date() >= start]
+        stored = _stored(db, "AAPL", "sma_200")
+        assert sorted(stored) == window
+        np.testing.assert_allclose([stored[ts] for ts in window], [expected[ts] for ts in window])
+
+
+def test_advancing_without_history_stores_nothing(db):
+    bar = PriceBar(ticker="IPO", interval="daily", timestamp=datetime(2024, 1, 2), open=1.0, high=1.0, low=1.0, close=1.0)
+    assert advance_indicators(db, bar)["status"] == "no_history"
+
+    # Once stored, the first bar rebuilds the state but no indicator has a value yet
+    db.add(bar)
+    db.commit()
+    assert advance_indicators(db, bar)["status"] == "rebuilt"
+    assert db.query(IndicatorBar).count() == 0
@@ -0,0 +1,25 @@
+from app.models import PriceBar
+from app.services.pattern_scanner import scan_patterns
+
+
+def _set_last_bar(db, ticker, **values):
+    bar = db.query(PriceBar).filter(PriceBar.ticker == ticker).order_by(PriceBar.timestamp.desc()).first()
+    for field, value in values.items():
+        setattr(bar, field, value)
+    db.commit()
+    return bar.timestamp
+
+
+def test_52_week_patterns_match_on_a_calendar_with_holidays(db, add_daily_bars):
+    add_daily_bars("AAPL", days=800, holidays=True)
+    add_daily_bars("MSFT", days=800, start_price=300.0, holidays=True)
+    last = _set_last_bar(db, "AAPL", open=1e6, high=1e6, low=1e6, close=1e6)
+    _set_last_bar(db, "MSFT", open=1e-6, high=1e-6, low=1e-6, close=1e-6)
+
+    result = scan_patterns(db, ["breakout_52w", "breakdown_52w"])
+
+    found = {(m["ticker"], m["pattern"], m["timestamp"]) for m in result["matches"]}
+    assert found == {
+        ("AAPL", "breakout_52w", last.isoformat()),
+        ("MSFT", "breakdown_52w", last.isoformat()),
+    }
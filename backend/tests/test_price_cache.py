@@ -0,0 +1,78 @@
+from datetime import datetime
+
+from app.models import PriceBar, PriceRevision
+from app.services import price_cache
+from app.services.price_cache import append_price_bar, get_price_arrays, mark_history_revised, price_cache_stats
+
+
+def _rewrite_last_close(db, ticker, close):
+    bar = db.query(PriceBar).filter(PriceBar.ticker == ticker).order_by(PriceBar.timestamp.desc()).first()
+    bar.close = close
+    db.commit()
+
+
+def test_history_rewritten_by_another_process_is_reloaded(db, add_daily_bars, monkeypatch):
+    monkeypatch.setattr(price_cache, "_REVISION_CHECK_SECONDS", 0)
+    add_daily_bars("AAPL")
+    assert get_price_arrays(db, "AAPL")["closes"][-1] != 1.0
+
+    # What the import CLI does from its own process: rewrite bars, stamp the ticker
+    _rewrite_last_close(db, "AAPL", 1.0)
+    db.add(PriceRevision(ticker="AAPL", interval="daily", revised_at=datetime.utcnow()))
+    db.commit()
+
+    assert get_price_arrays(db, "AAPL")["closes"][-1] == 1.0
+
+
+def test_own_revision_stamps_do_not_invalidate_twice(db, add_daily_bars, monkeypatch):
+    monkeypatch.setattr(price_cache, "_REVISION_CHECK_SECONDS", 0)
+    add_daily_bars("AAPL")
+    mark_history_revised(db, "AAPL")
+    db.commit()
+    get_price_arrays(db, "AAPL")
+    invalidations = price_cache_stats()["invalidations"]
+
+    get_price_arrays(db, "AAPL")
+
+    assert price_cache_stats()["invalidations"] == invalidations
+
+
+def test_revision_poll_is_throttled(db, add_daily_bars, monkeypatch):
+    monkeypatch.setattr(price_cache, "_REVISION_CHECK_SECONDS", 3600)
+    monkeypatch.setitem(price_cache._revision_poll, "at", None)
+    add_daily_bars("AAPL")
+    get_price_arrays(db, "AAPL")
+
+    _rewrite_last_close(db, "AAPL", 1.0)
+    db.add(PriceRevision(ticker="AAPL", interval="daily", revised_at=datetime.utcnow()))
+    db.commit()
+
+    # Within the poll interval the cached copy is served as is
+    assert get_price_arrays(db, "AAPL")["closes"][-1] != 1.0
+
+
+def test_revising_the_last_bar_leaves_earlier_views_unchanged(db, add_daily_bars):
+    add_daily_bars("AAPL")
+    before = get_price_arrays(db, "AAPL")
+    last = before["timestamps"][-1].item()
+    close = before["closes"][-1]
+
+    append_price_bar("AAPL", "daily", last, 1.0, 2.0, 0.5, 1.5, 100.0)
+
+    assert before["closes"][-1] == close
+    after = get_price_arrays(db, "AAPL")
+    assert after["closes"][-1] == 1.5
+    assert len(after["closes"]) == len(before["closes"])
+
+
+def test_appending_a_bar_leaves_earlier_views_unchanged(db, add_daily_bars):
+    add_daily_bars("AAPL")
+    before = get_price_arrays(db, "AAPL")
+    later = before["timestamps"][-1].item().replace(year=before["timestamps"][-1].item().year + 1)
+
+    append_price_bar("AAPL", "daily", later, 1.0, 2.0, 0.5, 1.5, None)
+
+    after = get_price_arrays(db, "AAPL")
+    assert len(after["closes"]) == len(before["closes"]) + 1
+    assert after["closes"][-1] == 1.5 and after["volumes"][-1] != after["volumes"][-1]
+    assert before["closes"][-1] != 1.5
@@ -0,0 +1,121 @@
+from datetime import date, datetime, timedelta
+
+from app.models import IndicatorBar, PriceBar
+from app.services.indicator_compute import compute_and_store_indicators
+from app.services import price_history
+from app.services.price_history import _store_backfill, rollup_daily_bars
+
+
+def _indicator_timestamps(db, ticker):
+    return [
+        ts
+        for (ts,) in db.query(IndicatorBar.timestamp).filter(
+            IndicatorBar.ticker == ticker, IndicatorBar.interval == "daily"
+        )
+    ]
+
+
+def _remove_bar(db, ticker, offset):
+    """Delete the bar `offset` bars before the latest; returns it as a backfill payload row."""
+    bar = (
+        db.query(PriceBar)
+        .filter(PriceBar.ticker == ticker)
+        .order_by(PriceBar.timestamp.desc())
+        .offset(offset)
+        .first()
+    )
+    row = {
+        "date": bar.timestamp.date(),
+        "open": bar.open,
+        "high": bar.high,
+        "low": bar.low,
+        "close": bar.close,
+        "volume": bar.volume,
+    }
+    db.delete(bar)
+    db.commit()
+    return row
+
+
+def test_backfilled_gap_invalidates_later_daily_indicators(db, add_daily_bars):
+    add_daily_bars("AAPL", days=200)
+    gap = _remove_bar(db, "AAPL", 30)
+    compute_and_store_indicators(db, "AAPL", start_date=date.today() - timedelta(days=150))
+    before = _indicator_timestamps(db, "AAPL")
+    assert any(ts.date() >= gap["date"] for ts in before)
+
+    result = _store_backfill(db, "AAPL", [gap], "compact")
+
+    assert result["inserted"] == 1
+    after = _indicator_timestamps(db, "AAPL")
+    assert after and all(ts.date() < gap["date"] for ts in after)
+    assert len(after) == sum(1 for ts in before if ts.date() < gap["date"])
+
+
+def test_backfill_counts_only_rows_it_inserted(db, add_daily_bars, monkeypatch):
+    add_daily_bars("AAPL", days=200)
+    gap = _remove_bar(db, "AAPL", 30)
+    compute_and_store_indicators(db, "AAPL", start_date=date.today() - timedelta(days=150))
+    before = _indicator_timestamps(db, "AAPL")
+
+    def written_concurrently(ticker, interval):
+        # Another writer stores the bar between the existing-bars read and the insert
+        db.add(
+            PriceBar(
+                ticker=ticker,
+                interval=interval,
+                timestamp=datetime.combine(gap["date"], datetime.min.time()),
+                open=gap["open"],
+                high=gap["high"],
+                low=gap["low"],
+                close=gap["close"],
+                volume=gap["volume"],
+            )
+        )
+        return None
+
+    monkeypatch.setattr(price_history, "read_archive", written_concurrently)
+    result = _store_backfill(db, "AAPL", [gap], "compact")
+
+    assert (result["inserted"], result["skipped"]) == (0, 1)
+    assert _indicator_timestamps(db, "AAPL") == before
+
+
+def test_multi_day_rollup_invalidates_later_daily_indicators(db, add_daily_bars):
+    add_daily_bars("AAPL", days=200)
+    compute_and_store_indicators(db, "AAPL", start_date=date.today() - timedelta(days=150))
+    days = sorted({ts.date() for ts in _indicator_timestamps(db, "AAPL")})[-10:-7]
+    for day in days:
+        for hour in (14, 15, 16):
+            db.add(
+                PriceBar(
+                    ticker="AAPL",
+                    interval="1h",
+                    timestamp=datetime.combine(day, datetime.min.time()) + timedelta(hours=hour),
+                    open=100.0,
+                    high=101.0,
+                    low=99.0,
+                    close=100.5,
+                    volume=1000.0,
+                )
+            )
+    db.commit()
+
+    assert rollup_daily_bars(db, "AAPL", "1h", datetime.combine(days[0], datetime.min.time())) == 3
+
+    remaining = _indicator_timestamps(db, "AAPL")
+    assert remaining and all(ts.date() < days[0] for ts in remaining)
+
+
+def test_quote_update_looks_up_todays_bar_once(db, add_daily_bars, monkeypatch):
+    add_daily_bars("AAPL", days=30)
+    lookups = []
+    daily_bar = price_history._daily_bar
+    monkeypatch.setattr(price_history, "_daily_bar", lambda *args: lookups.append(1) or daily_bar(*args))
+
+    price_history.upsert_today_bar(db, "AAPL", {"current_price": 1230.0, "volume": 1000})
+    price_history.upsert_today_bar(db, "AAPL", {"current_price": 1250.0, "volume": 2000})
+
+    assert len(lookups) == 2
+    bar = daily_bar(db, "AAPL", datetime.combine(date.today(), datetime.min.time()))
+    assert (bar.high, bar.close) == (1250.0, 1250.0)
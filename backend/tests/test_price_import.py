@@ -0,0 +1,112 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.models import IndicatorBar, PriceBar
+from app.routers import price_history as price_history_router
+from app.services.indicator_compute import compute_and_store_indicators
+from app.services import price_import
+from app.services.price_import import import_price_file
+
+
+def _daily_indicator_dates(db, ticker):
+    return [
+        ts.date()
+        for (ts,) in db.query(IndicatorBar.timestamp).filter(
+            IndicatorBar.ticker == ticker, IndicatorBar.interval == "daily"
+        )
+    ]
+
+
+def _bar_date(db, ticker, offset):
+    bar = db.query(PriceBar).filter(PriceBar.ticker == ticker).order_by(PriceBar.timestamp.desc()).offset(offset).first()
+    return bar.timestamp.date()
+
+
+def test_replacing_bars_invalidates_later_daily_indicators(db, add_daily_bars, tmp_path):
+    add_daily_bars("AAPL", days=200)
+    compute_and_store_indicators(db, "AAPL", start_date=date.today() - timedelta(days=150))
+    revised = _bar_date(db, "AAPL", 20)
+    path = tmp_path / "AAPL.csv"
+    path.write_text(f"date,open,high,low,close,volume\n{revised},90,95,85,92,1000\n")
+
+    report = import_price_file(db, str(path), replace=True)
+
+    assert report["rows_accepted"] == 1
+    remaining = _daily_indicator_dates(db, "AAPL")
+    assert remaining and max(remaining) < revised
+
+
+def test_failed_import_still_invalidates_committed_chunks(db, add_daily_bars, tmp_path, monkeypatch):
+    add_daily_bars("AAPL", days=200)
+    compute_and_store_indicators(db, "AAPL", start_date=date.today() - timedelta(days=150))
+    revised = _bar_date(db, "AAPL", 20)
+    path = tmp_path / "AAPL.csv"
+    path.write_text(f"date,open,high,low,close,volume\n{revised},90,95,85,92,1000\n{date.today()},1,2,0.5,1,10\n")
+
+    upsert = price_import.bulk_upsert
+    calls = []
+
+    def failing_second_chunk(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        return upsert(*args, **kwargs)
+
+    monkeypatch.setattr(price_import, "bulk_upsert", failing_second_chunk)
+    with pytest.raises(RuntimeError):
+        import_price_file(db, str(path), replace=True, chunk_rows=1)
+
+    remaining = _daily_indicator_dates(db, "AAPL")
+    assert remaining and max(remaining) < revised
+
+
+def test_import_status_is_a_snapshot(client):
+    response = client.get("/api/v1/prices/import/status")
+
+    assert response.status_code == 200
+    assert response.json()["running"] is False
+    assert price_history_router.get_import_status(admin=None) is not price_history_router._import_status
+
+
+def test_repeated_bars_in_a_chunk_are_written_once(db, tmp_path, monkeypatch):
+    path = tmp_path / "AAPL.csv"
+    path.write_text("date,open,high,low,close,volume\n2024-01-02,1,2,0.5,1,10\n2024-01-02,1,3,0.5,2,20\n")
+    upsert = price_import.bulk_upsert
+    submitted = []
+
+    def recording(db, model, rows, *args, **kwargs):
+        submitted.extend(rows)
+        return upsert(db, model, rows, *args, **kwargs)
+
+    monkeypatch.setattr(price_import, "bulk_upsert", recording)
+    import_price_file(db, str(path), replace=True)
+
+    assert [row["close"] for row in submitted] == [2.0]
+    assert db.query(PriceBar).filter(PriceBar.ticker == "AAPL").one().close == 2.0
+
+
+def test_unsupported_interval_is_rejected(db, tmp_path):
+    path = tmp_path / "AAPL.csv"
+    path.write_text("date,open,high,low,close\n2024-01-02,1,2,0.5,1\n")
+
+    report = import_price_file(db, str(path), interval="2h")
+
+    assert report["status"] == "failed"
+    assert db.query(PriceBar).count() == 0
+
+
+def test_invalidation_failure_does_not_hide_the_import_error(db, tmp_path, monkeypatch):
+    path = tmp_path / "AAPL.csv"
+    path.write_text("date,open,high,low,close\n2024-01-02,1,2,0.5,1\n")
+
+    def failing_upsert(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    def failing_invalidation(*args, **kwargs):
+        raise ValueError("cache unavailable")
+
+    monkeypatch.setattr(price_import, "bulk_upsert", failing_upsert)
+    monkeypatch.setattr(price_import, "_invalidate_imported", failing_invalidation)
+    with pytest.raises(RuntimeError):
+        import_price_file(db, str(path))
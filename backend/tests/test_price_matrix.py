@@ -0,0 +1,35 @@
+import pytest
+
+
+@pytest.mark.parametrize("prefix", ["/api", "/api/v1"])
+def test_matrix_route_is_not_shadowed_by_quote_route(client, add_daily_bars, prefix):
+    add_daily_bars("AAPL")
+    add_daily_bars("MSFT")
+
+    resp = client.get(f"{prefix}/prices/matrix", params={"tickers": "AAPL,MSFT,ZZZ"})
+
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["tickers"] == ["AAPL", "MSFT"]
+    assert body["missing_tickers"] == ["ZZZ"]
+    assert len(body["values"]) == 2
+    assert len(body["values"][0]) == len(body["timestamps"]) > 0
+
+
+def test_matrix_log_returns_drop_missing_dates(client, add_daily_bars, db):
+    from app.models import PriceBar
+
+    add_daily_bars("AAPL")
+    add_daily_bars("MSFT")
+    gap = db.query(PriceBar).filter(PriceBar.ticker == "MSFT").order_by(PriceBar.timestamp.desc()).offset(2).first()
+    db.delete(gap)
+    db.commit()
+
+    keep = client.get("/api/prices/matrix", params={"tickers": "AAPL,MSFT", "values": "log_return"}).json()
+    drop = client.get(
+        "/api/prices/matrix", params={"tickers": "AAPL,MSFT", "values": "log_return", "missing": "drop"}
+    ).json()
+
+    assert None in keep["values"][1]
+    assert len(drop["timestamps"]) == len(keep["timestamps"]) - 1
+    assert all(v is not None for row in drop["values"] for v in row)
@@ -0,0 +1,57 @@
+import pytest
+
+from app.models import CompanyOverview, PriceBar, Security
+from app.services import price_refresh
+
+
+def _quote(ticker, price):
+    return {"ticker": ticker, "current_price": price, "change": 0.0, "change_percent": 0.0, "volume": 100}
+
+
+def _securities(db, *tickers):
+    for ticker in tickers:
+        db.add(Security(ticker=ticker, name=ticker, sector="Tech", price=1.0))
+    db.commit()
+
+
+def test_refresh_applies_quotes_and_overviews(db, monkeypatch):
+    _securities(db, "AAPL", "MSFT", "NVDA")
+
+    async def quotes(client, tickers):
+        yield {"MSFT": _quote("MSFT", 410.0)}
+        yield {"AAPL": _quote("AAPL", 190.0), "NVDA": None}
+
+    async def overview(client, ticker):
+        return {"Sector": "Technology", "Beta": 1.2} if ticker == "AAPL" else None
+
+    monkeypatch.setattr(price_refresh, "iter_quotes_async", quotes)
+    monkeypatch.setattr(price_refresh, "get_company_overview_async", overview)
+
+    result = price_refresh.refresh_all_prices(db)
+
+    assert result["updated_tickers"] == ["AAPL", "MSFT"]
+    assert result["failed_tickers"] == ["NVDA"]
+    prices = {s.ticker: s.price for s in db.query(Security)}
+    assert prices == {"AAPL": 190.0, "MSFT": 410.0, "NVDA": 1.0}
+    assert db.query(PriceBar).filter(PriceBar.interval == "daily").count() == 2
+    assert [(o.ticker, o.sector, o.beta) for o in db.query(CompanyOverview)] == [("AAPL", "Technology", 1.2)]
+
+
+def test_refresh_commits_results_as_they_arrive(db, monkeypatch):
+    _securities(db, "AAPL", "MSFT")
+
+    async def quotes(client, tickers):
+        yield {"AAPL": _quote("AAPL", 190.0)}
+        raise RuntimeError("connection dropped")
+
+    async def overview(client, ticker):
+        return None
+
+    monkeypatch.setattr(price_refresh, "iter_quotes_async", quotes)
+    monkeypatch.setattr(price_refresh, "get_company_overview_async", overview)
+
+    with pytest.raises(RuntimeError):
+        price_refresh.refresh_all_prices(db)
+
+    db.rollback()
+    assert db.query(Security).filter(Security.ticker == "AAPL").one().price == 190.0
@@ -0,0 +1,254 @@
+"""
+Parity tests: each vectorized kernel against a plain reference loop (the
+original list-based implementations, plus straightforward loops for the
+newer indicators) on short, flat, NaN-volume and long series.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from app.services import technical_analysis as ta
+
+NAN = float("nan")
+PERIODS = (1, 2, 14, 20, 50)
+
+
+def _series(name):
+    rng = np.random.default_rng(7)
+    if name == "short":
+        closes = np.array([10.0, 10.5, 10.2, 10.8, 10.4])
+    elif name == "flat":
+        closes = np.full(120, 50.0)
+    else:
+        closes = 100.0 * np.cumprod(1.0 + rng.normal(0.0, 0.02, 2520 if name == "long" else 300))
+    if name == "flat":
+        highs, lows = closes.copy(), closes.copy()
+    else:
+        highs = closes * (1.0 + rng.uniform(0.0, 0.02, len(closes)))
+        lows = closes * (1.0 - rng.uniform(0.0, 0.02, len(closes)))
+    volumes = rng.uniform(1e5, 1e6, len(closes))
+    if name == "nan_volume":
+        volumes[rng.random(len(closes)) < 0.3] = NAN
+        volumes[:25] = NAN
+    return highs, lows, closes, volumes
+
+
+SERIES = ("short", "flat", "nan_volume", "long")
+
+
+def _check(actual, expected):
+    np.testing.assert_allclose(
+        np.asarray(actual, dtype=np.float64), np.asarray(expected, dtype=np.float64),
+        rtol=1e-9, atol=1e-9, equal_nan=True,
+    )
+
+
+# Reference loops
+
+def ref_sma(prices, period):
+    out = [NAN] * len(prices)
+    for i in range(period - 1, len(prices)):
+        out[i] = sum(prices[i - period + 1 : i + 1]) / period
+    return out
+
+
+def ref_ema(prices, period):
+    out = [NAN] * len(prices)
+    if len(prices) < period:
+        return out
+    value = sum(prices[:period]) / period
+    out[period - 1] = value
+    for i in range(period, len(prices)):
+        value = (prices[i] - value) * (2.0 / (period + 1)) + value
+        out[i] = value
+    return out
+
+
+def ref_wilder(values, period):
+    """Wilder's smoothing seeded with the mean of the first `period` values."""
+    out = [NAN] * len(values)
+    if len(values) < period:
+        return out
+    value = sum(values[:period]) / period
+    out[period - 1] = value
+    for i in range(period, len(values)):
+        value = (value * (period - 1) + values[i]) / period
+        out[i] = value
+    return out
+
+
+def ref_rsi(prices, period):
+    out = [NAN] * len(prices)
+    if len(prices) < period + 1:
+        return out
+    changes = [prices[i] - prices[i - 1] for i in range(1, len(prices))]
+    avg_gain = ref_wilder([max(c, 0.0) for c in changes], period)
+    avg_loss = ref_wilder([max(-c, 0.0) for c in changes], period)
+    for i in range(period - 1, len(changes)):
+        out[i + 1] = 100.0 if avg_loss[i] == 0 else 100.0 - 100.0 / (1.0 + avg_gain[i] / avg_loss[i])
+    return out
+
+
+def ref_macd(prices, fast=12, slow=26, signal=9):
+    line = [f - s for f, s in zip(ref_ema(prices, fast), ref_ema(prices, slow))]
+    defined = [i for i, v in enumerate(line) if not math.isnan(v)]
+    signal_line = [NAN] * len(prices)
+    for i, v in zip(defined, ref_ema([line[i] for i in defined], signal)):
+        signal_line[i] = v
+    return line, signal_line, [m - s for m, s in zip(line, signal_line)]
+
+
+def ref_bollinger(prices, period, num_std=2.0):
+    middle = ref_sma(prices, period)
+    upper, lower = [NAN] * len(prices), [NAN] * len(prices)
+    for i in range(period - 1, len(prices)):
+        window = prices[i - period + 1 : i + 1]
+        std = (sum((p - middle[i]) ** 2 for p in window) / period) ** 0.5
+        upper[i], lower[i] = middle[i] + num_std * std, middle[i] - num_std * std
+    return upper, middle, lower
+
+
+def ref_true_ranges(highs, lows, closes):
+    return [
+        max(highs[i] - lows[i], abs(highs[i] - closes[i - 1]), abs(lows[i] - closes[i - 1]))
+        for i in range(1, len(highs))
+    ]
+
+
+def ref_atr(highs, lows, closes, period):
+    if len(highs) < period + 1:
+        return [NAN] * len(highs)
+    return [NAN] + ref_sma(ref_true_ranges(highs, lows, closes), period)
+
+
+def ref_rolling(values, period, fn):
+    out = [NAN] * len(values)
+    for i in range(period - 1, len(values)):
+        out[i] = fn(values[i - period + 1 : i + 1])
+    return out
+
+
+def ref_stochastic(highs, lows, closes, k_period, d_period=3):
+    k = [NAN] * len(closes)
+    for i in range(k_period - 1, len(closes)):
+        hh, ll = max(highs[i - k_period + 1 : i + 1]), min(lows[i - k_period + 1 : i + 1])
+        k[i] = 50.0 if hh == ll else 100.0 * (closes[i] - ll) / (hh - ll)
+    d = [NAN] * len(closes)
+    for i in range(k_period - 1 + d_period - 1, len(closes)):
+        d[i] = sum(k[i - d_period + 1 : i + 1]) / d_period
+    return k, d
+
+
+def ref_obv(closes, volumes):
+    out, total = [], 0.0
+    for i in range(len(closes)):
+        volume = 0.0 if i == 0 or math.isnan(volumes[i]) else volumes[i]
+        if i and closes[i] > closes[i - 1]:
+            total += volume
+        elif i and closes[i] < closes[i - 1]:
+            total -= volume
+        out.append(total)
+    return out
+
+
+def ref_vwap(highs, lows, closes, volumes, period):
+    out = [NAN] * len(closes)
+    for i in range(period - 1, len(closes)):
+        pv = vol = 0.0
+        for j in range(i - period + 1, i + 1):
+            v = 0.0 if math.isnan(volumes[j]) else volumes[j]
+            pv += (highs[j] + lows[j] + closes[j]) / 3.0 * v
+            vol += v
+        out[i] = pv / vol if vol > 0 else NAN
+    return out
+
+
+def ref_adx(highs, lows, closes, period):
+    n = len(highs)
+    adx, plus_di, minus_di = [NAN] * n, [NAN] * n, [NAN] * n
+    if n < period + 1:
+        return adx, plus_di, minus_di
+    plus_dm, minus_dm = [], []
+    for i in range(1, n):
+        up, down = highs[i] - highs[i - 1], lows[i - 1] - lows[i]
+        plus_dm.append(up if up > down and up > 0 else 0.0)
+        minus_dm.append(down if down > up and down > 0 else 0.0)
+    tr = ref_wilder(ref_true_ranges(highs, lows, closes), period)
+    plus, minus = ref_wilder(plus_dm, period), ref_wilder(minus_dm, period)
+    dx = [NAN] * n
+    for i in range(period - 1, n - 1):
+        if tr[i] == 0:
+            continue
+        plus_di[i + 1], minus_di[i + 1] = 100.0 * plus[i] / tr[i], 100.0 * minus[i] / tr[i]
+        total = plus_di[i + 1] + minus_di[i + 1]
+        dx[i + 1] = 100.0 * abs(plus_di[i + 1] - minus_di[i + 1]) / total if total > 0 else 0.0
+    adx[period:] = ref_wilder(dx[period:], period)
+    return adx, plus_di, minus_di
+
+
+# Tests
+
+@pytest.mark.parametrize("name", SERIES)
+@pytest.mark.parametrize("period", PERIODS)
+def test_moving_averages(name, period):
+    _, _, closes, _ = _series(name)
+    prices = closes.tolist()
+    _check(ta.sma_array(closes, period), ref_sma(prices, period))
+    _check(ta.ema_array(closes, period), ref_ema(prices, period))
+    _check(ta.rsi_array(closes, period), ref_rsi(prices, period))
+    for actual, expected in zip(ta.bollinger_bands_array(closes, period), ref_bollinger(prices, period)):
+        _check(actual, expected)
+
+
+@pytest.mark.parametrize("name", SERIES)
+def test_macd(name):
+    _, _, closes, _ = _series(name)
+    for actual, expected in zip(ta.macd_array(closes), ref_macd(closes.tolist())):
+        _check(actual, expected)
+
+
+@pytest.mark.parametrize("name", SERIES)
+@pytest.mark.parametrize("period", PERIODS)
+def test_range_indicators(name, period):
+    highs, lows, closes, _ = _series(name)
+    h, l, c = highs.tolist(), lows.tolist(), closes.tolist()
+    _check(ta.atr_array(highs, lows, closes, period), ref_atr(h, l, c, period))
+    _check(ta.rolling_max_array(highs, period), ref_rolling(h, period, max))
+    _check(ta.rolling_min_array(lows, period), ref_rolling(l, period, min))
+    for actual, expected in zip(ta.stochastic_array(highs, lows, closes, period), ref_stochastic(h, l, c, period)):
+        _check(actual, expected)
+    for actual, expected in zip(ta.adx_array(highs, lows, closes, period), ref_adx(h, l, c, period)):
+        _check(actual, expected)
+
+
+@pytest.mark.parametrize("name", SERIES)
+@pytest.mark.parametrize("period", PERIODS)
+def test_volume_indicators(name, period):
+    highs, lows, closes, volumes = _series(name)
+    h, l, c, v = highs.tolist(), lows.tolist(), closes.tolist(), volumes.tolist()
+    _check(ta.obv_array(closes, volumes), ref_obv(c, v))
+    _check(ta.vwap_array(highs, lows, closes, volumes, period), ref_vwap(h, l, c, v, period))
+
+
+@pytest.mark.parametrize("name", SERIES)
+def test_channels(name):
+    highs, lows, closes, _ = _series(name)
+    h, l, c = highs.tolist(), lows.tolist(), closes.tolist()
+    middle = ref_ema(c, 20)
+    atr = ref_atr(h, l, c, 10)
+    expected = ([m + 2.0 * a for m, a in zip(middle, atr)], middle, [m - 2.0 * a for m, a in zip(middle, atr)])
+    for actual, ref in zip(ta.keltner_channels_array(highs, lows, closes), expected):
+        _check(actual, ref)
+
+    upper, lower = ref_rolling(h, 20, max), ref_rolling(l, 20, min)
+    expected = (upper, [(u + lo) / 2.0 for u, lo in zip(upper, lower)], lower)
+    for actual, ref in zip(ta.donchian_channels_array(highs, lows), expected):
+        _check(actual, ref)
+
+
+def test_list_wrappers_pad_with_none():
+    prices = [1.0, 2.0, 3.0, 4.0]
+    assert ta.sma(prices, 2) == [None, 1.5, 2.5, 3.5]
+    assert ta.rsi(prices, 14) == [None] * 4
+    assert ta.atr(prices, prices, prices[:3]) == [None] * 4
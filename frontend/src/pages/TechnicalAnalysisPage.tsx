@@ -45,12 +45,12 @@ export function TechnicalAnalysisPage() {
       if (points[idx]) {
         if (indicator === "MACD" && points[idx].parameters) {
           data.macd = points[idx].value;
-          data.macd_signal = points[idx].parameters.signal?.[idx]?.value;
-          data.macd_histogram = points[idx].parameters.histogram?.[idx]?.value;
+          data.macd_signal = points[idx].parameters.signal;
+          data.macd_histogram = points[idx].parameters.histogram;
         } else if (indicator === "BB_20" && points[idx].parameters) {
-          data.bb_upper = points[idx].parameters.upper?.[idx]?.value;
+          data.bb_upper = points[idx].parameters.upper;
           data.bb_middle = points[idx].value;
-          data.bb_lower = points[idx].parameters.lower?.[idx]?.value;
+          data.bb_lower = points[idx].parameters.lower;
         } else {
           data[indicator.toLowerCase()] = points[idx].value;
         }